@@ -7,6 +7,6 @@ __version__ = '0.1.0'
 
 from ci_sanity.checker import Checker
 from ci_sanity.config import Config
-from ci_sanity.models import Issue, Colors
+from ci_sanity.models import Issue, Colors, ScanResult
 
-__all__ = ['Checker', 'Config', 'Issue', 'Colors']
\ No newline at end of file
+__all__ = ['Checker', 'Config', 'Issue', 'Colors', 'ScanResult']
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+In-process API for ci-sanity.
+
+Checks workflow documents held in memory without touching disk or
+printing anything. Checkers keep no per-check state, so the default
+checker (or one built from your own Config) can be shared freely across
+threads.
+
+    from ci_sanity import api
+
+    issues = api.check_text(yaml_text, '.github/workflows/ci.yml')
+
+    for name, issues in api.check_many(documents):
+        ...
+
+Document names decide the platform the same way file paths do:
+`.gitlab-ci.yml` is a GitLab pipeline, `action.yml` a composite action,
+anything else a GitHub Actions workflow. GitLab local includes are
+resolved relative to the name, so they are the one thing read from disk.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.models import Issue
+
+
+Document = Tuple[str, Union[str, bytes]]
+
+DEFAULT_NAME = '.github/workflows/workflow.yml'
+
+_default_checker: Optional[Checker] = None
+_default_lock = threading.Lock()
+
+
+def default_checker() -> Checker:
+    """Shared checker with default settings, created on first use."""
+    global _default_checker
+    if _default_checker is None:
+        with _default_lock:
+            if _default_checker is None:
+                _default_checker = Checker(Config.from_dict({}))
+    return _default_checker
+
+
+def make_checker(settings: Optional[Dict[str, Any]] = None) -> Checker:
+    """Build a checker from a settings dict shaped like .ci-sanity.yml."""
+    return Checker(Config.from_dict(settings or {}))
+
+
+def check_text(
+    text: str,
+    name: str = DEFAULT_NAME,
+    checker: Optional[Checker] = None
+) -> List[Issue]:
+    """Check one workflow held in a string."""
+    return (checker or default_checker()).check_text(text, name)
+
+
+def check_bytes(
+    data: bytes,
+    name: str = DEFAULT_NAME,
+    checker: Optional[Checker] = None
+) -> List[Issue]:
+    """Check one workflow held as UTF-8 bytes."""
+    return (checker or default_checker()).check_bytes(data, name)
+
+
+def check_document(document: Document, checker: Optional[Checker] = None) -> List[Issue]:
+    """Check a (name, str or bytes) pair."""
+    name, content = document
+    if isinstance(content, bytes):
+        return check_bytes(content, name, checker)
+    return check_text(content, name, checker)
+
+
+def check_many(
+    documents: Iterable[Document],
+    checker: Optional[Checker] = None,
+    workers: int = 1
+) -> Iterator[Tuple[str, List[Issue]]]:
+    """
+    Check (name, content) pairs, yielding (name, issues) in input order.
+
+    Content may be str or UTF-8 bytes. With workers > 1 documents are
+    checked on a thread pool sharing one checker; at most a few batches
+    are in flight, so arbitrarily long iterables stream through.
+    """
+    checker = checker or default_checker()
+    if workers <= 1:
+        for document in documents:
+            yield document[0], check_document(document, checker)
+        return
+
+    depth = workers * 4
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ci-sanity-check') as pool:
+        for document in documents:
+            pending.append((document[0], pool.submit(check_document, document, checker)))
+            if len(pending) >= depth:
+                name, future = pending.popleft()
+                yield name, future.result()
+        for name, future in pending:
+            yield name, future.result()
@@ -0,0 +1,122 @@
+"""
+Baseline files: fingerprints of known issues to suppress.
+
+A fingerprint hashes the rule, the file (relative to the scanned root),
+the job and the normalized message. Lines, columns and step indexes are
+left out, so moving code around does not resurface accepted issues.
+"""
+
+import hashlib
+import os
+import re
+from typing import List, Iterable, Optional, Set, Tuple
+
+from ci_sanity.models import Issue
+
+
+BASELINE_HEADER = '# ci-sanity baseline v1'
+DEFAULT_BASELINE = '.ci-sanity-baseline'
+FINGERPRINT_LENGTH = 20
+
+_POSITION_RE = re.compile(r'\b(line|column|col|step)\s*\[?\d+\]?', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace and drop position details."""
+    message = _POSITION_RE.sub(r'\1 #', message)
+    return _SPACE_RE.sub(' ', message).strip().lower()
+
+
+def normalize_path(file_path: str, root: Optional[str] = None) -> str:
+    """Slash-separated path, relative to root when the file is under it.
+
+    Files read from git revisions (`ref:path`) lose the revision, so a
+    baseline applies to every branch it is checked against.
+    """
+    path = file_path
+    rest = os.path.splitdrive(file_path)[1]
+    if ':' in rest:
+        return rest.split(':', 1)[1].replace(os.sep, '/')
+    if root is not None:
+        relative = os.path.relpath(file_path, root)
+        if not relative.startswith('..'):
+            path = relative
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def fingerprint(issue: Issue, root: Optional[str] = None) -> str:
+    """Stable, position-independent identity of an issue."""
+    key = '\0'.join((
+        issue.rule or '',
+        normalize_path(issue.file, root),
+        str(issue.job),
+        normalize_message(issue.message),
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+class Baseline:
+    """A set of accepted issue fingerprints."""
+
+    def __init__(self, fingerprints: Iterable[str] = (), root: Optional[str] = None):
+        self.fingerprints: Set[str] = set(fingerprints)
+        self.root = root
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def __contains__(self, issue: Issue) -> bool:
+        return fingerprint(issue, self.root) in self.fingerprints
+
+    @classmethod
+    def load(cls, path: str, root: Optional[str] = None) -> 'Baseline':
+        """Read a baseline file (one fingerprint per line, then a description)."""
+        with open(path, encoding='utf-8') as f:
+            fingerprints = {
+                line[:FINGERPRINT_LENGTH] for line in f
+                if line and not line.startswith('#') and len(line) > FINGERPRINT_LENGTH
+            }
+        return cls(fingerprints, root)
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[Issue], root: Optional[str] = None) -> 'Baseline':
+        """Baseline accepting every given issue."""
+        return cls((fingerprint(i, root) for i in issues), root)
+
+    def filter(self, issues: Iterable[Issue]) -> Tuple[List[Issue], int]:
+        """Split issues into (new issues, number suppressed)."""
+        new = []
+        suppressed = 0
+        for issue in issues:
+            if fingerprint(issue, self.root) in self.fingerprints:
+                suppressed += 1
+            else:
+                new.append(issue)
+        return new, suppressed
+
+    def prune(self, issues: Iterable[Issue]) -> int:
+        """Drop fingerprints no current issue matches; return how many."""
+        current = {fingerprint(i, self.root) for i in issues}
+        stale = self.fingerprints - current
+        self.fingerprints -= stale
+        return len(stale)
+
+    def write(self, path: str, issues: Iterable[Issue] = ()):
+        """Write sorted fingerprints, described by matching issues when known."""
+        descriptions = {}
+        for issue in issues:
+            fp = fingerprint(issue, self.root)
+            if fp in self.fingerprints and fp not in descriptions:
+                descriptions[fp] = (
+                    f'{issue.rule} {normalize_path(issue.file, self.root)} '
+                    f'{issue.job}: {normalize_message(issue.message)}'
+                )
+
+        lines = [BASELINE_HEADER]
+        for fp in sorted(self.fingerprints):
+            description = descriptions.get(fp)
+            lines.append(f'{fp} {description}' if description else fp + ' -')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,101 @@
+"""
+Batch protocol for checking many documents in one process.
+
+`ci-sanity check --stdin` reads either NUL-delimited file paths (as
+printed by `find -print0` or `git ls-files -z`) or a stream of
+documents, each sent as a header line followed by its content:
+
+    <size in bytes> <name>\\n
+    <content>
+
+Blank lines between documents are ignored. Results are written as JSON
+lines, one object per document as soon as it is checked, then a final
+summary object:
+
+    {"file": "ci.yml", "issues": [{"severity": "error", ...}]}
+    {"summary": {"files": 1, "errors": 1, "warnings": 0, "exit_code": 2}}
+"""
+
+import json
+import os
+from typing import BinaryIO, Iterator, List, TextIO, Tuple
+
+from ci_sanity.models import Issue
+
+
+READ_SIZE = 1 << 16
+
+
+class ProtocolError(Exception):
+    """Raised for malformed batch input."""
+
+
+def iter_paths(stream: BinaryIO) -> Iterator[str]:
+    """Yield NUL-delimited paths as they arrive; a trailing newline is ignored."""
+    buffer = b''
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        *paths, buffer = buffer.split(b'\0')
+        for path in paths:
+            if path:
+                yield os.fsdecode(path)
+    buffer = buffer.rstrip(b'\r\n')
+    if buffer:
+        yield os.fsdecode(buffer)
+
+
+def iter_documents(stream: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, content) pairs from a length-prefixed stream."""
+    while True:
+        header = stream.readline()
+        if not header:
+            return
+        header = header.rstrip(b'\r\n')
+        if not header:
+            continue
+
+        size_text, _, name = header.partition(b' ')
+        if not size_text.isdigit() or not name:
+            raise ProtocolError(f'bad document header: {header[:80]!r}')
+
+        size = int(size_text)
+        content = stream.read(size)
+        if len(content) < size:
+            raise ProtocolError(
+                f'document {name.decode("utf-8", "replace")} ends after '
+                f'{len(content)} of {size} bytes'
+            )
+        yield name.decode('utf-8', 'replace'), content
+
+
+class ResultWriter:
+    """Writes one JSON line per checked document, then a summary."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.files = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def write(self, name: str, issues: List[Issue]):
+        """Write and flush the results for one document."""
+        self.files += 1
+        self.errors += sum(1 for i in issues if i.is_error())
+        self.warnings += sum(1 for i in issues if i.is_warning())
+        record = {'file': name, 'issues': [i.to_dict() for i in issues]}
+        self.out.write(json.dumps(record) + '\n')
+        self.out.flush()
+
+    def write_summary(self, exit_code: int):
+        """Write the closing summary line."""
+        summary = {
+            'files': self.files,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'exit_code': exit_code,
+        }
+        self.out.write(json.dumps({'summary': summary}) + '\n')
+        self.out.flush()
@@ -2,12 +2,11 @@
 Main checker logic for ci-sanity.
 """
 
-import os
-from pathlib import Path
-from typing import List, Dict
+import time
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 import yaml
 
-from ci_sanity.models import Issue, Colors
+from ci_sanity.models import Issue, Colors, ScanResult
 from ci_sanity.config import Config
 from ci_sanity.rules import Rule
 from ci_sanity.rules.yaml_syntax import YAMLSyntaxRule
@@ -15,118 +14,254 @@ from ci_sanity.rules.runner_compat import RunnerCompatibilityRule
 from ci_sanity.rules.action_version import ActionVersionRule
 from ci_sanity.rules.secrets import SecretsRule
 from ci_sanity.rules.step_order import StepOrderRule
+from ci_sanity.rules.cache_usage import CacheRule, SharedCacheRule
+from ci_sanity.rules.context_refs import ContextReferenceRule, NeedsOutputsRule
+from ci_sanity.rules.gitlab_ci import GitLabRule
+from ci_sanity.rules.workflow_schema import WorkflowSchemaRule
+from ci_sanity.rules.job_graph import JobGraphRule
+from ci_sanity.gitlab import GitLabLoader, IncludeCache, current_includes
+from ci_sanity.discovery import detect_platform, find_workflow_files
+from ci_sanity.prefetch import prefetch
+from ci_sanity.streaming import check_streaming
+from ci_sanity.positions import PositionIndex, current_positions, load_with_positions
+from ci_sanity.baseline import Baseline
 
 
 class Checker:
     """Main CI workflow checker."""
     
-    def __init__(self, config: Config):
-        """Initialize checker with config."""
-        self.config = config
+    def __init__(self, config: Optional[Config] = None):
+        """Initialize checker with config (defaults when None).
+        
+        A checker keeps no per-check state, so one instance can be shared
+        by many threads checking documents concurrently.
+        """
+        self.config = config if config is not None else Config.from_dict({})
+        self.include_cache = IncludeCache()
         self.rules = self._init_rules()
     
     def _init_rules(self) -> List[Rule]:
         """Initialize all validation rules."""
         return [
             YAMLSyntaxRule(),
+            WorkflowSchemaRule(),
             RunnerCompatibilityRule(),
             ActionVersionRule(),
             SecretsRule(self.config.secrets),
             StepOrderRule(),
+            CacheRule(),
+            SharedCacheRule(),
+            ContextReferenceRule(),
+            NeedsOutputsRule(),
+            JobGraphRule(),
+            GitLabRule(self.include_cache),
         ]
     
+    def detect_platform(self, file_path: str) -> str:
+        """Work out which CI platform a workflow file belongs to."""
+        return detect_platform(file_path)
+    
     def find_workflow_files(self, path: str) -> List[str]:
-        """Find all workflow files in directory."""
-        path_obj = Path(path)
-        workflows = []
-        
-        # GitHub Actions
-        gh_workflows = path_obj / '.github' / 'workflows'
-        if gh_workflows.exists() and gh_workflows.is_dir():
-            workflows.extend([
-                str(f) for f in gh_workflows.glob('*.yml')
-            ])
-            workflows.extend([
-                str(f) for f in gh_workflows.glob('*.yaml')
-            ])
-        
-        # GitLab CI
-        gitlab_ci = path_obj / '.gitlab-ci.yml'
-        if gitlab_ci.exists():
-            workflows.append(str(gitlab_ci))
-        
-        return workflows
+        """Find all workflow files under directory, sorted by path."""
+        return find_workflow_files(path, exclude=self.config.exclude)
     
     def check_file(self, file_path: str) -> List[Issue]:
         """Check a single workflow file."""
-        issues = []
-        
-        # Try to parse YAML
         try:
             with open(file_path, encoding='utf-8') as f:
-                workflow = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            # YAML parse error
-            line = getattr(e, 'problem_mark', None)
-            line_no = line.line + 1 if line else None
-            
-            error_msg = str(e).split(':', 1)[0] if ':' in str(e) else str(e)
-            
-            issues.append(Issue(
-                severity='error',
-                file=file_path,
-                job='parse',
-                step=None,
-                message=f'invalid yaml: {error_msg}',
-                fix='fix yaml syntax',
-                line=line_no
-            ))
-            return issues
+                text = f.read()
         except Exception as e:
-            # File read error
-            issues.append(Issue(
-                severity='error',
-                file=file_path,
-                job='read',
-                step=None,
-                message=f'failed to read file: {e}',
-                fix='check file permissions'
-            ))
-            return issues
+            return [self._read_error(file_path, e)]
+        
+        return self.check_text(text, file_path)
+    
+    def check_bytes(
+        self,
+        data: bytes,
+        file_path: str,
+        platform: Optional[str] = None,
+        includes: Optional[Tuple[Any, str]] = None
+    ) -> List[Issue]:
+        """Check workflow content held in memory as UTF-8 bytes."""
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return [self._read_error(file_path, e)]
+        
+        return self.check_text(text, file_path, platform, includes)
+    
+    def check_text(
+        self,
+        text: str,
+        file_path: str,
+        platform: Optional[str] = None,
+        includes: Optional[Tuple[Any, str]] = None
+    ) -> List[Issue]:
+        """Check workflow content held in memory; file_path names it in issues.
         
-        # Run all rules
-        for rule in self.rules:
+        platform defaults to the one file_path looks like. includes is an
+        (include source, root) pair GitLab local includes are read from
+        instead of the filesystem (see gitlab.current_includes).
+        """
+        issues = []
+        if platform is None:
+            platform = self.detect_platform(file_path)
+        loader = GitLabLoader if platform == 'gitlab' else yaml.SafeLoader
+        
+        rules = [r for r in self.rules if platform in r.platforms]
+        
+        # Rules can look up source positions while they run
+        index = PositionIndex()
+        token = current_positions.set(index)
+        includes_token = current_includes.set(includes)
+        try:
+            # Try to parse YAML
             try:
-                rule_issues = rule.check(workflow, file_path)
-                issues.extend(rule_issues)
-            except Exception as e:
-                # Rule execution error (shouldn't happen)
+                if self.config.stream and platform != 'gitlab':
+                    # Giant workflows: check job by job from parser events
+                    return check_streaming(text, file_path, rules, self._run_rule, loader, index)
+                workflow, _ = load_with_positions(text, loader, index)
+            except yaml.YAMLError as e:
+                # YAML parse error
+                mark = getattr(e, 'problem_mark', None)
+                
+                error_msg = str(e).split(':', 1)[0] if ':' in str(e) else str(e)
+                
                 issues.append(Issue(
                     severity='error',
                     file=file_path,
-                    job='internal',
+                    job='parse',
                     step=None,
-                    message=f'rule check failed: {e}',
-                    fix='report this as a bug'
+                    message=f'invalid yaml: {error_msg}',
+                    fix='fix yaml syntax',
+                    line=mark.line + 1 if mark else None,
+                    column=mark.column + 1 if mark else None,
+                    rule='parse'
                 ))
+                return issues
+            except Exception as e:
+                issues.append(self._read_error(file_path, e))
+                return issues
+            
+            # Run all rules that understand this platform
+            for rule in rules:
+                issues.extend(self._run_rule(rule, workflow, file_path))
+        finally:
+            current_includes.reset(includes_token)
+            current_positions.reset(token)
+        
+        return index.annotate(issues)
+    
+    def _run_rule(self, rule: Rule, workflow: Any, file_path: str) -> List[Issue]:
+        """Run one rule, turning a crash into an internal issue."""
+        try:
+            issues = rule.check(workflow, file_path)
+        except Exception as e:
+            # Rule execution error (shouldn't happen)
+            issues = [Issue(
+                severity='error',
+                file=file_path,
+                job='internal',
+                step=None,
+                message=f'rule check failed: {e}',
+                fix='report this as a bug'
+            )]
         
+        for issue in issues:
+            if issue.rule is None:
+                issue.rule = rule.name
         return issues
     
+    def _read_error(self, file_path: str, error: Exception) -> Issue:
+        """Build the issue reported when a file cannot be read."""
+        return Issue(
+            severity='error',
+            file=file_path,
+            job='read',
+            step=None,
+            message=f'failed to read file: {error}',
+            fix='check file permissions',
+            rule='read'
+        )
+    
+    def iter_check(self, files: Iterable[str]) -> Iterator[Tuple[str, List[Issue]]]:
+        """Check files in order, yielding (file, issues) as each finishes.
+        
+        File contents are prefetched on a thread pool so reads overlap
+        with parsing and rule checks.
+        """
+        for file_path, text, error in prefetch(files, workers=self.config.io_workers):
+            if error is not None:
+                yield file_path, [self._read_error(file_path, error)]
+            else:
+                yield file_path, self.check_text(text, file_path)
+    
     def check_all(self, path: str = '.') -> List[Issue]:
         """Check all workflow files in directory."""
         workflows = self.find_workflow_files(path)
         
         all_issues = []
-        for workflow_file in workflows:
-            issues = self.check_file(workflow_file)
+        for _, issues in self.iter_check(workflows):
             all_issues.extend(issues)
         
         return all_issues
     
-    def print_issues(self, issues: List[Issue]):
-        """Print issues to console with formatting."""
+    def check_files(
+        self,
+        files: List[str],
+        fail_fast: bool = False,
+        deadline: Optional[float] = None,
+        baseline: Optional[Baseline] = None,
+        sink: Optional[Callable[[List[Issue]], None]] = None
+    ) -> ScanResult:
+        """Check files in order, optionally stopping early.
+        
+        With fail_fast the scan stops after the first file whose issues
+        would fail the run (errors, or warnings in strict mode). With a
+        deadline (a time.monotonic() value) no further file is started
+        once it has passed; the first file is always checked. Files not
+        reached are listed in the result, and reads queued for them are
+        cancelled.
+        
+        Issues in the baseline are dropped before fail_fast looks at them.
+        With a sink, each file's issues are passed to it instead of being
+        kept in the result; the exit code is tracked either way.
+        """
+        result = ScanResult()
+        checks = self.iter_check(files)
+        try:
+            for _, issues in checks:
+                if baseline is not None:
+                    issues, suppressed = baseline.filter(issues)
+                    result.suppressed += suppressed
+                if sink is not None:
+                    sink(issues)
+                else:
+                    result.issues.extend(issues)
+                result.checked += 1
+                
+                # Exit codes only go up, so the worst file decides
+                exit_code = self.get_exit_code(issues)
+                result.exit_code = max(result.exit_code, exit_code)
+                
+                if result.checked == len(files):
+                    break
+                if fail_fast and exit_code == 2:
+                    result.stopped = 'fail-fast'
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    result.stopped = 'time-budget'
+                    break
+        finally:
+            checks.close()
+        
+        result.skipped = list(files[result.checked:])
+        return result
+    
+    def print_issues(self, issues: List[Issue], colors: Any = Colors):
+        """Print issues to console with formatting, using a Colors palette."""
         if not issues:
-            print(f'{Colors.GREEN}✓ no issues found{Colors.END}')
+            print(f'{colors.GREEN}✓ no issues found{colors.END}')
             return
         
         # Group by file
@@ -138,7 +273,7 @@ class Checker:
         
         # Print each file
         for file_path, file_issues in by_file.items():
-            print(f'\n{Colors.BOLD}{file_path}{Colors.END}')
+            print(f'\n{colors.BOLD}{file_path}{colors.END}')
             
             # Group by job
             by_job: Dict[str, List[Issue]] = {}
@@ -149,20 +284,20 @@ class Checker:
             
             # Print each job
             for job, job_issues in by_job.items():
-                print(f'  {Colors.BLUE}{job}{Colors.END}')
+                print(f'  {colors.BLUE}{job}{colors.END}')
                 
                 # Print issues
                 for issue in job_issues:
-                    self._print_issue(issue)
+                    self._print_issue(issue, colors)
     
-    def _print_issue(self, issue: Issue):
+    def _print_issue(self, issue: Issue, colors: Any = Colors):
         """Print a single issue."""
         # Color and symbol
         if issue.is_error():
-            color = Colors.RED
+            color = colors.RED
             symbol = '✗'
         else:
-            color = Colors.YELLOW
+            color = colors.YELLOW
             symbol = '⚠'
         
         # Build location info
@@ -173,8 +308,8 @@ class Checker:
             location += f' line {issue.line}'
         
         # Print message and fix
-        print(f'    {color}{symbol}{Colors.END} {issue.message}{location}')
-        print(f'      {Colors.GRAY}→ {issue.fix}{Colors.END}')
+        print(f'    {color}{symbol}{colors.END} {issue.message}{location}')
+        print(f'      {colors.GRAY}→ {issue.fix}{colors.END}')
     
     def get_exit_code(self, issues: List[Issue]) -> int:
         """Calculate exit code based on issues."""
@@ -2,12 +2,33 @@
 Command-line interface for ci-sanity.
 """
 
+import os
 import sys
+import time
 import argparse
+import yaml
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Tuple
 
 from ci_sanity.config import Config
 from ci_sanity.checker import Checker
-from ci_sanity.models import Colors
+from ci_sanity.models import Colors, Issue, ScanResult
+from ci_sanity.discovery import sort_by_mtime
+from ci_sanity.gitobjects import check_refs, run_git, GitError
+from ci_sanity.history import HistoryAuditor, HistoryFinding, Commit
+from ci_sanity.baseline import Baseline, DEFAULT_BASELINE
+from ci_sanity.summary import IssueAggregator
+from ci_sanity.jobgraph import (
+    DEFAULT_JOB_MINUTES, PipelineAnalysis, analyze_pipeline, estimate_durations, timings_for,
+)
+from ci_sanity.waste import Waste, find_waste
+from ci_sanity.triggers import RUNS, SKIPPED, ChangedFiles, simulate
+from ci_sanity.shards import (
+    PartialWriter, ShardError, merge_partials, parse_shard, select_shard,
+)
+from ci_sanity.prefetch import prefetch
+from ci_sanity.batch import ProtocolError, ResultWriter, iter_documents, iter_paths
+from ci_sanity import api
 
 
 def main():
@@ -21,7 +42,16 @@ examples:
   ci-sanity check
   ci-sanity check --path ./my-repo
   ci-sanity check --strict
+  ci-sanity check --fail-fast --time-budget 500
+  git ls-files -z '*.yml' | ci-sanity check --stdin
+  ci-sanity check --path ~/src --summary --top 10
   ci-sanity check --config custom-config.yml
+  ci-sanity check --ref origin/release-1.2 --ref origin/release-1.3
+  ci-sanity history --since v1.0.0
+  ci-sanity analyze --timings timings.yml
+  git diff --name-only main... | ci-sanity triggers --event pull_request --branch main
+  ci-sanity baseline && ci-sanity check --baseline
+  ci-sanity check --shard 2/8 --partial shard-2.jsonl.gz && ci-sanity merge shard-*.jsonl.gz
         '''
     )
     
@@ -29,7 +59,14 @@ examples:
         'command',
         nargs='?',
         default='check',
-        help='command to run (default: check)'
+        help='command to run: check, history, baseline, analyze, triggers or merge (default: check)'
+    )
+    
+    parser.add_argument(
+        'inputs',
+        nargs='*',
+        metavar='FILE',
+        help='merge: partial results files written with --partial'
     )
     
     parser.add_argument(
@@ -55,17 +92,164 @@ examples:
         help='disable colored output'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='check huge workflows job by job with bounded memory'
+    )
+    
+    parser.add_argument(
+        '--ref',
+        action='append',
+        metavar='REV',
+        help='check workflows at a git revision instead of the working tree '
+             '(repeatable; --path is the repository)'
+    )
+    
+    parser.add_argument(
+        '--since',
+        metavar='REV',
+        help='history: audit commits after this revision; '
+             'triggers: take changed paths from git diff against it'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='history: worker processes for checking (default: cpu count)'
+    )
+    
+    parser.add_argument(
+        '--baseline',
+        nargs='?',
+        const='',
+        metavar='FILE',
+        help='check: only report issues missing from the baseline; '
+             f'baseline: file to write (default: PATH/{DEFAULT_BASELINE})'
+    )
+    
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='baseline: only drop entries that no longer match an issue'
+    )
+    
+    parser.add_argument(
+        '--stdin',
+        nargs='?',
+        const='paths',
+        choices=('paths', 'documents'),
+        help='check NUL-delimited paths (default) or length-prefixed documents '
+             'read from stdin, writing JSON lines'
+    )
+    
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='group issues by rule and message and print the most frequent'
+    )
+    
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        metavar='N',
+        help='summary and analyze: number of findings to show (default: 20)'
+    )
+    
+    parser.add_argument(
+        '--timings',
+        metavar='FILE',
+        help='analyze: YAML mapping of job (or workflow file -> job) to minutes'
+    )
+    
+    parser.add_argument(
+        '--default-minutes',
+        type=float,
+        default=DEFAULT_JOB_MINUTES,
+        metavar='N',
+        help=f'analyze: minutes for jobs without timings or timeout-minutes '
+             f'(default: {DEFAULT_JOB_MINUTES:g})'
+    )
+    
+    parser.add_argument(
+        '--event',
+        default='push',
+        help='triggers: event to simulate (default: push)'
+    )
+    
+    parser.add_argument(
+        '--branch',
+        default='main',
+        help='triggers: branch pushed to, or the base branch of the pull request (default: main)'
+    )
+    
+    parser.add_argument(
+        '--changed',
+        metavar='FILE',
+        help='triggers: file listing changed paths, one per line (default: stdin)'
+    )
+    
+    parser.add_argument(
+        '--shard',
+        metavar='I/N',
+        help='check only shard I of N, split by a stable hash of each path'
+    )
+    
+    parser.add_argument(
+        '--shard-by',
+        choices=['file', 'repo'],
+        default='file',
+        help='shard: keep each file or each git repository together (default: file)'
+    )
+    
+    parser.add_argument(
+        '--partial',
+        metavar='FILE',
+        help='write results to FILE for ci-sanity merge instead of printing them (.gz compresses)'
+    )
+    
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='stop at the first file that fails the check'
+    )
+    
+    parser.add_argument(
+        '--time-budget',
+        type=int,
+        metavar='MS',
+        help='check recently modified files first and stop after MS milliseconds'
+    )
+    
     args = parser.parse_args()
     
+    # Plain output when requested or not on a terminal
+    colors = Colors(enabled=not args.no_color and sys.stdout.isatty())
+    
     # Handle command
-    if args.command != 'check':
-        print(f'{Colors.RED}unknown command: {args.command}{Colors.END}')
-        print('use: ci-sanity check')
+    if args.command not in ('check', 'history', 'baseline', 'analyze', 'triggers', 'merge'):
+        print(f'{colors.RED}unknown command: {args.command}{colors.END}')
+        print('use: ci-sanity check | ci-sanity history --since REV | ci-sanity baseline | '
+              'ci-sanity analyze | ci-sanity triggers | ci-sanity merge FILE...')
         return 1
     
-    # Disable colors if requested
-    if args.no_color or not sys.stdout.isatty():
-        Colors.disable()
+    if args.inputs and args.command != 'merge':
+        print(f'{colors.RED}unexpected arguments: {" ".join(args.inputs)}{colors.END}')
+        return 1
+    
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ShardError as e:
+            print(f'{colors.RED}{e}{colors.END}')
+            return 1
+    
+    if args.command == 'history' and not args.since:
+        print(f'{colors.RED}history needs --since REV{colors.END}')
+        return 1
     
     # Load config
     config = Config(args.config)
@@ -74,22 +258,376 @@ examples:
     if args.strict:
         config.set_strict(True)
     
+    if args.stream:
+        config.set_stream(True)
+    
     # Create checker
     checker = Checker(config)
     
+    # Audit issues across git history
+    if args.command == 'history':
+        auditor = HistoryAuditor(checker, args.path, workers=args.jobs)
+        try:
+            findings = auditor.audit(args.since)
+        except GitError as e:
+            print(f'{colors.RED}git error: {e}{colors.END}')
+            return 1
+        return _report_history(checker, findings, args.since, colors)
+    
+    # Critical path and parallelism of each workflow's job graph
+    if args.command == 'analyze':
+        return _analyze(checker, args, colors)
+    
+    if args.command == 'triggers':
+        return _triggers(checker, args, colors)
+    
+    if args.command == 'merge':
+        return _merge(checker, args, colors)
+    
+    # Check a batch of paths or documents piped in by another tool
+    if args.stdin:
+        baseline = _load_baseline(args, args.path, colors)
+        if baseline is False:
+            return 1
+        return _check_stdin(checker, args.stdin, baseline, args.fail_fast)
+    
+    # Check workflows at git revisions, straight from the object database
+    if args.ref:
+        try:
+            issues = check_refs(checker, args.ref, args.path)
+        except GitError as e:
+            print(f'{colors.RED}git error: {e}{colors.END}')
+            return 1
+        if args.command == 'baseline':
+            return _write_baseline(issues, _baseline_path(args), None, args.prune, colors)
+        baseline = _load_baseline(args, None, colors)
+        if baseline is False:
+            return 1
+        result = ScanResult(issues=issues)
+        if baseline is not None:
+            result.issues, result.suppressed = baseline.filter(issues)
+        if args.summary:
+            aggregator = IssueAggregator()
+            aggregator.add_all(result.issues)
+            result.exit_code = checker.get_exit_code(result.issues)
+            return _report_summary(aggregator, result, args.top, colors)
+        return _report(checker, result, colors)
+    
+    # The time budget covers discovery too
+    deadline = None
+    if args.time_budget is not None:
+        deadline = time.monotonic() + args.time_budget / 1000
+    
     # Find workflows
     workflows = checker.find_workflow_files(args.path)
     
-    if not workflows:
-        print(f'{Colors.YELLOW}no workflow files found{Colors.END}')
-        print(f'{Colors.GRAY}looking for .github/workflows/*.yml or .gitlab-ci.yml{Colors.END}')
+    if not workflows and not args.partial:
+        print(f'{colors.YELLOW}no workflow files found{colors.END}')
+        print(f'{colors.GRAY}looking for .github/workflows/*.yml, action.yml or .gitlab-ci.yml{colors.END}')
         return 0
     
+    # Every node computes the same split, no coordination needed
+    if shard is not None:
+        workflows = select_shard(workflows, shard, args.path, args.shard_by)
+    
+    # Record current issues as accepted
+    if args.command == 'baseline':
+        issues = checker.check_files(workflows).issues
+        return _write_baseline(issues, _baseline_path(args), args.path, args.prune, colors)
+    
+    baseline = _load_baseline(args, args.path, colors)
+    if baseline is False:
+        return 1
+    
+    # Under a time budget, recently edited files are the likeliest to be broken
+    if deadline is not None:
+        workflows = sort_by_mtime(workflows)
+    
+    # Shards of a split scan write their results for ci-sanity merge
+    if args.partial:
+        try:
+            writer = PartialWriter(args.partial, shard or (1, 1))
+        except OSError as e:
+            print(f'{colors.RED}cannot write partial results: {e}{colors.END}')
+            return 1
+        result = checker.check_files(
+            workflows, fail_fast=args.fail_fast, deadline=deadline, baseline=baseline,
+            sink=writer.write
+        )
+        writer.close(result)
+        print(f'{result.checked} file(s) checked, {writer.issues} issue(s) written to {args.partial}')
+        return result.exit_code
+    
+    # Fleet scans: count issues as they stream in instead of keeping them
+    aggregator = IssueAggregator() if args.summary else None
+    
     # Check workflows
-    issues = checker.check_all(args.path)
+    result = checker.check_files(
+        workflows, fail_fast=args.fail_fast, deadline=deadline, baseline=baseline,
+        sink=aggregator.add_all if aggregator is not None else None
+    )
+    
+    if aggregator is not None:
+        return _report_summary(aggregator, result, args.top, colors)
+    return _report(checker, result, colors)
+
+
+def _check_stdin(
+    checker: Checker,
+    mode: str,
+    baseline: Optional[Baseline],
+    fail_fast: bool
+) -> int:
+    """Check paths or documents from stdin, streaming JSON lines to stdout."""
+    writer = ResultWriter(sys.stdout)
+    if mode == 'paths':
+        results = checker.iter_check(iter_paths(sys.stdin.buffer))
+    else:
+        results = api.check_many(iter_documents(sys.stdin.buffer), checker)
+    
+    exit_code = 0
+    try:
+        for name, issues in results:
+            if baseline is not None:
+                issues, _ = baseline.filter(issues)
+            writer.write(name, issues)
+            exit_code = max(exit_code, checker.get_exit_code(issues))
+            if fail_fast and exit_code == 2:
+                break
+    except ProtocolError as e:
+        print(f'ci-sanity: {e}', file=sys.stderr)
+        return 1
+    finally:
+        results.close()
+    
+    writer.write_summary(exit_code)
+    return exit_code
+
+
+def _analyze(checker: Checker, args, colors: Colors) -> int:
+    """Print the critical path, needless serialization and wasted runner minutes per workflow."""
+    timings = {}
+    if args.timings:
+        try:
+            with open(args.timings, encoding='utf-8') as f:
+                timings = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            print(f'{colors.RED}cannot read timings: {e}{colors.END}')
+            return 1
+        if not isinstance(timings, dict):
+            print(f'{colors.RED}timings must be a mapping of job names to minutes{colors.END}')
+            return 1
+    
+    workflows = [p for p in checker.find_workflow_files(args.path)
+                 if checker.detect_platform(p) == 'github']
+    if not workflows:
+        print(f'{colors.YELLOW}no workflow files found{colors.END}')
+        return 0
+    
+    waste: List[Tuple[str, Waste]] = []
+    for file_path, text, error in prefetch(workflows, workers=checker.config.io_workers):
+        print(f'\n{colors.BOLD}{file_path}{colors.END}')
+        try:
+            workflow = yaml.safe_load(text) if error is None else None
+        except yaml.YAMLError:
+            workflow = None
+        jobs = workflow.get('jobs') if isinstance(workflow, dict) else None
+        if not isinstance(jobs, dict) or not jobs:
+            print(f'  {colors.GRAY}skipped: no jobs (run ci-sanity check){colors.END}')
+            continue
+        
+        relative = os.path.relpath(file_path, args.path)
+        job_timings = timings_for(timings, relative)
+        estimates = estimate_durations(jobs, job_timings, args.default_minutes)
+        findings = find_waste(workflow, {job: m for job, (m, _) in estimates.items()})
+        waste.extend((relative, finding) for finding in findings)
+        
+        analysis = analyze_pipeline(jobs, job_timings, args.default_minutes)
+        if analysis is None:
+            print(f'  {colors.RED}needs has a cycle (run ci-sanity check){colors.END}')
+        else:
+            _report_pipeline(analysis, args.default_minutes, colors)
+        _report_waste(findings, colors)
+    
+    if waste:
+        total = sum(finding.minutes for _, finding in waste)
+        print(f'\n{colors.BOLD}runner minutes at stake: up to {total:g} min{colors.END} '
+              f'{colors.GRAY}(per occurrence, {len(waste)} findings){colors.END}')
+        for relative, finding in sorted(waste, key=lambda item: -item[1].minutes)[:args.top]:
+            where = f'{relative} ({finding.job})' if finding.job else relative
+            print(f'  {finding.minutes:>6g} min  {where}: {finding.kind}')
+    
+    return 0
+
+
+def _merge(checker: Checker, args, colors: Colors) -> int:
+    """Report the combined partial results of a sharded scan."""
+    if not args.inputs:
+        print(f'{colors.RED}merge needs the partial results files to combine{colors.END}')
+        return 1
+    
+    aggregator = IssueAggregator() if args.summary else None
+    try:
+        result, missing = merge_partials(
+            args.inputs, sink=aggregator.add_all if aggregator is not None else None
+        )
+    except ShardError as e:
+        print(f'{colors.RED}{e}{colors.END}')
+        return 1
+    
+    if aggregator is not None:
+        exit_code = _report_summary(aggregator, result, args.top, colors)
+    else:
+        exit_code = max(_report(checker, result, colors), result.exit_code)
+    
+    print(f'{colors.GRAY}{len(args.inputs)} shard(s), {result.checked} file(s) checked{colors.END}')
+    if missing:
+        # An incomplete scan must not pass
+        shards = ', '.join(f'{i}/{n}' for i, n in missing)
+        print(f'{colors.RED}missing shard(s) {shards}: results are incomplete{colors.END}')
+        return 2
+    return exit_code
+
+
+def _triggers(checker: Checker, args, colors: Colors) -> int:
+    """Print which workflows and jobs run for an event and a set of changed files."""
+    try:
+        if args.since:
+            output = run_git(args.path, 'diff', '--name-only', args.since).decode('utf-8', 'replace')
+        elif args.changed and args.changed != '-':
+            with open(args.changed, encoding='utf-8') as f:
+                output = f.read()
+        else:
+            output = sys.stdin.read()
+    except (OSError, GitError) as e:
+        print(f'{colors.RED}cannot read changed paths: {e}{colors.END}')
+        return 1
+    changed = ChangedFiles(output.splitlines())
+    
+    workflows = [p for p in checker.find_workflow_files(args.path)
+                 if checker.detect_platform(p) == 'github']
+    target = f'{args.event} to {args.branch}' if args.event == 'push' else f'{args.event} into {args.branch}'
+    running, unfiltered = 0, []
+    for file_path, text, error in prefetch(workflows, workers=checker.config.io_workers):
+        relative = os.path.relpath(file_path, args.path)
+        try:
+            workflow = yaml.safe_load(text) if error is None else None
+        except yaml.YAMLError:
+            workflow = None
+        if not isinstance(workflow, dict):
+            print(f'{colors.GRAY}{relative}: skipped, not a valid workflow (run ci-sanity check){colors.END}')
+            continue
+        
+        trigger = simulate(workflow, args.event, args.branch, changed)
+        if not trigger.fires:
+            print(f'{colors.GRAY}{relative}: does not run, {trigger.reason}{colors.END}')
+            continue
+        
+        running += 1
+        if not trigger.path_filtered:
+            unfiltered.append(relative)
+        print(f'{colors.BOLD}{relative}{colors.END}: {colors.GREEN}runs{colors.END} '
+              f'{colors.GRAY}({trigger.reason}){colors.END}')
+        for job, (status, why) in trigger.jobs.items():
+            if status == RUNS:
+                print(f'  {colors.GREEN}✓{colors.END} {job}')
+            elif status == SKIPPED:
+                print(f'  {colors.GRAY}- {job}  skipped: {why}{colors.END}')
+            else:
+                print(f'  {colors.YELLOW}?{colors.END} {job}  {colors.GRAY}{why}{colors.END}')
+    
+    print(f'\n{colors.BOLD}{running} of {len(workflows)} workflows run{colors.END} '
+          f'for {target} ({len(changed)} changed files)')
+    if unfiltered:
+        print(f'{colors.YELLOW}no path filters, so these run on every {args.event}:{colors.END}')
+        for relative in unfiltered:
+            print(f'  {relative}')
+    return 0
+
+
+def _report_pipeline(analysis: PipelineAnalysis, default_minutes: float, colors: Colors):
+    """Print one workflow's critical path and needless waits."""
+    steps = ' → '.join(
+        f'{job} ({analysis.estimates[job][0]:g}m)' for job in analysis.critical_path
+    )
+    print(f'  critical path: {steps}')
+    print(f'  minimum latency: {colors.BOLD}{analysis.latency:g} min{colors.END} '
+          f'{colors.GRAY}(jobs add up to {analysis.serial:g} min){colors.END}')
+    
+    if analysis.unconstrained < analysis.latency:
+        print(f'  without needless waits: {colors.GREEN}{analysis.unconstrained:g} min{colors.END}')
+    
+    guessed = sorted(job for job, (_, source) in analysis.estimates.items() if source == 'default')
+    if guessed:
+        print(f'  {colors.GRAY}assumed {default_minutes:g} min for: {", ".join(guessed)}{colors.END}')
+    
+    for job, target, saved in analysis.parallelizable:
+        saving = f'saves {saved:g} min' if saved > 0 else 'not on the critical path'
+        print(f'  {colors.YELLOW}⚠{colors.END} {job} waits for {target} but uses none of its '
+              f'outputs or artifacts {colors.GRAY}({saving}){colors.END}')
+    for job, target in analysis.gates:
+        print(f'  {colors.GRAY}· {job} waits for {target} without using anything from it '
+              f'(fine if it is meant to run after {target}){colors.END}')
+
+
+def _report_waste(findings: List[Waste], colors: Colors):
+    """Print a workflow's wasted runner minutes, most expensive first."""
+    for finding in findings:
+        print(f'  {colors.YELLOW}⚠{colors.END} {finding.message} '
+              f'{colors.GRAY}(up to {finding.minutes:g} runner-min each time){colors.END}')
+        print(f'    {colors.GRAY}→ {finding.fix}{colors.END}')
+
+
+def _baseline_path(args) -> Optional[str]:
+    """Baseline file from --baseline, defaulting to one in the checked path."""
+    if args.baseline is None and args.command != 'baseline':
+        return None
+    return args.baseline or os.path.join(args.path, DEFAULT_BASELINE)
+
+
+def _load_baseline(args, root: Optional[str], colors: Colors):
+    """Baseline named by --baseline, None without one, False if it is missing."""
+    path = _baseline_path(args)
+    if path is None:
+        return None
+    if not os.path.exists(path):
+        print(f'{colors.RED}no baseline at {path}{colors.END}')
+        print(f'{colors.GRAY}create one with: ci-sanity baseline{colors.END}')
+        return False
+    return Baseline.load(path, root)
+
+
+def _write_baseline(
+    issues: List[Issue],
+    path: str,
+    root: Optional[str],
+    prune: bool,
+    colors: Colors
+) -> int:
+    """Write (or prune) a baseline file, return the exit code."""
+    if prune:
+        if not os.path.exists(path):
+            print(f'{colors.RED}no baseline at {path}{colors.END}')
+            return 1
+        baseline = Baseline.load(path, root)
+        removed = baseline.prune(issues)
+        baseline.write(path, issues)
+        print(f'{colors.GREEN}✓ pruned {removed} stale entr{"y" if removed == 1 else "ies"}, '
+              f'{len(baseline)} left in {path}{colors.END}')
+        return 0
+    
+    baseline = Baseline.from_issues(issues, root)
+    baseline.write(path, issues)
+    print(f'{colors.GREEN}✓ wrote {len(baseline)} fingerprint(s) to {path}{colors.END}')
+    return 0
+
+
+def _report(checker: Checker, result: ScanResult, colors: Colors) -> int:
+    """Print issues and a summary line, return the exit code."""
+    issues = result.issues
     
     # Print results
-    checker.print_issues(issues)
+    checker.print_issues(issues, colors)
     
     # Get exit code
     exit_code = checker.get_exit_code(issues)
@@ -101,16 +639,98 @@ examples:
         
         print()
         if error_count > 0:
-            print(f'{Colors.RED}{error_count} error(s){Colors.END}', end='')
+            print(f'{colors.RED}{error_count} error(s){colors.END}', end='')
             if warning_count > 0:
-                print(f', {Colors.YELLOW}{warning_count} warning(s){Colors.END}')
+                print(f', {colors.YELLOW}{warning_count} warning(s){colors.END}')
             else:
                 print()
         else:
-            print(f'{Colors.YELLOW}{warning_count} warning(s){Colors.END}')
+            print(f'{colors.YELLOW}{warning_count} warning(s){colors.END}')
+    
+    _report_scan_notes(result, colors)
     
     return exit_code
 
 
+def _report_summary(aggregator: IssueAggregator, result: ScanResult, top: int, colors: Colors) -> int:
+    """Print the most frequent findings as a ranked table, return the exit code."""
+    if not aggregator.total:
+        print(f'{colors.GREEN}✓ no issues found{colors.END}')
+    else:
+        groups = aggregator.top(top)
+        print(f'{colors.BOLD}{"issues":>8} {"files":>6}  {"rule":<16} message{colors.END}')
+        for group in groups:
+            color = colors.RED if group.is_error() else colors.YELLOW
+            print(f'{group.count:>8} {group.files:>6}  {color}{group.rule:<16}{colors.END} {group.message}')
+            for sample in group.samples:
+                print(f'{"":>17}{colors.GRAY}{sample}{colors.END}')
+        
+        print()
+        print(f'{aggregator.total} issue(s) in {aggregator.files} file(s), '
+              f'{len(aggregator)} distinct finding(s)'
+              + (f', top {len(groups)} shown' if len(groups) < len(aggregator) else ''))
+    
+    _report_scan_notes(result, colors)
+    
+    return result.exit_code
+
+
+def _report_scan_notes(result: ScanResult, colors: Colors):
+    """Mention suppressed issues and files an early stop left unchecked."""
+    if result.suppressed:
+        print(f'{colors.GRAY}{result.suppressed} known issue(s) suppressed by baseline{colors.END}')
+    
+    if result.skipped:
+        reason = ('stopped at the first failing file' if result.stopped == 'fail-fast'
+                  else 'time budget ran out')
+        print(f'{colors.YELLOW}{reason}: {len(result.skipped)} file(s) not checked{colors.END}')
+        for path in result.skipped:
+            print(f'  {colors.GRAY}{path}{colors.END}')
+
+
+def _report_history(
+    checker: Checker,
+    findings: List[HistoryFinding],
+    since: str,
+    colors: Colors
+) -> int:
+    """Print issue lifetimes grouped by path and job, return the exit code."""
+    if not findings:
+        print(f'{colors.GREEN}✓ no issues in history since {since}{colors.END}')
+        return 0
+    
+    by_path: Dict[str, Dict[str, List[HistoryFinding]]] = {}
+    for finding in findings:
+        by_job = by_path.setdefault(finding.path, {})
+        by_job.setdefault(finding.issue.job, []).append(finding)
+    
+    for path, by_job in by_path.items():
+        print(f'\n{colors.BOLD}{path}{colors.END}')
+        for job, job_findings in by_job.items():
+            print(f'  {colors.BLUE}{job}{colors.END}')
+            for finding in job_findings:
+                issue = finding.issue
+                color, symbol = (colors.RED, '✗') if issue.is_error() else (colors.YELLOW, '⚠')
+                introduced = _describe_commit(finding.introduced) or f'before {since}'
+                status = f'fixed {_describe_commit(finding.fixed)}' if finding.fixed else 'still open'
+                print(f'    {color}{symbol}{colors.END} {issue.message}')
+                print(f'      {colors.GRAY}introduced {introduced}, {status}{colors.END}')
+    
+    open_issues = [f.issue for f in findings if f.is_open()]
+    fixed_count = len(findings) - len(open_issues)
+    print()
+    print(f'{len(open_issues)} open, {fixed_count} fixed')
+    
+    return checker.get_exit_code(open_issues)
+
+
+def _describe_commit(commit: Optional[Commit]) -> str:
+    """Short sha and date of a commit."""
+    if commit is None:
+        return ''
+    day = datetime.fromtimestamp(commit.timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+    return f'{commit.sha[:10]} ({day})'
+
+
 if __name__ == '__main__':
     sys.exit(main())
\ No newline at end of file
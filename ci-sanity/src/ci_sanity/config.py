@@ -11,12 +11,24 @@ class Config:
         'platform': 'github',
         'secrets': [],
         'strict': False,
+        'exclude': [],
+        'io_workers': 8,
+        'stream': False,
     }
 
     def __init__(self, config_path: str = None):
         """Load config from file or use defaults."""
         self.data = self._load(config_path)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Config':
+        """Build a config from already-loaded settings, without touching disk."""
+        config = cls.__new__(cls)
+        config.data = cls.DEFAULT_CONFIG.copy()
+        config.data.update(data or {})
+        config.data['secrets'] = list(config.data.get('secrets') or [])
+        return config
+
     def _load(self, config_path: str = None) -> Dict[str, Any]:
         """Load configuration from file."""
         # Start with a shallow copy of defaults and ensure secrets is a fresh list
@@ -61,11 +73,33 @@ class Config:
         """Get list of declared secrets."""
         return self.data.get('secrets', [])
 
+    @property
+    def exclude(self) -> List[str]:
+        """Get gitignore-style patterns excluded from discovery."""
+        return list(self.data.get('exclude') or [])
+
+    @property
+    def io_workers(self) -> int:
+        """Get number of threads prefetching file contents (1 = no prefetch)."""
+        try:
+            return max(1, int(self.data.get('io_workers', 8)))
+        except (TypeError, ValueError):
+            return 8
+
     @property
     def strict(self) -> bool:
         """Check if strict mode is enabled."""
         return bool(self.data.get('strict', False))
 
+    @property
+    def stream(self) -> bool:
+        """Check if workflows are checked job by job from parser events."""
+        return bool(self.data.get('stream', False))
+
+    def set_stream(self, stream: bool) -> None:
+        """Enable or disable streaming mode."""
+        self.data['stream'] = bool(stream)
+
     def set_strict(self, strict: bool) -> None:
         """Enable or disable strict mode."""
         self.data['strict'] = bool(strict)
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Workflow file discovery for ci-sanity.
+
+Walks a tree with os.scandir, pruning dependency and VCS directories
+and anything matched by .gitignore files or the configured exclude list.
+"""
+
+import os
+import re
+from typing import List, Iterable, Optional, Tuple, Pattern
+
+
+# Directories that never contain workflows worth checking
+PRUNED_DIRS = {
+    '.git', '.hg', '.svn', 'node_modules', 'vendor', 'bower_components',
+    '.venv', 'venv', '__pycache__', '.tox', '.nox', '.mypy_cache',
+    '.pytest_cache', '.ruff_cache', '.terraform',
+}
+
+WORKFLOW_EXTENSIONS = ('.yml', '.yaml')
+GITLAB_FILES = ('.gitlab-ci.yml', '.gitlab-ci.yaml')
+ACTION_FILES = ('action.yml', 'action.yaml')
+
+
+def detect_platform(file_path: str) -> str:
+    """Work out which CI platform a workflow file belongs to."""
+    name = file_path.replace('\\', '/').rsplit('/', 1)[-1]
+    if name in GITLAB_FILES:
+        return 'gitlab'
+    if name in ACTION_FILES:
+        return 'action'
+    return 'github'
+
+
+def is_workflow_path(rel_path: str) -> bool:
+    """Check if a slash-separated relative path names a workflow file."""
+    parts = rel_path.split('/')
+    name = parts[-1]
+    if name in GITLAB_FILES or name in ACTION_FILES:
+        return True
+    return (
+        len(parts) >= 3
+        and parts[-3] == '.github'
+        and parts[-2] == 'workflows'
+        and name.endswith(WORKFLOW_EXTENSIONS)
+    )
+
+
+# (base directory, compiled pattern, negated, directory-only)
+IgnoreRule = Tuple[str, Pattern, bool, bool]
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob into a regex fragment."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def compile_ignore_patterns(lines: Iterable[str], base: str = '') -> List[IgnoreRule]:
+    """Compile gitignore-style lines relative to base (slash-separated)."""
+    rules = []
+    for raw in lines:
+        line = raw.rstrip('\n').rstrip('\r')
+        if not line.strip() or line.startswith('#'):
+            continue
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        # A slash anywhere but the end anchors the pattern to its base
+        anchored = '/' in line
+        line = line.lstrip('/')
+        body = _translate_glob(line)
+        if not anchored:
+            body = '(?:.*/)?' + body
+        rules.append((base, re.compile(body + '\\Z'), negated, dir_only))
+    return rules
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: List[IgnoreRule]) -> bool:
+    """Apply ignore rules in order; the last matching rule wins."""
+    ignored = False
+    for base, regex, negated, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + '/'):
+                continue
+            path = rel_path[len(base) + 1:]
+        else:
+            path = rel_path
+        if regex.match(path):
+            ignored = not negated
+    return ignored
+
+
+def is_path_ignored(rel_path: str, rules: List[IgnoreRule]) -> bool:
+    """Whether a file is ignored itself or lies under an ignored directory.
+
+    For listings that are not walked, like git trees, where ignored
+    directories cannot be pruned on the way down.
+    """
+    parts = rel_path.split('/')
+    for i in range(1, len(parts)):
+        if is_ignored('/'.join(parts[:i]), True, rules):
+            return True
+    return is_ignored(rel_path, False, rules)
+
+
+def _read_gitignore(dir_path: str, rel_dir: str) -> List[IgnoreRule]:
+    try:
+        with open(os.path.join(dir_path, '.gitignore'), encoding='utf-8') as f:
+            return compile_ignore_patterns(f, rel_dir)
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+def find_workflow_files(
+    root: str,
+    exclude: Optional[List[str]] = None,
+    use_gitignore: bool = True
+) -> List[str]:
+    """Recursively find workflow files under root, sorted by path."""
+    found = []
+    base_rules = compile_ignore_patterns(exclude or [])
+
+    # Iterative walk; each entry carries the ignore rules in effect there
+    stack: List[Tuple[str, str, List[IgnoreRule]]] = [(root, '', base_rules)]
+
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            continue
+
+        if use_gitignore and any(e.name == '.gitignore' for e in entries):
+            rules = rules + _read_gitignore(dir_path, rel_dir)
+
+        in_workflows_dir = rel_dir == '.github/workflows' or rel_dir.endswith('/.github/workflows')
+
+        for entry in entries:
+            name = entry.name
+            rel_path = f'{rel_dir}/{name}' if rel_dir else name
+
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if name in PRUNED_DIRS:
+                    continue
+                if rules and is_ignored(rel_path, True, rules):
+                    continue
+                stack.append((entry.path, rel_path, rules))
+                continue
+
+            # Cheap name checks first, ignore matching only for candidates
+            if not (
+                name in GITLAB_FILES
+                or name in ACTION_FILES
+                or (in_workflows_dir and name.endswith(WORKFLOW_EXTENSIONS))
+            ):
+                continue
+            if rules and is_ignored(rel_path, False, rules):
+                continue
+            found.append(rel_path)
+
+    found.sort()
+    return [os.path.normpath(os.path.join(root, p)) for p in found]
+
+
+def sort_by_mtime(paths: Iterable[str]) -> List[str]:
+    """Most recently modified first; unreadable files go last."""
+    def mtime(path: str) -> float:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return float('-inf')
+    return sorted(paths, key=mtime, reverse=True)
@@ -0,0 +1,327 @@
+"""
+GitHub Actions expression parser.
+
+Tokenizes and parses `${{ ... }}` expressions (contexts, property and
+index access, function calls, operators and literals) into a small AST.
+Results are memoized per distinct expression string, since generated
+workflows repeat the same expressions thousands of times.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Tuple, NamedTuple, Any, Union
+
+
+class ExpressionError(Exception):
+    """Raised for malformed expressions."""
+
+
+# --- AST -------------------------------------------------------------------
+
+class Literal(NamedTuple):
+    value: Any
+
+
+class Name(NamedTuple):
+    """A bare identifier: a context such as `secrets` or `matrix`."""
+    name: str
+
+
+class Property(NamedTuple):
+    obj: Any
+    name: str
+
+
+class Index(NamedTuple):
+    obj: Any
+    index: Any
+
+
+class Star(NamedTuple):
+    """Object filter: `foo.*` or `foo[*]`."""
+    obj: Any
+
+
+class Call(NamedTuple):
+    name: str
+    args: Tuple[Any, ...]
+
+
+class Unary(NamedTuple):
+    op: str
+    operand: Any
+
+
+class Binary(NamedTuple):
+    op: str
+    left: Any
+    right: Any
+
+
+class Invalid(NamedTuple):
+    """Result of parsing a malformed expression."""
+    message: str
+
+
+Node = Union[Literal, Name, Property, Index, Star, Call, Unary, Binary]
+
+CONTEXTS = {
+    'github', 'env', 'vars', 'job', 'jobs', 'steps', 'runner', 'secrets',
+    'strategy', 'matrix', 'needs', 'inputs'
+}
+
+FUNCTIONS = {
+    'contains', 'startswith', 'endswith', 'format', 'join', 'tojson',
+    'fromjson', 'hashfiles', 'success', 'always', 'cancelled', 'failure',
+    'case',
+}
+
+
+# --- tokenizer -------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<number>0x[0-9a-fA-F]+|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_-]*)
+  | (?P<op>==|!=|<=|>=|&&|\|\||[<>!()\[\].,*])
+''', re.VERBOSE)
+
+Token = Tuple[str, str]
+
+
+def tokenize(source: str) -> List[Token]:
+    """Split an expression into (kind, text) tokens."""
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN_RE.match(source, pos)
+        if not match:
+            raise ExpressionError(f'unexpected character {source[pos]!r} at offset {pos}')
+        kind = match.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+# --- parser ----------------------------------------------------------------
+
+_PRECEDENCE = [
+    ('||',),
+    ('&&',),
+    ('==', '!='),
+    ('<', '<=', '>', '>='),
+]
+
+
+class _Parser:
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Token:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return ('end', '')
+
+    def take(self) -> Token:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, text: str):
+        kind, value = self.take()
+        if value != text or kind != 'op':
+            raise ExpressionError(f'expected {text!r} but found {value or "end"!r}')
+
+    def parse(self) -> Node:
+        node = self.binary(0)
+        if self.peek()[0] != 'end':
+            raise ExpressionError(f'unexpected {self.peek()[1]!r}')
+        return node
+
+    def binary(self, level: int) -> Node:
+        if level == len(_PRECEDENCE):
+            return self.unary()
+        node = self.binary(level + 1)
+        while self.peek()[0] == 'op' and self.peek()[1] in _PRECEDENCE[level]:
+            op = self.take()[1]
+            node = Binary(op, node, self.binary(level + 1))
+        return node
+
+    def unary(self) -> Node:
+        if self.peek() == ('op', '!'):
+            self.take()
+            return Unary('!', self.unary())
+        return self.postfix(self.primary())
+
+    def primary(self) -> Node:
+        kind, value = self.take()
+        if kind == 'string':
+            return Literal(value[1:-1].replace("''", "'"))
+        if kind == 'number':
+            return Literal(int(value, 16) if value.startswith('0x') else float(value))
+        if kind == 'ident':
+            lowered = value.lower()
+            if lowered in ('true', 'false'):
+                return Literal(lowered == 'true')
+            if lowered == 'null':
+                return Literal(None)
+            if lowered in ('nan', 'infinity'):
+                return Literal(float(lowered))
+            if self.peek() == ('op', '('):
+                return self.call(value)
+            return Name(value)
+        if (kind, value) == ('op', '('):
+            node = self.binary(0)
+            self.expect(')')
+            return node
+        raise ExpressionError(f'unexpected {value or "end of expression"!r}')
+
+    def call(self, name: str) -> Node:
+        self.expect('(')
+        args = []
+        if self.peek() != ('op', ')'):
+            args.append(self.binary(0))
+            while self.peek() == ('op', ','):
+                self.take()
+                args.append(self.binary(0))
+        self.expect(')')
+        if name.lower() not in FUNCTIONS:
+            raise ExpressionError(f'unknown function {name}')
+        return Call(name.lower(), tuple(args))
+
+    def postfix(self, node: Node) -> Node:
+        while True:
+            token = self.peek()
+            if token == ('op', '.'):
+                self.take()
+                kind, value = self.take()
+                if (kind, value) == ('op', '*'):
+                    node = Star(node)
+                elif kind == 'ident':
+                    node = Property(node, value)
+                else:
+                    raise ExpressionError(f'expected property name after . but found {value!r}')
+            elif token == ('op', '['):
+                self.take()
+                if self.peek() == ('op', '*'):
+                    self.take()
+                    node = Star(node)
+                else:
+                    node = Index(node, self.binary(0))
+                self.expect(']')
+            else:
+                return node
+
+
+@lru_cache(maxsize=8192)
+def parse_expression(source: str) -> Union[Node, Invalid]:
+    """Parse the inside of a `${{ }}` expression (memoized)."""
+    try:
+        tokens = tokenize(source)
+        if not tokens:
+            raise ExpressionError('empty expression')
+        return _Parser(tokens).parse()
+    except ExpressionError as e:
+        return Invalid(str(e))
+
+
+# --- references ------------------------------------------------------------
+
+Reference = Tuple[str, ...]
+
+
+def _access_path(node: Node) -> Tuple[Reference, List[Node]]:
+    """Static path of a property/index chain and any dynamic sub-expressions."""
+    segments: List[str] = []
+    dynamic: List[Node] = []
+    while True:
+        if isinstance(node, Property):
+            segments.append(node.name)
+            node = node.obj
+        elif isinstance(node, Index):
+            if isinstance(node.index, Literal) and isinstance(node.index.value, str):
+                segments.append(node.index.value)
+            else:
+                # Dynamic index: the static path stops above it
+                dynamic.append(node.index)
+                segments = []
+            node = node.obj
+        elif isinstance(node, Star):
+            segments = []
+            node = node.obj
+        elif isinstance(node, Name):
+            return (node.name,) + tuple(reversed(segments)), dynamic
+        else:
+            dynamic.append(node)
+            return (), dynamic
+
+
+def _collect(node: Any, refs: List[Reference]):
+    if isinstance(node, (Property, Index, Star, Name)):
+        path, dynamic = _access_path(node)
+        if path:
+            refs.append(path)
+        for sub in dynamic:
+            _collect(sub, refs)
+    elif isinstance(node, Call):
+        for arg in node.args:
+            _collect(arg, refs)
+    elif isinstance(node, Unary):
+        _collect(node.operand, refs)
+    elif isinstance(node, Binary):
+        _collect(node.left, refs)
+        _collect(node.right, refs)
+
+
+@lru_cache(maxsize=8192)
+def expression_references(source: str) -> Tuple[Reference, ...]:
+    """Context references in one expression, e.g. ('needs', 'build', 'outputs', 'v')."""
+    node = parse_expression(source)
+    if isinstance(node, Invalid):
+        return ()
+    refs: List[Reference] = []
+    _collect(node, refs)
+    return tuple(refs)
+
+
+def find_expressions(text: str) -> List[str]:
+    """Return the source of every `${{ ... }}` in a string."""
+    found = []
+    start = text.find('${{')
+    while start != -1:
+        pos = start + 3
+        in_string = False
+        while pos < len(text):
+            c = text[pos]
+            if c == "'":
+                in_string = not in_string
+            elif not in_string and text.startswith('}}', pos):
+                break
+            pos += 1
+        else:
+            # Unterminated: report what is there so it fails to parse
+            found.append(text[start + 3:])
+            break
+        found.append(text[start + 3:pos].strip())
+        start = text.find('${{', pos + 2)
+    return found
+
+
+@lru_cache(maxsize=16384)
+def string_expressions(text: str) -> Tuple[Tuple[str, Union[Node, Invalid]], ...]:
+    """(source, ast) for every expression embedded in a string (memoized)."""
+    return tuple((src, parse_expression(src)) for src in find_expressions(text))
+
+
+@lru_cache(maxsize=16384)
+def string_references(text: str) -> Tuple[Reference, ...]:
+    """Context references from every expression embedded in a string."""
+    refs: List[Reference] = []
+    for src in find_expressions(text):
+        refs.extend(expression_references(src))
+    return tuple(refs)
+
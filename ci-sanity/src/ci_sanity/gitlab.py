@@ -0,0 +1,357 @@
+"""
+GitLab CI pipeline model for ci-sanity.
+
+Builds a resolved view of a .gitlab-ci.yml file: local includes are
+merged in, `extends` chains are applied and `!reference` tags are
+replaced with the values they point at.
+"""
+
+import glob
+import hashlib
+import os
+import threading
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Tuple
+
+import yaml
+
+
+# Top-level keys that configure the pipeline rather than define a job
+RESERVED_KEYWORDS = {
+    'default', 'include', 'stages', 'variables', 'workflow',
+    'image', 'services', 'cache', 'before_script', 'after_script', 'types',
+}
+
+DEFAULT_STAGES = ['.pre', 'build', 'test', 'deploy', '.post']
+
+# GitLab refuses deeper extends chains and !reference nesting
+MAX_EXTENDS_DEPTH = 11
+MAX_REFERENCE_DEPTH = 10
+
+
+def is_gitlab_file(file_path: str) -> bool:
+    """Check if a path looks like a GitLab CI pipeline file."""
+    name = os.path.basename(file_path)
+    return name in ('.gitlab-ci.yml', '.gitlab-ci.yaml')
+
+
+class Reference(list):
+    """Value of a `!reference [job, key, ...]` tag."""
+
+
+class GitLabLoader(yaml.SafeLoader):
+    """Safe YAML loader that understands GitLab's custom tags."""
+
+
+def _construct_reference(loader: GitLabLoader, node: yaml.Node) -> Reference:
+    return Reference(loader.construct_sequence(node, deep=True))
+
+
+GitLabLoader.add_constructor('!reference', _construct_reference)
+
+
+def load_gitlab_yaml(stream) -> Any:
+    """Parse GitLab CI YAML from a string or file object."""
+    return yaml.load(stream, Loader=GitLabLoader)
+
+
+class IncludeCache:
+    """
+    Parsed include files shared across every pipeline in a run.
+
+    Entries are keyed by real path and content hash, so a template
+    included from many pipelines is parsed once and an edited file is
+    picked up again. Parsed documents are shared and must not be mutated.
+    """
+
+    def __init__(self):
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._documents: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> Any:
+        """Return the parsed document at path, parsing it at most once."""
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        stat_key = (real_path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest is not None and (real_path, digest) in self._documents:
+                return self._documents[(real_path, digest)]
+
+        with open(real_path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+
+        with self._lock:
+            self._digests[stat_key] = digest
+            key = (real_path, digest)
+            if key in self._documents:
+                return self._documents[key]
+
+        document = load_gitlab_yaml(content.decode('utf-8'))
+
+        with self._lock:
+            return self._documents.setdefault((real_path, digest), document)
+
+    def expand(self, pattern: str) -> List[str]:
+        """Files matching a glob include, sorted."""
+        return sorted(glob.glob(pattern, recursive=True))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+
+# (include source, root) for pipelines whose includes do not come from the
+# filesystem, e.g. a git tree; a source has the load and expand methods of
+# IncludeCache
+current_includes: ContextVar[Optional[Tuple[Any, str]]] = ContextVar(
+    'current_includes', default=None
+)
+
+
+class Problem:
+    """A problem found while resolving a pipeline."""
+
+    def __init__(self, job: str, message: str, fix: str, severity: str = 'error'):
+        self.job = job
+        self.message = message
+        self.fix = fix
+        self.severity = severity
+
+
+def deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge override into base the way GitLab does (hashes deep, rest replaced)."""
+    merged = dict(base)
+    for key, value in override.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict) \
+                and not isinstance(value, Reference):
+            merged[key] = deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class GitLabPipeline:
+    """Resolved GitLab CI pipeline."""
+
+    def __init__(
+        self,
+        document: Dict[str, Any],
+        file_path: str,
+        include_cache: Optional[IncludeCache] = None,
+        root: Optional[str] = None
+    ):
+        """Resolve includes, extends and references for a pipeline document."""
+        self.file_path = file_path
+        self.root = root if root is not None else os.path.dirname(file_path) or '.'
+        self.include_cache = include_cache or IncludeCache()
+        self.problems: List[Problem] = []
+        self.included_files: List[str] = []
+
+        self.config = self._apply_includes(document, [os.path.realpath(file_path)])
+        self._resolved: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+        for name in self.config:
+            if not isinstance(name, str) or name in RESERVED_KEYWORDS or name.startswith('.'):
+                continue
+            job = self.resolve_job(name)
+            if job is not None:
+                self.jobs[name] = self._resolve_references(job, name, 0)
+
+    @property
+    def stages(self) -> List[str]:
+        """Stages declared by the pipeline (GitLab defaults when missing)."""
+        stages = self.config.get('stages')
+        if not isinstance(stages, list):
+            return list(DEFAULT_STAGES)
+        return ['.pre'] + [s for s in stages if isinstance(s, str)] + ['.post']
+
+    @property
+    def templates(self) -> List[str]:
+        """Hidden keys (starting with a dot) usable as extends targets."""
+        return [k for k in self.config if isinstance(k, str) and k.startswith('.')]
+
+    def _include_entries(self, include: Any) -> List[Any]:
+        if include is None:
+            return []
+        if isinstance(include, list):
+            return include
+        return [include]
+
+    def _apply_includes(self, document: Dict[str, Any], stack: List[str]) -> Dict[str, Any]:
+        """Merge local include files under the document, recursively."""
+        merged: Dict[str, Any] = {}
+
+        for entry in self._include_entries(document.get('include')):
+            if isinstance(entry, str):
+                # A bare string is local unless it is a URL
+                if entry.startswith(('http://', 'https://')):
+                    continue
+                local = entry
+            elif isinstance(entry, dict) and 'local' in entry:
+                local = entry['local']
+            else:
+                # remote, template, project and component includes need network
+                continue
+
+            if not isinstance(local, str):
+                continue
+
+            for path in self._expand_local(local):
+                real_path = os.path.realpath(path)
+                if real_path in stack:
+                    self.problems.append(Problem(
+                        job='include',
+                        message=f'include cycle through {local}',
+                        fix='remove the circular include'
+                    ))
+                    continue
+
+                try:
+                    included = self.include_cache.load(path)
+                except OSError:
+                    self.problems.append(Problem(
+                        job='include',
+                        message=f'included file {local} not found',
+                        fix='check the include path (relative to repo root)'
+                    ))
+                    continue
+                except (yaml.YAMLError, UnicodeDecodeError) as e:
+                    self.problems.append(Problem(
+                        job='include',
+                        message=f'included file {local} is invalid yaml: {e}',
+                        fix='fix yaml syntax in the included file'
+                    ))
+                    continue
+
+                if not isinstance(included, dict):
+                    continue
+
+                self.included_files.append(path)
+                included = self._apply_includes(included, stack + [real_path])
+                merged = deep_merge(merged, included)
+
+        own = {k: v for k, v in document.items() if k != 'include'}
+        return deep_merge(merged, own)
+
+    def _expand_local(self, local: str) -> List[str]:
+        """Resolve a local include (relative to the repo root, may be a glob)."""
+        path = os.path.join(self.root, local.lstrip('/'))
+        if any(c in local for c in '*?['):
+            return self.include_cache.expand(path)
+        return [path]
+
+    def resolve_job(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the job with its extends chain applied (memoized)."""
+        return self._resolve(name, [])
+
+    def _resolve(self, name: str, chain: List[str]) -> Optional[Dict[str, Any]]:
+        if name in self._resolved:
+            return self._resolved[name]
+
+        job = self.config.get(name)
+        if not isinstance(job, dict):
+            self._resolved[name] = None
+            return None
+
+        extends = job.get('extends')
+        if extends is None:
+            self._resolved[name] = job
+            return job
+
+        parents = extends if isinstance(extends, list) else [extends]
+        chain = chain + [name]
+
+        if len(chain) > MAX_EXTENDS_DEPTH:
+            self.problems.append(Problem(
+                job=chain[0],
+                message=f'extends nesting deeper than {MAX_EXTENDS_DEPTH} levels',
+                fix='flatten the extends chain'
+            ))
+            self._resolved[name] = job
+            return job
+
+        base: Dict[str, Any] = {}
+        for parent in parents:
+            if not isinstance(parent, str):
+                continue
+            if parent in chain:
+                self.problems.append(Problem(
+                    job=name,
+                    message=f'extends cycle: {" -> ".join(chain + [parent])}',
+                    fix='remove the circular extends'
+                ))
+                continue
+            if not isinstance(self.config.get(parent), dict):
+                self.problems.append(Problem(
+                    job=name,
+                    message=f'extends {parent} but {parent} is not defined',
+                    fix='define the template or fix the extends name'
+                ))
+                continue
+            resolved_parent = self._resolve(parent, chain)
+            if resolved_parent is not None:
+                base = deep_merge(base, resolved_parent)
+
+        own = {k: v for k, v in job.items() if k != 'extends'}
+        result = deep_merge(base, own)
+        self._resolved[name] = result
+        return result
+
+    def _lookup_reference(self, ref: Reference, job: str) -> Any:
+        path = [str(p) for p in ref]
+        if not path:
+            return None
+
+        target = self.resolve_job(path[0]) if path[0] not in RESERVED_KEYWORDS \
+            else self.config.get(path[0])
+        for key in path[1:]:
+            if not isinstance(target, dict) or key not in target:
+                target = None
+                break
+            target = target[key]
+
+        if target is None:
+            self.problems.append(Problem(
+                job=job,
+                message=f'!reference {list(ref)} does not resolve',
+                fix='check the referenced job and key names'
+            ))
+        return target
+
+    def _resolve_references(self, value: Any, job: str, depth: int) -> Any:
+        """Replace !reference tags, flattening referenced lists into lists."""
+        if depth > MAX_REFERENCE_DEPTH:
+            self.problems.append(Problem(
+                job=job,
+                message=f'!reference nesting deeper than {MAX_REFERENCE_DEPTH} levels',
+                fix='reduce !reference nesting'
+            ))
+            return None
+
+        if isinstance(value, Reference):
+            target = self._lookup_reference(value, job)
+            return self._resolve_references(target, job, depth + 1)
+
+        if isinstance(value, dict):
+            return {k: self._resolve_references(v, job, depth) for k, v in value.items()}
+
+        if isinstance(value, list):
+            items = []
+            for item in value:
+                if isinstance(item, Reference):
+                    resolved = self._resolve_references(item, job, depth)
+                    if isinstance(resolved, list):
+                        items.extend(resolved)
+                    elif resolved is not None:
+                        items.append(resolved)
+                else:
+                    items.append(self._resolve_references(item, job, depth))
+            return items
+
+        return value
@@ -0,0 +1,222 @@
+"""
+Read workflow files straight from the git object database.
+
+A single long-lived `git cat-file --batch` process serves every blob,
+so checking one ref or twenty needs no checkout and no per-file
+subprocess.
+"""
+
+import posixpath
+import subprocess
+from dataclasses import replace
+from fnmatch import fnmatchcase
+from typing import Any, List, Dict, Optional, Tuple, Iterable
+
+from ci_sanity.models import Issue
+from ci_sanity.discovery import (
+    PRUNED_DIRS, compile_ignore_patterns, is_path_ignored, is_workflow_path,
+)
+from ci_sanity.gitlab import load_gitlab_yaml
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+def run_git(repo: str, *args: str) -> bytes:
+    """Run a git command in repo and return its stdout."""
+    try:
+        result = subprocess.run(
+            ['git', '-C', repo] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as e:
+        raise GitError(f'failed to run git: {e}')
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f'git {args[0]} failed')
+    return result.stdout
+
+
+class GitObjectReader:
+    """Reads objects through one `git cat-file --batch` process."""
+
+    def __init__(self, repo: str = '.'):
+        """Start the batch process for the repository at repo."""
+        self.repo = repo
+        try:
+            self._proc = subprocess.Popen(
+                ['git', '-C', repo, 'cat-file', '--batch'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise GitError(f'failed to run git: {e}')
+
+    def read(self, spec: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (sha, type, content) for an object spec, or None if missing."""
+        self._proc.stdin.write(spec.encode('utf-8') + b'\n')
+        self._proc.stdin.flush()
+
+        header = self._proc.stdout.readline()
+        if not header:
+            raise GitError('git cat-file exited unexpectedly')
+
+        fields = header.split()
+        if len(fields) != 3:
+            # "<spec> missing" or "<spec> ambiguous"
+            return None
+
+        sha, obj_type, size = fields
+        content = self._proc.stdout.read(int(size))
+        self._proc.stdout.read(1)
+        return sha.decode('ascii'), obj_type.decode('ascii'), content
+
+    def close(self):
+        """Stop the batch process."""
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_tree(repo: str, ref: str) -> List[Tuple[str, str]]:
+    """List (path, blob sha) for every file in a ref's tree, sorted by path."""
+    output = run_git(repo, 'ls-tree', '-r', '-z', '--full-tree', ref)
+
+    blobs = []
+    for record in output.split(b'\0'):
+        if not record:
+            continue
+        meta, _, path_bytes = record.partition(b'\t')
+        mode, obj_type, sha = meta.split()
+        if obj_type != b'blob':
+            continue
+        path = path_bytes.decode('utf-8', 'surrogateescape')
+        blobs.append((path, sha.decode('ascii')))
+
+    blobs.sort()
+    return blobs
+
+
+def list_workflow_blobs(
+    repo: str,
+    ref: str,
+    exclude: Optional[List[str]] = None
+) -> List[Tuple[str, str]]:
+    """List (path, blob sha) for every workflow file in a ref's tree."""
+    return _workflow_blobs(list_tree(repo, ref), exclude)
+
+
+def _workflow_blobs(
+    tree: List[Tuple[str, str]],
+    exclude: Optional[List[str]]
+) -> List[Tuple[str, str]]:
+    rules = compile_ignore_patterns(exclude or [])
+
+    blobs = []
+    for path, sha in tree:
+        if not is_workflow_path(path):
+            continue
+        if any(part in PRUNED_DIRS for part in path.split('/')[:-1]):
+            continue
+        if rules and is_path_ignored(path, rules):
+            continue
+        blobs.append((path, sha))
+    return blobs
+
+
+def _glob_match(parts: List[str], names: List[str]) -> bool:
+    """Match path segments against glob segments, `**` spanning directories."""
+    if not parts:
+        return not names
+    if parts[0] == '**':
+        return any(_glob_match(parts[1:], names[i:]) for i in range(len(names) + 1))
+    return bool(names) and fnmatchcase(names[0], parts[0]) and _glob_match(parts[1:], names[1:])
+
+
+class TreeIncludes:
+    """GitLab include files read from a ref's tree instead of the work tree.
+
+    Parsed files are shared through documents, keyed by blob SHA, so an
+    include that is the same on several refs is parsed once.
+    """
+
+    def __init__(
+        self,
+        reader: GitObjectReader,
+        ref: str,
+        tree: List[Tuple[str, str]],
+        documents: Dict[str, Any]
+    ):
+        self.reader = reader
+        self.ref = ref
+        self.paths = [path for path, _ in tree]
+        self.documents = documents
+
+    def load(self, path: str) -> Any:
+        """Return the parsed file at path, relative to the tree root."""
+        obj = self.reader.read(f'{self.ref}:{posixpath.normpath(path)}')
+        if obj is None or obj[1] != 'blob':
+            raise FileNotFoundError(f'{self.ref}:{path}')
+        sha, _, content = obj
+        if sha not in self.documents:
+            self.documents[sha] = load_gitlab_yaml(content.decode('utf-8'))
+        return self.documents[sha]
+
+    def expand(self, pattern: str) -> List[str]:
+        """Files of the tree matching a glob include, sorted."""
+        parts = posixpath.normpath(pattern).split('/')
+        return [path for path in self.paths if _glob_match(parts, path.split('/'))]
+
+
+def check_refs(
+    checker,
+    refs: Iterable[str],
+    repo: str = '.'
+) -> List[Issue]:
+    """
+    Check the workflow files of each ref without checking anything out.
+
+    Blobs are deduplicated by SHA: a file that is identical on several
+    refs is parsed and checked once and its issues reported for each.
+    GitLab pipelines are the exception, since their local includes are
+    read from each ref's own tree. Issues name files as <ref>:<path>.
+    """
+    results: Dict[Any, List[Issue]] = {}
+    documents: Dict[str, Any] = {}
+    all_issues = []
+
+    with GitObjectReader(repo) as reader:
+        for ref in refs:
+            tree = list_tree(repo, ref)
+            includes = (TreeIncludes(reader, ref, tree, documents), '')
+            for path, sha in _workflow_blobs(tree, checker.config.exclude):
+                name = f'{ref}:{path}'
+                # The platform comes from the path; name is for display only
+                platform = checker.detect_platform(path)
+                key = (sha, ref) if platform == 'gitlab' else sha
+
+                if key not in results:
+                    obj = reader.read(sha)
+                    if obj is None:
+                        all_issues.append(checker._read_error(
+                            name, GitError(f'blob {sha} missing')
+                        ))
+                        continue
+                    issues = checker.check_bytes(obj[2], name, platform, includes)
+                    results[key] = issues
+                    all_issues.extend(issues)
+                    continue
+
+                # Same content seen on an earlier ref: reuse its results
+                all_issues.extend(replace(i, file=name) for i in results[key])
+
+    return all_issues
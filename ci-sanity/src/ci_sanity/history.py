@@ -0,0 +1,333 @@
+"""
+History audit: when did each workflow issue appear, and when was it fixed.
+
+Walks first-parent history with one streamed `git log`, checks every
+distinct workflow blob exactly once and replays the per-path changes to
+build a timeline of issues.
+"""
+
+import itertools
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, List, Dict, Optional, Tuple, Iterator, Set
+
+from ci_sanity.config import Config
+from ci_sanity.models import Issue
+from ci_sanity.discovery import (
+    PRUNED_DIRS, compile_ignore_patterns, detect_platform, is_path_ignored, is_workflow_path,
+)
+from ci_sanity.gitobjects import (
+    GitError, GitObjectReader, TreeIncludes, list_tree, list_workflow_blobs, run_git,
+)
+
+
+WORKFLOW_PATHSPECS = [
+    ':(glob)**/.github/workflows/*.yml',
+    ':(glob)**/.github/workflows/*.yaml',
+    ':(glob)**/.gitlab-ci.yml',
+    ':(glob)**/.gitlab-ci.yaml',
+    ':(glob)**/action.yml',
+    ':(glob)**/action.yaml',
+]
+
+NULL_SHA = '0' * 40
+
+# Issues are matched across revisions by everything but their position
+IssueKey = Tuple[str, str, str]
+
+
+def issue_key(issue: Issue) -> IssueKey:
+    """Position-independent identity of an issue within one file."""
+    return (issue.severity, issue.job, issue.message)
+
+
+@dataclass
+class Commit:
+    """A commit in the audited range."""
+    sha: str
+    timestamp: int
+
+
+@dataclass
+class Change:
+    """A workflow path changing to a new blob (None when deleted)."""
+    # None for the files already there at the start of the range
+    commit: Optional[Commit]
+    path: str
+    blob: Optional[str]
+
+
+@dataclass
+class HistoryFinding:
+    """An issue's lifetime on one workflow path."""
+    path: str
+    issue: Issue
+    introduced: Optional[Commit]
+    fixed: Optional[Commit] = None
+
+    def is_open(self) -> bool:
+        """Check if the issue is still present at the end of the range."""
+        return self.fixed is None
+
+
+def _unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual paths."""
+    if not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = path[1:-1].encode('latin-1', 'backslashreplace').decode('unicode_escape')
+    return raw.encode('latin-1').decode('utf-8', 'surrogateescape')
+
+
+def iter_changes(
+    repo: str,
+    since: str,
+    until: str = 'HEAD',
+    exclude: Optional[List[str]] = None
+) -> Iterator[Change]:
+    """Stream workflow changes in first-parent order, oldest first.
+
+    Paths matching the exclude patterns are skipped, as in
+    list_workflow_blobs.
+    """
+    rules = compile_ignore_patterns(exclude or [])
+    cmd = [
+        'git', '-C', repo, 'log', '--first-parent', '--reverse',
+        '--format=commit %H %ct', '--raw', '--no-abbrev', '--no-renames',
+        f'{since}..{until}', '--',
+    ] + WORKFLOW_PATHSPECS
+
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f'failed to run git: {e}')
+
+    commit = None
+    try:
+        for raw_line in proc.stdout:
+            line = raw_line.decode('utf-8', 'surrogateescape').rstrip('\n')
+            if line.startswith('commit '):
+                _, sha, timestamp = line.split()
+                commit = Commit(sha, int(timestamp))
+                continue
+            if not line.startswith(':') or commit is None:
+                continue
+
+            meta, _, path = line.partition('\t')
+            fields = meta.split()
+            new_blob = fields[3]
+            path = _unquote_path(path)
+
+            if not is_workflow_path(path):
+                continue
+            if any(part in PRUNED_DIRS for part in path.split('/')[:-1]):
+                continue
+            if rules and is_path_ignored(path, rules):
+                continue
+            yield Change(commit, path, None if new_blob == NULL_SHA else new_blob)
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0:
+            message = stderr.decode('utf-8', 'replace').strip()
+            raise GitError(message or 'git log failed')
+
+
+# Results are kept per blob, and per (blob, commit) for GitLab pipelines,
+# whose local includes come from the commit's tree
+ResultKey = Any
+
+
+def tree_includes(
+    reader: GitObjectReader,
+    repo: str,
+    commit: str,
+    documents: Dict[str, Any]
+) -> Tuple[TreeIncludes, str]:
+    """Include source reading GitLab local includes from a commit's tree."""
+    return TreeIncludes(reader, commit, list_tree(repo, commit), documents), ''
+
+
+_worker_checker = None
+_worker_repo = None
+_worker_reader = None
+_worker_documents: Dict[str, Any] = {}
+
+
+def _init_worker(config_data, repo):
+    global _worker_checker, _worker_repo
+    from ci_sanity.checker import Checker
+    _worker_checker = Checker(Config.from_dict(config_data))
+    _worker_repo = repo
+
+
+def _check_blob(name: str, content: bytes, commit: Optional[str]) -> List[Issue]:
+    global _worker_reader
+    includes = None
+    if commit is not None:
+        if _worker_reader is None:
+            _worker_reader = GitObjectReader(_worker_repo)
+        includes = tree_includes(_worker_reader, _worker_repo, commit, _worker_documents)
+    return _worker_checker.check_bytes(content, name, includes=includes)
+
+
+class HistoryAuditor:
+    """Audits workflow issues across a range of git history."""
+
+    def __init__(self, checker, repo: str = '.', workers: int = 1, window: int = 64):
+        """
+        Args:
+            checker: Checker used in-process (and whose config seeds workers)
+            repo: Path to the git repository
+            workers: Worker processes for checking blobs (1 = in-process)
+            window: Maximum blobs read ahead of the workers
+        """
+        self.checker = checker
+        self.repo = repo
+        self.workers = max(1, workers)
+        self.window = max(1, window)
+        # blob sha, or (blob sha, commit) for GitLab -> position-independent issue keys
+        self.results: Dict[ResultKey, Tuple[IssueKey, ...]] = {}
+        # parsed GitLab include files by blob sha
+        self.documents: Dict[str, Any] = {}
+        # commit the audited range starts from, while auditing
+        self._since: Optional[str] = None
+        # one representative issue per key, for reporting
+        self.samples: Dict[IssueKey, Issue] = {}
+
+    def audit(self, since: str, until: str = 'HEAD') -> List[HistoryFinding]:
+        """Return the lifetime of every issue seen on workflow paths.
+
+        Changes stream from git log through the workers into the timeline,
+        so only a window of them is held at a time.
+        """
+        exclude = self.checker.config.exclude
+        initial = [
+            Change(None, path, blob)
+            for path, blob in list_workflow_blobs(self.repo, since, exclude)
+        ]
+        changes = itertools.chain(initial, iter_changes(self.repo, since, until, exclude))
+        since_sha = run_git(self.repo, 'rev-parse', '--verify', f'{since}^{{commit}}')
+        return self._timeline(self._checked(changes, since_sha.decode('ascii').strip()))
+
+    def _result_key(self, change: Change) -> ResultKey:
+        """Where a change's results are kept (None for deletions)."""
+        if change.blob is None or detect_platform(change.path) != 'gitlab':
+            return change.blob
+        return change.blob, change.commit.sha if change.commit else self._since
+
+    def _record(self, result_key: ResultKey, issues: List[Issue]):
+        keys = []
+        for issue in issues:
+            key = issue_key(issue)
+            self.samples.setdefault(key, issue)
+            keys.append(key)
+        self.results[result_key] = tuple(dict.fromkeys(keys))
+
+    def _checked(self, changes: Iterable[Change], since: str) -> Iterator[Change]:
+        """Yield changes in order once their blob is checked.
+
+        Each unique blob is checked once; GitLab pipelines once per commit,
+        with their includes read from that commit (since for the files
+        already there). Contents stream to the workers with at most a
+        window of blobs (and of changes) waiting on them.
+        """
+        self._since = since
+        with GitObjectReader(self.repo) as reader:
+            if self.workers == 1:
+                for change in changes:
+                    key = self._result_key(change)
+                    if key is not None and key not in self.results:
+                        self._record(key, self._check_one(reader, change, key))
+                    yield change
+                return
+
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.checker.config.data, self.repo),
+            ) as pool:
+                in_flight = deque()
+                submitted: Set[ResultKey] = set()
+                waiting: deque = deque()
+
+                def done(change: Change) -> bool:
+                    key = self._result_key(change)
+                    return key is None or key in self.results
+
+                for change in changes:
+                    key = self._result_key(change)
+                    if key is not None and key not in self.results and key not in submitted:
+                        obj = reader.read(change.blob)
+                        if obj is None:
+                            self._record(key, [self.checker._read_error(
+                                change.path, GitError(f'blob {change.blob} missing')
+                            )])
+                        else:
+                            submitted.add(key)
+                            commit = key[1] if isinstance(key, tuple) else None
+                            in_flight.append(
+                                (key, pool.submit(_check_blob, change.path, obj[2], commit))
+                            )
+                    waiting.append(change)
+
+                    # Bound memory: never hold more than a window of blobs or changes
+                    while in_flight and (len(in_flight) >= self.window or len(waiting) > self.window):
+                        done_key, future = in_flight.popleft()
+                        self._record(done_key, future.result())
+                        while waiting and done(waiting[0]):
+                            yield waiting.popleft()
+                    while waiting and done(waiting[0]):
+                        yield waiting.popleft()
+
+                for done_key, future in in_flight:
+                    self._record(done_key, future.result())
+                yield from waiting
+
+    def _check_one(
+        self,
+        reader: GitObjectReader,
+        change: Change,
+        key: ResultKey
+    ) -> List[Issue]:
+        obj = reader.read(change.blob)
+        if obj is None:
+            return [self.checker._read_error(change.path, GitError(f'blob {change.blob} missing'))]
+        includes = None
+        if isinstance(key, tuple):
+            includes = tree_includes(reader, self.repo, key[1], self.documents)
+        return self.checker.check_bytes(obj[2], change.path, includes=includes)
+
+    def _timeline(self, changes: Iterable[Change]) -> List[HistoryFinding]:
+        """Replay checked changes; those without a commit are the starting state."""
+        findings: List[HistoryFinding] = []
+        open_findings: Dict[Tuple[str, IssueKey], HistoryFinding] = {}
+        current: Dict[str, Set[IssueKey]] = {}
+
+        def apply(change: Change):
+            path, commit = change.path, change.commit
+            found = self.results.get(self._result_key(change), ()) if change.blob else ()
+            before = current.get(path, set())
+            after = set(found)
+
+            for key in before - after:
+                finding = open_findings.pop((path, key))
+                finding.fixed = commit
+            for key in found:
+                if key in before or (path, key) in open_findings:
+                    continue
+                finding = HistoryFinding(path, replace(self.samples[key], file=path), commit)
+                open_findings[(path, key)] = finding
+                findings.append(finding)
+
+            if after:
+                current[path] = after
+            else:
+                current.pop(path, None)
+
+        for change in changes:
+            apply(change)
+
+        return findings
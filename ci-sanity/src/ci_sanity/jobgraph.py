@@ -0,0 +1,304 @@
+"""
+Job dependency graph built from `needs:`.
+
+Used both by the job-graph rule (cycles, undefined targets) and by the
+`analyze` command, which estimates the pipeline's critical path and
+finds jobs that wait on each other without using anything from the job
+they wait for.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ci_sanity.expressions import string_references
+
+
+DEFAULT_JOB_MINUTES = 5.0
+
+UPLOAD_ARTIFACT = 'actions/upload-artifact'
+DOWNLOAD_ARTIFACT = 'actions/download-artifact'
+
+
+def job_needs(job_config: Any) -> List[str]:
+    """The job names a job lists under needs, in order."""
+    if not isinstance(job_config, dict):
+        return []
+    needs = job_config.get('needs') or []
+    if isinstance(needs, str):
+        needs = [needs]
+    if not isinstance(needs, list):
+        return []
+    return [n for n in needs if isinstance(n, str)]
+
+
+class JobGraph:
+    """Jobs of one workflow and the `needs` edges between them."""
+
+    def __init__(self, jobs: Dict[str, Any]):
+        self.jobs = jobs
+        self.needs: Dict[str, List[str]] = {name: job_needs(config) for name, config in jobs.items()}
+
+    def undefined_needs(self) -> List[Tuple[str, str]]:
+        """(job, target) for every needs entry naming a job that does not exist."""
+        return [
+            (job, target)
+            for job, targets in self.needs.items()
+            for target in targets
+            if target not in self.jobs
+        ]
+
+    def cycles(self) -> List[List[str]]:
+        """Each dependency cycle once, as a job list starting and ending at the same job."""
+        state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+        found: List[List[str]] = []
+        seen: Set[frozenset] = set()
+
+        for root in self.jobs:
+            if root in state:
+                continue
+            path: List[str] = []
+            stack = [(root, iter(self._edges(root)))]
+            state[root] = 1
+            path.append(root)
+            while stack:
+                job, targets = stack[-1]
+                for target in targets:
+                    if state.get(target) == 1:
+                        cycle = path[path.index(target):] + [target]
+                        key = frozenset(cycle)
+                        if key not in seen:
+                            seen.add(key)
+                            found.append(cycle)
+                    elif target not in state:
+                        state[target] = 1
+                        path.append(target)
+                        stack.append((target, iter(self._edges(target))))
+                        break
+                else:
+                    state[job] = 2
+                    path.pop()
+                    stack.pop()
+        return found
+
+    def _edges(self, job: str) -> List[str]:
+        return [t for t in self.needs.get(job, []) if t in self.jobs]
+
+    def critical_path(
+        self,
+        durations: Dict[str, float],
+        skip_edges: Iterable[Tuple[str, str]] = ()
+    ) -> Tuple[float, List[str]]:
+        """Longest chain of needs by total duration: (minutes, jobs in run order).
+
+        The graph must be acyclic. skip_edges drops (job, target) edges,
+        to see what removing those dependencies would save.
+        """
+        skip = set(skip_edges)
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+
+        def visit(job: str) -> float:
+            stack = [job]
+            while stack:
+                current = stack[-1]
+                pending = [t for t in self._edges(current)
+                           if t not in finish and (current, t) not in skip]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                if current in finish:
+                    continue
+                start, before = 0.0, None
+                for target in self._edges(current):
+                    if (current, target) not in skip and finish[target] > start:
+                        start, before = finish[target], target
+                finish[current] = start + durations.get(current, DEFAULT_JOB_MINUTES)
+                previous[current] = before
+            return finish[job]
+
+        if not self.jobs:
+            return 0.0, []
+        end = max(self.jobs, key=visit)
+        path = []
+        job: Optional[str] = end
+        while job is not None:
+            path.append(job)
+            job = previous[job]
+        return finish[end], list(reversed(path))
+
+    def unused_dependencies(self) -> List[Tuple[str, str]]:
+        """(job, target) edges that look needless.
+
+        The job uses no output, result or artifact of target, and either
+        target declares outputs (so the wait was for data that is never
+        read) or the job already waits for target through its other needs.
+        """
+        return [(job, target) for job, target, gate in self._unused_edges() if not gate]
+
+    def gates(self) -> List[Tuple[str, str]]:
+        """(job, target) edges that only order the jobs, like deploy needing test.
+
+        The job uses nothing of target, which has no outputs; waiting is
+        most likely the point.
+        """
+        return [(job, target) for job, target, gate in self._unused_edges() if gate]
+
+    def _unused_edges(self) -> List[Tuple[str, str, bool]]:
+        """(job, target, is a plain gate) for edges using nothing of target."""
+        unused = []
+        for job, targets in self.needs.items():
+            config = self.jobs.get(job)
+            if not isinstance(config, dict):
+                continue
+            referenced = {ref[1] for ref in _references(config)
+                          if ref[0] == 'needs' and len(ref) > 1}
+            downloads = _uses_action(config, DOWNLOAD_ARTIFACT)
+            for target in targets:
+                if target not in self.jobs or target in referenced:
+                    continue
+                if downloads and _uses_action(self.jobs[target], UPLOAD_ARTIFACT):
+                    continue
+                target_config = self.jobs[target]
+                outputs = target_config.get('outputs') if isinstance(target_config, dict) else None
+                redundant = any(
+                    self._reaches(other, target) for other in targets if other != target
+                )
+                unused.append((job, target, not outputs and not redundant))
+        return unused
+
+    def _reaches(self, start: str, target: str) -> bool:
+        """Whether start waits for target, directly or through other jobs."""
+        stack = [start]
+        seen = set()
+        while stack:
+            job = stack.pop()
+            if job == target:
+                return True
+            if job in seen:
+                continue
+            seen.add(job)
+            stack.extend(t for t in self.needs.get(job, ()) if t in self.jobs)
+        return False
+
+
+def _references(value: Any) -> List[Tuple[str, ...]]:
+    refs: List[Tuple[str, ...]] = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if '${{' in item:
+                refs.extend(string_references(item))
+            elif item.lstrip().startswith(('needs.', '!needs.')):
+                # Bare if: conditions
+                refs.extend(string_references('${{ ' + item + ' }}'))
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return refs
+
+
+def _uses_action(job_config: Any, action: str) -> bool:
+    if not isinstance(job_config, dict):
+        return False
+    steps = job_config.get('steps')
+    if not isinstance(steps, list):
+        return False
+    return any(
+        isinstance(step, dict) and isinstance(step.get('uses'), str)
+        and step['uses'].split('@', 1)[0] == action
+        for step in steps
+    )
+
+
+def estimate_durations(
+    jobs: Dict[str, Any],
+    timings: Optional[Dict[str, Any]] = None,
+    default: float = DEFAULT_JOB_MINUTES
+) -> Dict[str, Tuple[float, str]]:
+    """Minutes per job and where the figure came from.
+
+    Measured timings win, then timeout-minutes (an upper bound), then
+    the default.
+    """
+    estimates = {}
+    for name, config in jobs.items():
+        measured = (timings or {}).get(name)
+        timeout = config.get('timeout-minutes') if isinstance(config, dict) else None
+        if _is_minutes(measured):
+            estimates[name] = (float(measured), 'timings')
+        elif _is_minutes(timeout):
+            estimates[name] = (float(timeout), 'timeout-minutes')
+        else:
+            estimates[name] = (default, 'default')
+    return estimates
+
+
+def _is_minutes(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def timings_for(timings: Dict[str, Any], workflow_path: str) -> Dict[str, Any]:
+    """Job timings for one workflow from a timings mapping.
+
+    Top-level job names apply to every workflow; a workflow's relative
+    path or file name can map to its own job timings, which win.
+    """
+    merged = {k: v for k, v in timings.items() if not isinstance(v, dict)}
+    normalized = workflow_path.replace(os.sep, '/')
+    for key in (os.path.basename(normalized), normalized):
+        specific = timings.get(key)
+        if isinstance(specific, dict):
+            merged.update(specific)
+    return merged
+
+
+@dataclass
+class PipelineAnalysis:
+    """Critical path and parallelism findings for one workflow."""
+    latency: float
+    # Latency if every needless dependency were dropped
+    unconstrained: float
+    serial: float
+    critical_path: List[str]
+    estimates: Dict[str, Tuple[float, str]]
+    # (job, needed job, minutes saved if the dependency were dropped)
+    parallelizable: List[Tuple[str, str, float]] = field(default_factory=list)
+    # (job, needed job) waits that use nothing but look deliberate
+    gates: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def analyze_pipeline(
+    jobs: Dict[str, Any],
+    timings: Optional[Dict[str, Any]] = None,
+    default: float = DEFAULT_JOB_MINUTES
+) -> Optional[PipelineAnalysis]:
+    """Analyze a workflow's jobs, or return None if needs has a cycle."""
+    graph = JobGraph(jobs)
+    if graph.cycles():
+        return None
+
+    estimates = estimate_durations(jobs, timings, default)
+    durations = {name: minutes for name, (minutes, _) in estimates.items()}
+    latency, path = graph.critical_path(durations)
+
+    unused = graph.unused_dependencies()
+    parallelizable = []
+    for edge in unused:
+        shorter, _ = graph.critical_path(durations, skip_edges=[edge])
+        parallelizable.append(edge + (latency - shorter,))
+    parallelizable.sort(key=lambda item: -item[2])
+    unconstrained, _ = graph.critical_path(durations, skip_edges=unused)
+
+    return PipelineAnalysis(
+        latency=latency,
+        unconstrained=unconstrained,
+        serial=sum(durations.values()),
+        critical_path=path,
+        estimates=estimates,
+        parallelizable=parallelizable,
+        gates=graph.gates(),
+    )
@@ -2,8 +2,8 @@
 Core data models for ci-sanity.
 """
 
-from typing import Optional
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from dataclasses import asdict, dataclass, field
 
 @dataclass
 class Issue:
@@ -15,6 +15,8 @@ class Issue:
     message: str
     fix: str
     line: Optional[int] = None
+    column: Optional[int] = None
+    rule: Optional[str] = None
 
     def is_error(self) -> bool:
         """check if this is an error (vs warning)."""
@@ -24,8 +26,31 @@ class Issue:
         """check if this is an warning."""
         return self.severity == 'warning'
 
+    def to_dict(self) -> Dict[str, Any]:
+        """plain dict of every field, for JSON output."""
+        return asdict(self)
+
+@dataclass
+class ScanResult:
+    """Issues from a scan, and the files it stopped before checking."""
+    issues: List[Issue] = field(default_factory=list)
+    checked: int = 0
+    skipped: List[str] = field(default_factory=list)
+    stopped: Optional[str] = None # 'fail-fast' or 'time-budget'
+    suppressed: int = 0
+    exit_code: int = 0
+
+    @property
+    def complete(self) -> bool:
+        """check if every file was checked."""
+        return not self.skipped
+
 class Colors:
-    """Terminal color codes."""
+    """Terminal color codes.
+
+    The class itself is the colored palette; Colors(enabled=False) is a
+    palette with every code blank, for non-TTY output.
+    """
     RED = '\033[91m'
     YELLOW = '\033[93m'
     GREEN = '\033[92m'
@@ -34,13 +59,16 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
+    CODES = ('RED', 'YELLOW', 'GREEN', 'BLUE', 'GRAY', 'BOLD', 'END')
+
+    def __init__(self, enabled: bool = True):
+        """Create a palette, blank when disabled."""
+        if not enabled:
+            for name in self.CODES:
+                setattr(self, name, '')
+
     @classmethod
     def disable(cls):
-        """Disable colors (for non-TTY output)."""
-        cls.RED = ''
-        cls.YELLOW = ''
-        cls.GREEN = ''
-        cls.BLUE = ''
-        cls.GRAY = ''
-        cls.BLOD = ''
-        cls.END = ''
\ No newline at end of file
+        """Disable colors globally (prefer Colors(enabled=False))."""
+        for name in cls.CODES:
+            setattr(cls, name, '')
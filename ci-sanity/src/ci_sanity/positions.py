@@ -0,0 +1,120 @@
+"""
+Source positions for workflow data.
+
+The document is composed once with node marks; a flat side-table maps
+key paths such as ('jobs', 'build', 'steps', 2) to a packed line and
+column, while rules keep working on plain Python data.
+"""
+
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Tuple
+
+import yaml
+from yaml.nodes import MappingNode, SequenceNode, ScalarNode
+
+from ci_sanity.models import Issue
+
+
+# jobs / <job> / steps / <index> / <key>
+DEFAULT_MAX_DEPTH = 5
+
+_COLUMN_BITS = 20
+_COLUMN_MASK = (1 << _COLUMN_BITS) - 1
+
+Path = Tuple[Any, ...]
+
+
+class PositionIndex:
+    """Maps key paths to 1-based (line, column) positions."""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH):
+        self.max_depth = max_depth
+        self._positions: Dict[Path, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def set(self, path: Path, mark: Any):
+        """Record the position of a YAML mark for path."""
+        self._positions[path] = ((mark.line + 1) << _COLUMN_BITS) | (mark.column + 1)
+
+    def get(self, *path: Any) -> Optional[Tuple[int, int]]:
+        """Return (line, column) for a key path, or None if unknown."""
+        packed = self._positions.get(path)
+        if packed is None:
+            return None
+        return packed >> _COLUMN_BITS, packed & _COLUMN_MASK
+
+    def add_node(self, node: Any, prefix: Path = ()) -> List[Path]:
+        """Index a composed node's keys and items below prefix."""
+        added: List[Path] = []
+        if node is not None and len(prefix) < self.max_depth:
+            self._walk(node, prefix, added)
+        return added
+
+    def _walk(self, node: Any, prefix: Path, added: List[Path]):
+        depth = len(prefix) + 1
+        if isinstance(node, MappingNode):
+            for key_node, value_node in node.value:
+                if not isinstance(key_node, ScalarNode):
+                    continue
+                path = prefix + (key_node.value,)
+                self.set(path, key_node.start_mark)
+                added.append(path)
+                if depth < self.max_depth:
+                    self._walk(value_node, path, added)
+        elif isinstance(node, SequenceNode):
+            for i, item in enumerate(node.value):
+                path = prefix + (i,)
+                self.set(path, item.start_mark)
+                added.append(path)
+                if depth < self.max_depth:
+                    self._walk(item, path, added)
+
+    def discard(self, paths: List[Path], keep_depth: int = 0):
+        """Forget positions deeper than keep_depth among paths."""
+        for path in paths:
+            if len(path) > keep_depth:
+                self._positions.pop(path, None)
+
+    def locate(self, job: Any, step: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """Best position for a job (and step): GitHub layout first, then GitLab."""
+        if step is not None:
+            position = self.get('jobs', job, 'steps', step)
+            if position is not None:
+                return position
+        return self.get('jobs', job) or self.get(job)
+
+    def annotate(self, issues: List[Issue]) -> List[Issue]:
+        """Fill in line and column for issues that have none."""
+        for issue in issues:
+            if issue.line is not None:
+                continue
+            position = self.locate(issue.job, issue.step)
+            if position is not None:
+                issue.line, issue.column = position
+        return issues
+
+
+# Index for the document currently being checked (per thread / context)
+current_positions: ContextVar[Optional[PositionIndex]] = ContextVar(
+    'current_positions', default=None
+)
+
+
+def load_with_positions(
+    stream,
+    loader_cls=yaml.SafeLoader,
+    index: Optional[PositionIndex] = None
+) -> Tuple[Any, PositionIndex]:
+    """Parse a single YAML document, returning its data and position index."""
+    if index is None:
+        index = PositionIndex()
+    loader = loader_cls(stream)
+    try:
+        node = loader.get_single_node()
+        index.add_node(node)
+        data = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+    return data, index
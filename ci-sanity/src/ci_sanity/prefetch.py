@@ -0,0 +1,60 @@
+"""
+Concurrent file prefetching for ci-sanity.
+
+Reads run on a thread pool ahead of the parse/rule stage, so on
+high-latency storage (NFS, network mounts) waiting on I/O overlaps with
+checking instead of adding to it.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+# (path, text or None, read error or None)
+Prefetched = Tuple[str, Optional[str], Optional[Exception]]
+
+
+def read_text(path: str) -> Tuple[Optional[str], Optional[Exception]]:
+    """Read a file as UTF-8, returning the error instead of raising it."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read(), None
+    except Exception as e:
+        return None, e
+
+
+def prefetch(paths: Iterable[str], workers: int = 8, depth: int = 32) -> Iterator[Prefetched]:
+    """
+    Yield file contents in input order while later files are being read.
+
+    At most `depth` files are read ahead of the consumer, which bounds
+    memory. Reads not yet started when the consumer stops are cancelled,
+    and reads in flight are left to finish in the background.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield (path,) + read_text(path)
+        return
+
+    pending = deque()
+    path_iter = iter(paths)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ci-sanity-io')
+
+    try:
+        for path in path_iter:
+            pending.append((path, pool.submit(read_text, path)))
+            if len(pending) >= depth:
+                break
+
+        while pending:
+            path, future = pending.popleft()
+            for next_path in path_iter:
+                pending.append((next_path, pool.submit(read_text, next_path)))
+                break
+            yield (path,) + future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        # Do not wait for reads already running when the consumer stops early
+        pool.shutdown(wait=False)
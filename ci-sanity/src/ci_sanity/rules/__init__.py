@@ -4,14 +4,28 @@ Validation rules for ci-sanity.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from ci_sanity.models import Issue
+from ci_sanity.positions import current_positions
+from ci_sanity.expressions import string_references, Reference
+from ci_sanity.shell import Command, script_commands
 
 
 class Rule(ABC):
     """Base class for all validation rules."""
     
+    # Short identifier recorded on issues (used by baselines and summaries)
+    name = 'rule'
+    
+    # Platforms whose workflow files this rule understands
+    platforms = ('github',)
+    
+    # Rules that look across jobs list the job keys they need; streaming
+    # mode keeps only those keys and runs the rule once per workflow.
+    # None means the rule checks each job on its own.
+    cross_job_keys = None
+    
     @abstractmethod
     def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
         """
@@ -26,13 +40,65 @@ class Rule(ABC):
         """
         pass
     
+    def project_job(self, job_name: Any, job_config: Dict[str, Any]) -> Dict[Any, Any]:
+        """What the cross-job check reads of one job, kept by streaming mode.
+        
+        The cross_job_keys by default; rules that need a summary of the
+        rest of the job add it here. Positions inside the job can still be
+        looked up while it is projected.
+        """
+        return {k: v for k, v in job_config.items() if k in self.cross_job_keys}
+    
     def get_jobs(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
         """Helper to safely get jobs from workflow."""
+        # Composite actions keep their steps under runs:, treat that as one job
+        runs = workflow.get('runs')
+        if 'jobs' not in workflow and isinstance(runs, dict):
+            if runs.get('using') == 'composite':
+                return {'composite': runs}
+            return {}
+        
         jobs = workflow.get('jobs', {})
         if not isinstance(jobs, dict):
             return {}
         return jobs
     
+    def position(self, *path: Any) -> Optional[Tuple[int, int]]:
+        """Look up the (line, column) of a key path in the file being checked.
+        
+        Example: self.position('jobs', job_name, 'runs-on')
+        """
+        index = current_positions.get()
+        if index is None:
+            return None
+        return index.get(*path)
+    
+    def expression_references(self, value: Any) -> List[Reference]:
+        """Context references made by ${{ }} expressions anywhere in value.
+        
+        Example: ('secrets', 'TOKEN') or ('needs', 'build', 'outputs', 'v').
+        Parsing is memoized per distinct string.
+        """
+        refs: List[Reference] = []
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                if '${{' in item:
+                    refs.extend(string_references(item))
+            elif isinstance(item, dict):
+                stack.extend(reversed(list(item.values())))
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+        return refs
+    
+    def run_commands(self, step: Dict[str, Any]) -> Tuple[Command, ...]:
+        """Commands of a step's run script, without comments or heredoc bodies.
+        
+        Lexing is memoized per distinct script.
+        """
+        return script_commands(step.get('run'))
+    
     def get_steps(self, job_config: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Helper to safely get steps from job."""
         steps = job_config.get('steps', [])
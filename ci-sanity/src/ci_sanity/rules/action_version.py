@@ -11,6 +11,10 @@ from ci_sanity.rules import Rule
 class ActionVersionRule(Rule):
     """Validates action version pinning."""
     
+    name = 'action-version'
+    
+    platforms = ('github', 'action')
+    
     def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
         """Check for action version issues."""
         issues = []
@@ -35,6 +39,8 @@ class ActionVersionRule(Rule):
                 if uses.startswith('docker://'):
                     continue
                 
+                line, column = self.position('jobs', job_name, 'steps', i, 'uses') or (None, None)
+                
                 # Check for @master or @main
                 if '@master' in uses or '@main' in uses:
                     action_name = uses.split('@')[0]
@@ -46,7 +52,9 @@ class ActionVersionRule(Rule):
                         job=job_name,
                         step=i,
                         message=f'{action_name}{matched_ref} = chaos energy. pin a version.',
-                        fix='use @v3 or a specific commit sha'
+                        fix='use @v3 or a specific commit sha',
+                        line=line,
+                        column=column
                     ))
                     continue
                 
@@ -58,7 +66,9 @@ class ActionVersionRule(Rule):
                         job=job_name,
                         step=i,
                         message=f'action {uses} has no version',
-                        fix='add @v3 or specific version'
+                        fix='add @v3 or specific version',
+                        line=line,
+                        column=column
                     ))
                     continue
         
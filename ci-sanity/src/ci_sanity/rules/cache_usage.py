@@ -0,0 +1,362 @@
+"""
+Dependency cache effectiveness rule.
+"""
+
+import re
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+from ci_sanity.models import Issue
+from ci_sanity.rules import Rule
+from ci_sanity.expressions import Call, Literal, string_expressions, string_references
+from ci_sanity.shell import Command
+
+
+class Ecosystem(NamedTuple):
+    """How one package manager installs, locks and caches dependencies."""
+    name: str
+    # Commands that install, e.g. ('npm', 'ci'); a bare program counts
+    # when it only has options, like `yarn --frozen-lockfile`
+    install: Tuple[Tuple[str, ...], ...]
+    lockfiles: Tuple[str, ...]
+    # Substrings of actions/cache paths that hold this ecosystem's downloads
+    cache_paths: Tuple[str, ...]
+    # (setup action, input, values) whose cache covers this ecosystem
+    setup_cache: Tuple[str, str, Tuple[Any, ...]]
+    fix: str
+
+
+ECOSYSTEMS = (
+    Ecosystem(
+        'npm', (('npm', 'ci'), ('npm', 'install'), ('npm', 'i')),
+        ('package-lock.json', 'npm-shrinkwrap.json'),
+        ('.npm', 'node_modules'),
+        ('actions/setup-node', 'cache', ('npm',)),
+        'add cache: npm to actions/setup-node',
+    ),
+    Ecosystem(
+        'yarn', (('yarn', 'install'), ('yarn',)),
+        ('yarn.lock',),
+        ('yarn', 'node_modules'),
+        ('actions/setup-node', 'cache', ('yarn',)),
+        'add cache: yarn to actions/setup-node',
+    ),
+    Ecosystem(
+        'pnpm', (('pnpm', 'install'), ('pnpm', 'i')),
+        ('pnpm-lock.yaml',),
+        ('pnpm', 'node_modules'),
+        ('actions/setup-node', 'cache', ('pnpm',)),
+        'add cache: pnpm to actions/setup-node',
+    ),
+    Ecosystem(
+        'pip', (('pip', 'install'), ('python', '-m', 'pip', 'install')),
+        ('requirements', 'pyproject.toml', 'setup.py', 'setup.cfg', 'constraints'),
+        ('pip', '.venv', 'venv'),
+        ('actions/setup-python', 'cache', ('pip',)),
+        'add cache: pip to actions/setup-python',
+    ),
+    Ecosystem(
+        'poetry', (('poetry', 'install'),),
+        ('poetry.lock',),
+        ('poetry', '.venv'),
+        ('actions/setup-python', 'cache', ('poetry',)),
+        'add cache: poetry to actions/setup-python',
+    ),
+    Ecosystem(
+        'pipenv', (('pipenv', 'install'), ('pipenv', 'sync')),
+        ('Pipfile.lock',),
+        ('pipenv', '.venv', 'virtualenvs'),
+        ('actions/setup-python', 'cache', ('pipenv',)),
+        'add cache: pipenv to actions/setup-python',
+    ),
+    Ecosystem(
+        'bundler', (('bundle', 'install'),),
+        ('Gemfile.lock', 'gems.locked'),
+        ('vendor/bundle', 'bundle', 'gems'),
+        ('ruby/setup-ruby', 'bundler-cache', (True, 'true')),
+        'use ruby/setup-ruby with bundler-cache: true',
+    ),
+)
+
+CACHE_ACTION = 'actions/cache'
+CACHE_RESTORE = 'actions/cache/restore'
+
+
+def _action(step: Dict[str, Any]) -> str:
+    uses = step.get('uses')
+    return uses.split('@', 1)[0] if isinstance(uses, str) else ''
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else ''
+
+
+def _is_install(command: Command, ecosystem: Ecosystem) -> bool:
+    for prefix in ecosystem.install:
+        if command.startswith(*prefix):
+            options = command.argv[len(prefix):]
+            if len(prefix) > 1 or all(word.startswith('-') for word in options):
+                return True
+    return False
+
+
+def installed_ecosystems(commands: Tuple[Command, ...]) -> List[Ecosystem]:
+    """Ecosystems whose install command one of the commands runs."""
+    return [
+        e for e in ECOSYSTEMS
+        if any(_is_install(command, e) for command in commands)
+    ]
+
+
+def _hashed_files(key: str) -> Optional[List[str]]:
+    """Literal hashFiles() arguments in a cache key, or None if it never calls hashFiles."""
+    found = None
+    for _, node in string_expressions(key):
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Call):
+                if item.name == 'hashfiles':
+                    found = found or []
+                    found.extend(a.value for a in item.args
+                                 if isinstance(a, Literal) and isinstance(a.value, str))
+                stack.extend(item.args)
+            elif isinstance(item, tuple):
+                stack.extend(item)
+    return found
+
+
+def _has_step_output(key: str) -> bool:
+    """Check if a cache key uses steps.<id>.outputs.<name>."""
+    return any(len(ref) > 2 and ref[0] == 'steps' and ref[2] == 'outputs'
+               for ref in string_references(key))
+
+
+class CacheRule(Rule):
+    """Checks that dependency installs are cached, and cached well.
+
+    Finds installs with no cache for their package manager, cache keys
+    that ignore the lockfile and caches without restore-keys. The same
+    cache saved by several jobs is found across jobs by SharedCacheRule.
+    """
+
+    name = 'cache'
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check each job's installs and caches."""
+        issues = []
+        jobs = self.get_jobs(workflow)
+
+        for job_name, job_config in jobs.items():
+            if not isinstance(job_config, dict):
+                continue
+
+            steps = self.get_steps(job_config)
+            issues.extend(self._check_installs(steps, job_name, file_path))
+            for i, step in enumerate(steps):
+                if _action(step).startswith(CACHE_ACTION):
+                    issues.extend(self._check_cache_step(step, i, job_name, file_path))
+
+        return issues
+
+    def _check_installs(
+        self,
+        steps: List[Dict[str, Any]],
+        job_name: str,
+        file_path: str
+    ) -> List[Issue]:
+        """Report installs whose package manager has no cache in the job."""
+        issues = []
+        reported = set()
+
+        for i, step in enumerate(steps):
+            for ecosystem in installed_ecosystems(self.run_commands(step)):
+                if ecosystem.name in reported or self._is_cached(ecosystem, steps):
+                    continue
+                reported.add(ecosystem.name)
+                line, column = self.position('jobs', job_name, 'steps', i, 'run') or (None, None)
+                issues.append(Issue(
+                    severity='warning',
+                    file=file_path,
+                    job=job_name,
+                    step=i,
+                    message=f'{ecosystem.name} dependencies are downloaded from scratch on every run',
+                    fix=f'{ecosystem.fix} or cache them with actions/cache',
+                    line=line,
+                    column=column
+                ))
+
+        return issues
+
+    def _is_cached(self, ecosystem: Ecosystem, steps: List[Dict[str, Any]]) -> bool:
+        setup_action, setup_input, setup_values = ecosystem.setup_cache
+        for step in steps:
+            action = _action(step)
+            with_ = step.get('with')
+            if not isinstance(with_, dict):
+                continue
+            if action == setup_action and with_.get(setup_input) in setup_values:
+                return True
+            if action.startswith(CACHE_ACTION) and ecosystem in self._cached_ecosystems(with_):
+                return True
+        return False
+
+    def _cached_ecosystems(self, with_: Dict[str, Any]) -> List[Ecosystem]:
+        """Ecosystems an actions/cache step holds, judged by its paths and key."""
+        paths = _text(with_.get('path'))
+        key = _text(with_.get('key'))
+        hashed = ' '.join(_hashed_files(key) or [])
+        return [
+            e for e in ECOSYSTEMS
+            if any(p in paths for p in e.cache_paths) or any(f in hashed for f in e.lockfiles)
+        ]
+
+    def _check_cache_step(
+        self,
+        step: Dict[str, Any],
+        i: int,
+        job_name: str,
+        file_path: str
+    ) -> List[Issue]:
+        """Check an actions/cache step's key and restore-keys."""
+        with_ = step.get('with')
+        key = with_.get('key') if isinstance(with_, dict) else None
+        if not isinstance(key, str):
+            return []
+
+        issues = []
+        line, column = self.position('jobs', job_name, 'steps', i, 'with', 'key') or (None, None)
+        hashed = _hashed_files(key)
+
+        ecosystems = self._cached_ecosystems({'path': with_.get('path')})
+
+        if hashed is None:
+            if '${{' not in key:
+                issues.append(Issue(
+                    severity='warning',
+                    file=file_path,
+                    job=job_name,
+                    step=i,
+                    message='cache key never changes, so the cache goes stale when dependencies change',
+                    fix="add ${{ hashFiles('<lockfile>') }} to the key",
+                    line=line,
+                    column=column
+                ))
+            elif ecosystems and not _has_step_output(key):
+                # e.g. npm-${{ runner.os }}; a key computed by an earlier
+                # step may well hash the lockfile itself
+                issues.append(Issue(
+                    severity='warning',
+                    file=file_path,
+                    job=job_name,
+                    step=i,
+                    message='cache key does not hash the lockfile, so the cache goes stale when dependencies change',
+                    fix=f"add ${{{{ hashFiles('{ecosystems[0].lockfiles[0]}') }}}} to the key",
+                    line=line,
+                    column=column
+                ))
+            return issues
+
+        joined = ' '.join(hashed)
+        missing = [e for e in ecosystems if not any(f in joined for f in e.lockfiles)]
+        if ecosystems and len(missing) == len(ecosystems):
+            issues.append(Issue(
+                severity='warning',
+                file=file_path,
+                job=job_name,
+                step=i,
+                message=f'cache key hashes {", ".join(hashed) or "nothing"} but not the lockfile',
+                fix=f"hash {missing[0].lockfiles[0]} in the key",
+                line=line,
+                column=column
+            ))
+
+        if _action(step) == CACHE_ACTION and not with_.get('restore-keys'):
+            issues.append(Issue(
+                severity='warning',
+                file=file_path,
+                job=job_name,
+                step=i,
+                message='cache has no restore-keys, so every lockfile change starts cold',
+                fix='add restore-keys with the key minus its hashFiles() part',
+                line=line,
+                column=column
+            ))
+
+        return issues
+
+
+# Projected jobs keep the caches they save under this key
+SAVED_CACHES = object()
+
+# ((path, key), step, position of the step)
+SavedCache = Tuple[Tuple[str, str], int, Optional[Tuple[int, int]]]
+
+
+class SharedCacheRule(Rule):
+    """Finds the same cache saved by several jobs, where only one save wins.
+
+    Streaming mode keeps the caches each job saves and checks them once
+    every job has been read.
+    """
+
+    # Reported with the other cache checks
+    name = 'cache'
+
+    cross_job_keys = ()
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check caches saved with the same path and key across jobs."""
+        issues = []
+        # (path, key) -> (job, step, position) saving that cache
+        saved: Dict[Tuple[str, str], List[Tuple[str, int, Optional[Tuple[int, int]]]]] = {}
+
+        for job_name, job_config in self.get_jobs(workflow).items():
+            if not isinstance(job_config, dict):
+                continue
+            caches = job_config.get(SAVED_CACHES)
+            if caches is None:
+                caches = self._saved_caches(job_name, job_config)
+            for cache, i, position in caches:
+                saved.setdefault(cache, []).append((job_name, i, position))
+
+        for (_, key), users in saved.items():
+            names = list(dict.fromkeys(job for job, _, _ in users))
+            if len(names) < 2:
+                continue
+            job, i, position = users[-1]
+            line, column = position or (None, None)
+            issues.append(Issue(
+                severity='warning',
+                file=file_path,
+                job=job,
+                step=i,
+                message=f'jobs {", ".join(names)} all save the same cache {key}; only one save wins',
+                fix='save it from one job and use actions/cache/restore in the others',
+                line=line,
+                column=column
+            ))
+
+        return issues
+
+    def project_job(self, job_name: Any, job_config: Dict[str, Any]) -> Dict[Any, Any]:
+        """Keep only the caches the job saves."""
+        return {SAVED_CACHES: self._saved_caches(job_name, job_config)}
+
+    def _saved_caches(self, job_name: Any, job_config: Dict[str, Any]) -> List[SavedCache]:
+        """actions/cache steps saving a cache whose key is the same in every job."""
+        caches = []
+        for i, step in enumerate(self.get_steps(job_config)):
+            action = _action(step)
+            with_ = step.get('with')
+            if not action.startswith(CACHE_ACTION) or action == CACHE_RESTORE:
+                continue
+            if not isinstance(with_, dict):
+                continue
+            cache = (_text(with_.get('path')).strip(), _text(with_.get('key')).strip())
+            if all(cache) and self._shared_key(cache[1]):
+                caches.append((cache, i, self.position('jobs', job_name, 'steps', i)))
+        return caches
+
+    def _shared_key(self, key: str) -> bool:
+        """A key that stays the same from job to job."""
+        return not re.search(r'\b(?:matrix|github\.job|strategy)\b', key)
@@ -0,0 +1,253 @@
+"""
+Expression and context reference validation rule.
+"""
+
+from typing import Iterator, List, Dict, Any, Optional, Set, Tuple
+
+from ci_sanity.models import Issue
+from ci_sanity.rules import Rule
+from ci_sanity.expressions import (
+    CONTEXTS, Invalid, Reference, expression_references, parse_expression,
+    string_expressions,
+)
+
+
+def _expressions(value: Any) -> Iterator[Tuple[str, Any]]:
+    """(source, parsed node) for every expression in value.
+
+    if: conditions count even when written without ${{ }}.
+    """
+    stack = [(None, value)]
+    while stack:
+        key, item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(reversed(list(item.items())))
+        elif isinstance(item, list):
+            stack.extend((None, i) for i in reversed(item))
+        elif isinstance(item, str):
+            if key == 'if' and '${{' not in item:
+                yield item.strip(), parse_expression(item.strip())
+            elif '${{' in item:
+                yield from string_expressions(item)
+
+
+def _job_targets(
+    job_config: Dict[str, Any],
+    steps: List[Dict[str, Any]]
+) -> List[Tuple[Optional[int], Any]]:
+    """Job-level keys first, then each step on its own."""
+    job_values = {k: v for k, v in job_config.items() if k != 'steps'}
+    return [(None, job_values)] + list(enumerate(steps))
+
+
+def _needs(job_config: Dict[str, Any]) -> Set[str]:
+    needs = job_config.get('needs') or []
+    if isinstance(needs, str):
+        needs = [needs]
+    if not isinstance(needs, (list, dict)):
+        return set()
+    return {n for n in needs if isinstance(n, str)}
+
+
+class ContextReferenceRule(Rule):
+    """Validates ${{ }} expressions and the needs/matrix contexts they use.
+
+    Whether a needed job has the outputs used is checked across jobs by
+    NeedsOutputsRule.
+    """
+
+    name = 'context-refs'
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check expressions in every job."""
+        issues = []
+        jobs = self.get_jobs(workflow)
+
+        for job_name, job_config in jobs.items():
+            if not isinstance(job_config, dict):
+                continue
+
+            needs = _needs(job_config)
+            matrix_keys = self._matrix_keys(job_config)
+
+            for step, value in _job_targets(job_config, self.get_steps(job_config)):
+                refs = self._check_syntax(value, job_name, step, file_path, issues)
+                for ref in refs:
+                    issue = self._check_reference(ref, needs, matrix_keys)
+                    if issue is not None:
+                        message, fix, severity = issue
+                        issues.append(Issue(
+                            severity=severity,
+                            file=file_path,
+                            job=job_name,
+                            step=step,
+                            message=message,
+                            fix=fix
+                        ))
+
+        return issues
+
+    def _matrix_keys(self, job_config: Dict[str, Any]) -> Optional[Set[str]]:
+        """Keys defined by the job's matrix, or None if it cannot be known."""
+        strategy = job_config.get('strategy')
+        if strategy is None:
+            return set()
+        if not isinstance(strategy, dict):
+            return None
+        matrix = strategy.get('matrix')
+        if matrix is None:
+            return set()
+        if not isinstance(matrix, dict):
+            # e.g. matrix: ${{ fromJSON(needs.setup.outputs.matrix) }}
+            return None
+
+        keys = {k for k in matrix if k not in ('include', 'exclude')}
+        include = matrix.get('include')
+        if isinstance(include, str):
+            return None
+        for entry in include or []:
+            if isinstance(entry, dict):
+                keys.update(entry)
+        return keys
+
+    def _check_syntax(
+        self,
+        value: Any,
+        job: str,
+        step: Optional[int],
+        file: str,
+        issues: List[Issue]
+    ) -> List[Reference]:
+        """Report malformed expressions and return the references found."""
+        refs: List[Reference] = []
+        for src, node in _expressions(value):
+            if isinstance(node, Invalid):
+                issues.append(Issue(
+                    severity='error',
+                    file=file,
+                    job=job,
+                    step=step,
+                    message=f'invalid expression ${{{{ {src} }}}}: {node.message}',
+                    fix='fix the expression syntax'
+                ))
+            else:
+                refs.extend(expression_references(src))
+        return refs
+
+    def _check_reference(
+        self,
+        ref: Reference,
+        needs: Set[str],
+        matrix_keys: Optional[Set[str]]
+    ):
+        """Return (message, fix, severity) for a bad reference, else None."""
+        context = ref[0]
+        if context not in CONTEXTS:
+            return (
+                f'unknown context {context}',
+                f'use one of: {", ".join(sorted(CONTEXTS))}',
+                'error'
+            )
+
+        if context == 'needs' and len(ref) > 1:
+            target = ref[1]
+            if target not in needs:
+                return (
+                    f'needs.{target} is used but the job does not need {target}',
+                    f'add {target} to needs',
+                    'error'
+                )
+
+        if context == 'matrix' and len(ref) > 1 and matrix_keys is not None:
+            if ref[1] not in matrix_keys:
+                if not matrix_keys:
+                    message = f'matrix.{ref[1]} is used but the job has no matrix'
+                else:
+                    message = f'matrix.{ref[1]} is not defined in the job matrix'
+                return (message, 'define the key under strategy.matrix', 'error')
+
+        return None
+
+
+# Projected jobs keep their output references under this key
+OUTPUT_REFERENCES = object()
+
+# (step, needed job, output name, position of the job or step)
+OutputReference = Tuple[Optional[int], str, str, Optional[Tuple[int, int]]]
+
+
+class NeedsOutputsRule(Rule):
+    """Checks that needs.<job>.outputs.<name> names an output the job declares.
+
+    Streaming mode keeps each job's outputs and the output references
+    it makes, then checks them once every job has been read.
+    """
+
+    # Reported with the other expression checks, as it always was
+    name = 'context-refs'
+
+    cross_job_keys = ('needs', 'outputs')
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check every output reference against the outputs of the job it needs."""
+        issues = []
+        jobs = self.get_jobs(workflow)
+
+        for job_name, job_config in jobs.items():
+            if not isinstance(job_config, dict):
+                continue
+
+            refs = job_config.get(OUTPUT_REFERENCES)
+            if refs is None:
+                refs = self._output_references(job_name, job_config)
+            needs = _needs(job_config)
+
+            for step, target, output, position in refs:
+                target_job = jobs.get(target)
+                if target not in needs or not isinstance(target_job, dict):
+                    continue
+                # A job with no outputs key declares none
+                outputs = target_job.get('outputs')
+                if outputs is None:
+                    outputs = {}
+                if not isinstance(outputs, dict) or output in outputs:
+                    continue
+                line, column = position or (None, None)
+                issues.append(Issue(
+                    severity='warning',
+                    file=file_path,
+                    job=job_name,
+                    step=step,
+                    message=f'job {target} has no output {output}',
+                    fix=f'add {output} to outputs of {target}',
+                    line=line,
+                    column=column
+                ))
+
+        return issues
+
+    def project_job(self, job_name: Any, job_config: Dict[str, Any]) -> Dict[Any, Any]:
+        """Keep needs and outputs, plus the output references the job makes."""
+        projected = super().project_job(job_name, job_config)
+        projected[OUTPUT_REFERENCES] = self._output_references(job_name, job_config)
+        return projected
+
+    def _output_references(
+        self,
+        job_name: Any,
+        job_config: Dict[str, Any]
+    ) -> List[OutputReference]:
+        refs = []
+        for step, value in _job_targets(job_config, self.get_steps(job_config)):
+            position = None
+            if step is not None:
+                position = self.position('jobs', job_name, 'steps', step)
+            position = position or self.position('jobs', job_name)
+
+            for src, node in _expressions(value):
+                if isinstance(node, Invalid):
+                    continue
+                for ref in expression_references(src):
+                    if len(ref) > 3 and ref[0] == 'needs' and ref[2] == 'outputs':
+                        refs.append((step, ref[1], ref[3], position))
+        return refs
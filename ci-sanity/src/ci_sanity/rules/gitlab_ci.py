@@ -0,0 +1,65 @@
+"""
+GitLab CI pipeline validation rule.
+"""
+
+from typing import List, Dict, Any
+
+from ci_sanity.models import Issue
+from ci_sanity.rules import Rule
+from ci_sanity.gitlab import GitLabPipeline, IncludeCache, current_includes
+
+
+class GitLabRule(Rule):
+    """Validates GitLab CI jobs, stages, extends and includes."""
+
+    name = 'gitlab-ci'
+
+    platforms = ('gitlab',)
+
+    def __init__(self, include_cache: IncludeCache = None):
+        """Initialize with an include cache shared across pipelines."""
+        self.include_cache = include_cache or IncludeCache()
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check a GitLab pipeline for issues."""
+        issues = []
+        if not isinstance(workflow, dict):
+            return issues
+
+        includes, root = current_includes.get() or (self.include_cache, None)
+        pipeline = GitLabPipeline(workflow, file_path, includes, root)
+
+        for problem in pipeline.problems:
+            issues.append(Issue(
+                severity=problem.severity,
+                file=file_path,
+                job=problem.job,
+                step=None,
+                message=problem.message,
+                fix=problem.fix
+            ))
+
+        stages = pipeline.stages
+        for job_name, job in pipeline.jobs.items():
+            stage = job.get('stage', 'test')
+            if isinstance(stage, str) and stage not in stages:
+                issues.append(Issue(
+                    severity='error',
+                    file=file_path,
+                    job=job_name,
+                    step=None,
+                    message=f'stage {stage} is not declared in stages',
+                    fix=f'add {stage} to stages or fix the stage name'
+                ))
+
+            if not any(k in job for k in ('script', 'trigger', 'run')):
+                issues.append(Issue(
+                    severity='error',
+                    file=file_path,
+                    job=job_name,
+                    step=None,
+                    message='job has no script',
+                    fix='add script: or extends: a template that has one'
+                ))
+
+        return issues
@@ -0,0 +1,52 @@
+"""
+Job dependency graph validation rule.
+"""
+
+from typing import List, Dict, Any
+
+from ci_sanity.models import Issue
+from ci_sanity.rules import Rule
+from ci_sanity.jobgraph import JobGraph
+
+
+class JobGraphRule(Rule):
+    """Validates the `needs:` graph: undefined targets and cycles."""
+
+    name = 'job-graph'
+
+    cross_job_keys = ('needs',)
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Check needs across all jobs of the workflow."""
+        issues = []
+        jobs = self.get_jobs(workflow)
+        graph = JobGraph(jobs)
+
+        for job, target in graph.undefined_needs():
+            line, column = self.position('jobs', job, 'needs') or (None, None)
+            issues.append(Issue(
+                severity='error',
+                file=file_path,
+                job=job,
+                step=None,
+                message=f'needs {target}, but there is no job {target}',
+                fix=f'define job {target} or remove it from needs',
+                line=line,
+                column=column
+            ))
+
+        for cycle in graph.cycles():
+            job = cycle[0]
+            line, column = self.position('jobs', job, 'needs') or (None, None)
+            issues.append(Issue(
+                severity='error',
+                file=file_path,
+                job=job,
+                step=None,
+                message=f'jobs depend on each other in a cycle: {" → ".join(cycle)}',
+                fix='remove one of the needs entries in the cycle',
+                line=line,
+                column=column
+            ))
+
+        return issues
@@ -2,16 +2,19 @@
 Runner compatibility validation rule.
 """
 
-from typing import List, Dict, Any, Set
-import re
+from typing import List, Dict, Any, Set, Optional
 
 from ci_sanity.models import Issue
 from ci_sanity.rules import Rule
+from ci_sanity.shell import find_command
+from ci_sanity.expressions import string_expressions, Property, Name
 
 
 class RunnerCompatibilityRule(Rule):
     """Validates runner configuration and compatibility."""
     
+    name = 'runner-compat'
+    
     VALID_GITHUB_RUNNERS: Set[str] = {
         'ubuntu-latest', 'ubuntu-22.04', 'ubuntu-20.04',
         'windows-latest', 'windows-2022', 'windows-2019',
@@ -62,28 +65,22 @@ class RunnerCompatibilityRule(Rule):
 
             # Normalize runners_list to only strings and skip templated entries
             runners_list = [r for r in runners_list if isinstance(r, str)]
+            templated = [r for r in runners_list if r.strip().startswith('${{')]
             runners_list = [r for r in runners_list if not r.strip().startswith('${{')]
 
-            # If runs-on is a list-like configuration, accept it if it contains
-            # a self-hosted entry (exact or prefixed), otherwise validate
-            # that at least one listed runner is in the known set.
-            has_self_hosted = (
-                any(r == 'self-hosted' for r in runners_list) or
-                any(r.startswith('self-hosted') for r in runners_list)
-            )
-
-            if not has_self_hosted:
-                # If none are self-hosted, require at least one known runner
-                if not any(r in self.VALID_GITHUB_RUNNERS for r in runners_list):
-                    # Report unknown runner(s)
-                    issues.append(Issue(
-                        severity='warning',
-                        file=file_path,
-                        job=job_name,
-                        step=None,
-                        message=f'unknown runner list: {runners_list}',
-                        fix='use ubuntu-latest, windows-latest, or macos-latest'
-                    ))
+            if templated and not runners_list:
+                # Fully templated: resolve ${{ matrix.x }} from the job's matrix
+                runners_list = self._matrix_runners(job_config, templated)
+                if runners_list is None:
+                    # Comes from an expression we cannot resolve statically
+                    continue
+                issues.extend(
+                    self._check_matrix_runners(runners_list, job_name, file_path)
+                )
+            else:
+                issues.extend(
+                    self._check_runner_labels(runners_list, job_name, file_path)
+                )
 
             # Only run docker-on-windows checks when any string label contains 'windows'
             if any('windows' in r.lower() for r in runners_list):
@@ -93,6 +90,94 @@ class RunnerCompatibilityRule(Rule):
         
         return issues
     
+    def _is_known(self, runners_list: List[str]) -> bool:
+        """Accept a self-hosted entry (exact or prefixed) or any known label."""
+        has_self_hosted = any(r.startswith('self-hosted') for r in runners_list)
+        return has_self_hosted or any(r in self.VALID_GITHUB_RUNNERS for r in runners_list)
+    
+    def _check_runner_labels(
+        self,
+        runners_list: List[str],
+        job_name: str,
+        file_path: str
+    ) -> List[Issue]:
+        """Check a runs-on label list has a known or self-hosted runner."""
+        if self._is_known(runners_list):
+            return []
+        
+        # Report unknown runner(s) at the runs-on key
+        line, column = self.position('jobs', job_name, 'runs-on') or (None, None)
+        return [Issue(
+            severity='warning',
+            file=file_path,
+            job=job_name,
+            step=None,
+            message=f'unknown runner list: {runners_list}',
+            fix='use ubuntu-latest, windows-latest, or macos-latest',
+            line=line,
+            column=column
+        )]
+    
+    def _matrix_runners(
+        self,
+        job_config: Dict[str, Any],
+        templated: List[str]
+    ) -> Optional[List[str]]:
+        """Expand ${{ matrix.key }} runs-on entries into the matrix values."""
+        strategy = job_config.get('strategy')
+        matrix = strategy.get('matrix') if isinstance(strategy, dict) else None
+        if not isinstance(matrix, dict):
+            return None
+        
+        values: List[str] = []
+        for label in templated:
+            label = label.strip()
+            expressions = string_expressions(label)
+            if len(expressions) != 1 or not label.endswith('}}'):
+                return None
+            node = expressions[0][1]
+            if not (isinstance(node, Property) and node.obj == Name('matrix')):
+                return None
+            
+            key = node.name
+            candidates = matrix.get(key, [])
+            if not isinstance(candidates, list):
+                return None
+            include = matrix.get('include') or []
+            if isinstance(include, list):
+                candidates = candidates + [
+                    entry[key] for entry in include
+                    if isinstance(entry, dict) and key in entry
+                ]
+            if not candidates or not all(isinstance(c, str) for c in candidates):
+                return None
+            values.extend(candidates)
+        
+        return list(dict.fromkeys(values))
+    
+    def _check_matrix_runners(
+        self,
+        runners_list: List[str],
+        job_name: str,
+        file_path: str
+    ) -> List[Issue]:
+        """Each matrix value is its own runs-on, so each must be known."""
+        unknown = [r for r in runners_list if not self._is_known([r])]
+        if not unknown:
+            return []
+        
+        line, column = self.position('jobs', job_name, 'runs-on') or (None, None)
+        return [Issue(
+            severity='warning',
+            file=file_path,
+            job=job_name,
+            step=None,
+            message=f'unknown runner in matrix: {unknown}',
+            fix='use ubuntu-latest, windows-latest, or macos-latest',
+            line=line,
+            column=column
+        )]
+    
     def _check_docker_on_windows(
         self, 
         job_config: Dict[str, Any], 
@@ -103,8 +188,10 @@ class RunnerCompatibilityRule(Rule):
         issues = []
         steps = self.get_steps(job_config)
         
-        # Prepare regex for docker CLI operations (case-insensitive)
-        docker_cli_re = re.compile(r'(?i)(^|\s)docker\s+(run|build|compose|login|pull|push)\b')
+        # Docker CLI operations that need a daemon
+        docker_commands = [
+            ('docker', sub) for sub in ('run', 'build', 'compose', 'login', 'pull', 'push')
+        ]
 
         # Known actions that require Docker daemon (explicit identifiers)
         known_docker_actions = {
@@ -113,26 +200,14 @@ class RunnerCompatibilityRule(Rule):
             'docker/setup-buildx-action',
         }
 
-        for i, step in enumerate(steps):
-            uses = step.get('uses', '') or ''
-            run = step.get('run', '') or ''
-
-            # Detect a job-level container declaration (once, outside loop)
+        # Detect a job-level container declaration (once, outside loop)
         has_container = bool(job_config.get('container')) or ('container' in job_config)
 
         for i, step in enumerate(steps):
             uses = step.get('uses', '') or ''
-            run = step.get('run', '') or ''
 
-            # Detect docker CLI usage in non-comment lines
-            found_docker_cli = False
-            for line in str(run).splitlines():
-                stripped = line.lstrip()
-                if not stripped or stripped.startswith('#'):
-                    continue
-                if docker_cli_re.search(line):
-                    found_docker_cli = True
-                    break
+            # Detect docker CLI usage outside comments and strings
+            found_docker_cli = find_command(self.run_commands(step), *docker_commands) is not None
 
             # Detect known docker actions by checking explicit action ids
             uses_lower = uses.lower()
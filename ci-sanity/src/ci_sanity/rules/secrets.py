@@ -2,7 +2,6 @@
 Secrets validation rule.
 """
 
-import re
 from typing import List, Dict, Any, Set, Optional
 
 from ci_sanity.models import Issue
@@ -12,7 +11,7 @@ from ci_sanity.rules import Rule
 class SecretsRule(Rule):
     """Validates secret references."""
     
-    SECRET_PATTERN = re.compile(r'\$\{\{\s*secrets\.(\w+)\s*\}\}')
+    name = 'secrets'
     
     def __init__(self, declared_secrets: List[str]):
         """Initialize with list of declared secrets."""
@@ -95,7 +94,10 @@ class SecretsRule(Rule):
         issues: List[Issue]
     ):
         """Check string for secret references."""
-        matches = self.SECRET_PATTERN.findall(s)
+        matches = [
+            ref[1] for ref in self.expression_references(s)
+            if ref[0] == 'secrets' and len(ref) > 1
+        ]
         
         for secret_name in matches:
             if secret_name not in self.declared_secrets:
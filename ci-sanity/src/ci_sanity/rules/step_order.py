@@ -6,11 +6,14 @@ from typing import List, Dict, Any
 
 from ci_sanity.models import Issue
 from ci_sanity.rules import Rule
+from ci_sanity.rules.cache_usage import installed_ecosystems
 
 
 class StepOrderRule(Rule):
     """Validates logical step ordering."""
     
+    name = 'step-order'
+    
     def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
         """Check for step order issues."""
         issues = []
@@ -83,20 +86,9 @@ class StepOrderRule(Rule):
         issues = []
         steps = self.get_steps(job_config)
         
-        install_commands = [
-            'npm install',
-            'npm ci',
-            'yarn install',
-            'pip install',
-            'poetry install',
-            'bundle install',
-        ]
-        
         for i, step in enumerate(steps):
-            run = step.get('run', '')
-            
-            # Check if this is an install step
-            is_install = any(cmd in run.lower() for cmd in install_commands)
+            # Check if this is an install step, for any package manager
+            is_install = bool(installed_ecosystems(self.run_commands(step)))
             
             if is_install:
                 # Look for cache after this
@@ -0,0 +1,141 @@
+"""
+Workflow schema validation rule.
+"""
+
+import difflib
+from typing import List, Dict, Any, Optional, Tuple
+
+from ci_sanity.models import Issue
+from ci_sanity.rules import Rule
+from ci_sanity.schema import Violation, workflow_validator
+
+
+TYPE_NAMES = {
+    'object': 'a mapping',
+    'array': 'a list',
+    'string': 'a string',
+    'number': 'a number',
+    'integer': 'an integer',
+    'boolean': 'true or false',
+    'null': 'empty',
+}
+
+
+class WorkflowSchemaRule(Rule):
+    """Validates workflows against the bundled GitHub Actions schema.
+
+    Catches misspelled and misplaced keys (with suggestions), wrong
+    value types and invalid enum values. Values that are ${{ }}
+    expressions are accepted wherever they appear.
+    """
+
+    name = 'schema'
+
+    def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
+        """Validate the whole document."""
+        if not isinstance(workflow, dict):
+            return []
+
+        # YAML 1.1 reads a bare `on:` key as true
+        if True in workflow and 'on' not in workflow:
+            workflow = {('on' if k is True else k): v for k, v in workflow.items()}
+
+        violations = workflow_validator()(workflow)
+        return [
+            issue for issue in (self._issue(v, violations, file_path) for v in violations)
+            if issue is not None
+        ]
+
+    def _issue(
+        self,
+        violation: Violation,
+        violations: List[Violation],
+        file_path: str
+    ) -> Optional[Issue]:
+        """Turn a violation into an issue, or None if another rule covers it."""
+        path, kind, detail = violation
+        job, step, label = self._locate(path)
+
+        if kind == 'type':
+            if self._is_shape(path):
+                return None
+            expected = ' or '.join(TYPE_NAMES.get(t, t) for t in detail)
+            message = f'{label or "value"} must be {expected}'
+            fix = f'change {label or "it"} to {expected}'
+        elif kind == 'unknown':
+            key = path[-1]
+            where = self._describe(path[:-1])
+            message = f'unknown key {key}{where}'
+            match = self._suggest(key, detail)
+            fix = f'did you mean {match}?' if match else 'remove it or fix the name'
+        elif kind == 'enum':
+            value, allowed = detail
+            message = f'{label or "value"} has invalid value {value}'
+            match = self._suggest(value, allowed)
+            fix = f'did you mean {match}?' if match else f'use one of: {", ".join(map(str, allowed))}'
+        elif kind == 'required':
+            if self._misspelled(detail, path, violations):
+                return None
+            message = f'missing required key {detail}{self._describe(path)}'
+            fix = f'add {detail}'
+        else:
+            return None
+
+        line, column = self.position(*path) or (None, None)
+        return Issue(
+            severity='error',
+            file=file_path,
+            job=job,
+            step=step,
+            message=message,
+            fix=fix,
+            line=line,
+            column=column
+        )
+
+    def _locate(self, path: Tuple[Any, ...]) -> Tuple[str, Optional[int], str]:
+        """Split a path into (job, step index, dotted label of the rest)."""
+        if len(path) >= 2 and path[0] == 'jobs':
+            if len(path) >= 4 and path[2] == 'steps' and isinstance(path[3], int):
+                return str(path[1]), path[3], self._dotted(path[4:])
+            return str(path[1]), None, self._dotted(path[2:])
+        if path:
+            return str(path[0]), None, self._dotted(path)
+        return 'root', None, ''
+
+    def _dotted(self, path: Tuple[Any, ...]) -> str:
+        return '.'.join(f'[{p}]' if isinstance(p, int) else str(p) for p in path).replace('.[', '[')
+
+    def _describe(self, parent: Tuple[Any, ...]) -> str:
+        """' in job build' style suffix naming where a key sits."""
+        _, step, label = self._locate(parent)
+        if parent[:1] == ('jobs',) and len(parent) >= 2:
+            if step is not None:
+                return f' under {label}' if label else ''
+            return f' under {label}' if label else f' in job {parent[1]}'
+        return f' under {self._dotted(parent)}' if parent else ' at top level'
+
+    def _is_shape(self, path: Tuple[Any, ...]) -> bool:
+        """Root, jobs, a job or its steps: YAMLSyntaxRule reports these."""
+        if not path:
+            return True
+        return path[0] == 'jobs' and (len(path) <= 2 or path[2:] == ('steps',))
+
+    def _misspelled(self, key: str, path: Tuple[Any, ...], violations: List[Violation]) -> bool:
+        """A missing key is reported through a sibling that looks like a typo of it."""
+        for where, kind, detail in violations:
+            if kind == 'unknown' and where[:-1] == path and self._suggest(where[-1], (key,)):
+                return True
+        return False
+
+    def _suggest(self, value: Any, choices: Tuple[Any, ...]) -> Optional[str]:
+        """Closest known key or value, normalising - and _ first."""
+        if not isinstance(value, str):
+            return None
+        candidates = [c for c in choices if isinstance(c, str)]
+        normalized = value.lower().replace('_', '-')
+        for candidate in candidates:
+            if candidate.lower() == normalized:
+                return candidate
+        matches = difflib.get_close_matches(normalized, candidates, n=1, cutoff=0.75)
+        return matches[0] if matches else None
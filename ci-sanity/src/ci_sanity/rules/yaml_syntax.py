@@ -9,6 +9,11 @@ from ci_sanity.rules import Rule
 
 class YAMLSyntaxRule(Rule):
     """Validates YAML structure and syntax."""
+
+    name = 'yaml-syntax'
+
+    platforms = ('github', 'gitlab', 'action')
+
     def check(self, workflow: Dict[str, Any], file_path: str) -> List[Issue]:
         """Check for YAML structure issues."""
         issues = []
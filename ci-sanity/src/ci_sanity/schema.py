@@ -0,0 +1,363 @@
+"""
+Compiled JSON-schema validation for GitHub Actions workflows.
+
+The bundled schema is translated once into Python source with one
+specialized function per subschema: type checks become isinstance
+calls, known keys become dict dispatch tables. The resulting code
+object is marshalled into a per-user cache keyed by the schema, the
+compiler version and the interpreter, so later runs skip both the
+translation and the compile.
+
+Only the subset of JSON Schema the bundled schema uses is supported:
+type, enum, properties, patternProperties, additionalProperties,
+required, items, anyOf/oneOf and local $ref. A string containing
+`${{` satisfies every subschema, since its value is only known at run
+time.
+
+Validators return violations as (path, kind, detail) tuples:
+
+    ('type', expected type names)   ('unknown', allowed keys)
+    ('enum', (value, allowed values)) ('required', missing key)
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+import threading
+from importlib.util import MAGIC_NUMBER
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+COMPILER_VERSION = 1
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas')
+WORKFLOW_SCHEMA = os.path.join(SCHEMA_DIR, 'github-workflow.json')
+
+Violation = Tuple[Tuple[Any, ...], str, Any]
+Validator = Callable[[Any], List[Violation]]
+
+_PY_TYPES = {
+    'object': 'dict',
+    'array': 'list',
+    'string': 'str',
+    'boolean': 'bool',
+    'integer': 'int',
+    'number': 'int, float',
+}
+
+_PRELUDE = '''
+import re as _re
+
+
+def _any(value, path, out):
+    pass
+
+
+def _best(path, candidates):
+    """Violations of the alternative that came closest to matching.
+
+    Alternatives whose type matched win, preferring the fewest problems
+    with the value's own keys and then the fewest overall; otherwise
+    report one type violation listing every accepted type.
+    """
+    depth = len(path) + 1
+    matched = [c for c in candidates if not any(v[0] == path and v[1] == 'type' for v in c)]
+    if matched:
+        return min(matched, key=lambda c: (sum(len(v[0]) <= depth for v in c), len(c)))
+    expected = []
+    for candidate in candidates:
+        for where, kind, detail in candidate:
+            if where == path and kind == 'type':
+                expected.extend(t for t in detail if t not in expected)
+    if expected:
+        return [(path, 'type', tuple(expected))]
+    return min(candidates, key=len)
+'''
+
+
+class SchemaError(Exception):
+    """Raised for schema constructs the compiler does not support."""
+
+
+class _Compiler:
+    """Translates a JSON schema into the source of a Python module."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.definitions = schema.get('definitions', {})
+        self.functions: List[str] = []
+        self.tables: List[str] = []
+        self.names: Dict[int, str] = {}
+        self.refs: Dict[str, str] = {}
+
+    def compile(self) -> str:
+        entry = self.function(self.schema)
+        footer = [
+            '',
+            'def validate(value):',
+            '    out = []',
+            f'    {entry}(value, (), out)',
+            '    return out',
+        ]
+        return '\n'.join([_PRELUDE] + self.functions + [''] + self.tables + footer) + '\n'
+
+    def constant(self, prefix: str, source: str) -> str:
+        name = f'_{prefix}{len(self.tables)}'
+        self.tables.append(f'{name} = {source}')
+        return name
+
+    def function(self, schema: Any) -> str:
+        """Name of the function validating schema, generating it on first use."""
+        if schema is True or schema == {}:
+            return '_any'
+        if not isinstance(schema, dict):
+            raise SchemaError(f'unsupported schema: {schema!r}')
+
+        ref = schema.get('$ref')
+        if ref is not None and len(schema) == 1:
+            return self.ref(ref)
+
+        key = id(schema)
+        if key not in self.names:
+            self.names[key] = f'_v{len(self.names)}'
+            self.functions.append(self.body(self.names[key], schema))
+        return self.names[key]
+
+    def ref(self, ref: str) -> str:
+        prefix = '#/definitions/'
+        if not ref.startswith(prefix) or ref[len(prefix):] not in self.definitions:
+            raise SchemaError(f'unsupported $ref: {ref}')
+        name = ref[len(prefix):]
+        if name not in self.refs:
+            target = self.definitions[name]
+            if id(target) in self.names:
+                self.refs[name] = self.names[id(target)]
+            else:
+                # Reserve the name first so recursive definitions terminate
+                self.refs[name] = self.names[id(target)] = f'_v{len(self.names)}'
+                self.functions.append(self.body(self.refs[name], target))
+        return self.refs[name]
+
+    def body(self, name: str, schema: Dict[str, Any]) -> str:
+        lines = [
+            '',
+            f'def {name}(value, path, out):',
+            "    if value.__class__ is str and '${{' in value:",
+            '        return',
+        ]
+
+        if '$ref' in schema:
+            lines.append(f'    {self.ref(schema["$ref"])}(value, path, out)')
+
+        alternatives = schema.get('anyOf') or schema.get('oneOf')
+        if alternatives:
+            checks = ', '.join(self.function(s) for s in alternatives)
+            lines += [
+                '    candidates = []',
+                f'    for check in ({checks},):',
+                '        found = []',
+                '        check(value, path, found)',
+                '        if not found:',
+                '            break',
+                '        candidates.append(found)',
+                '    else:',
+                '        out.extend(_best(path, candidates))',
+                '        return',
+            ]
+
+        types = schema.get('type')
+        if isinstance(types, str):
+            types = [types]
+        if types:
+            lines += [
+                f'    if not ({self.type_test(types)}):',
+                f'        out.append((path, {"type"!r}, {tuple(types)!r}))',
+                '        return',
+            ]
+
+        if 'enum' in schema:
+            values = self.constant('E', f'frozenset({list(schema["enum"])!r})')
+            ordered = self.constant('O', repr(tuple(schema['enum'])))
+            lines += [
+                '    if value.__class__ in (str, int, float, bool) and value not in '
+                f'{values}:',
+                f'        out.append((path, {"enum"!r}, (value, {ordered})))',
+            ]
+
+        lines += self.object_checks(schema, types)
+        lines += self.array_checks(schema, types)
+        return '\n'.join(lines)
+
+    def type_test(self, types: List[str]) -> str:
+        tests = []
+        py_types = [_PY_TYPES[t] for t in types if t in _PY_TYPES]
+        if py_types:
+            test = f'isinstance(value, ({", ".join(py_types)},))'
+            if ('number' in types or 'integer' in types) and 'boolean' not in types:
+                test = f'({test} and value.__class__ is not bool)'
+            tests.append(test)
+        if 'null' in types:
+            tests.append('value is None')
+        unknown = set(types) - set(_PY_TYPES) - {'null'}
+        if unknown:
+            raise SchemaError(f'unsupported types: {sorted(unknown)}')
+        return ' or '.join(tests) or 'True'
+
+    def object_checks(self, schema: Dict[str, Any], types: Optional[List[str]]) -> List[str]:
+        properties = schema.get('properties', {})
+        patterns = schema.get('patternProperties', {})
+        additional = schema.get('additionalProperties', True)
+        required = schema.get('required', [])
+        if not (properties or patterns or additional is not True or required):
+            return []
+
+        lines = []
+        indent = '    '
+        if types != ['object']:
+            lines.append('    if isinstance(value, dict):')
+            indent = '        '
+
+        if additional is False:
+            known = self.constant('K', repr(tuple(properties)))
+            fallback = [f'{indent}    out.append((path + (key,), {"unknown"!r}, {known}))']
+        elif additional is not True:
+            fallback = [f'{indent}    {self.function(additional)}(item, path + (key,), out)']
+        else:
+            fallback = []
+
+        if properties or patterns or fallback:
+            lines.append(f'{indent}for key, item in value.items():')
+
+        if properties:
+            table = self.constant('P', '{%s}' % ', '.join(
+                f'{key!r}: {self.function(sub)}' for key, sub in properties.items()
+            ))
+            lines += [
+                f'{indent}    check = {table}.get(key)',
+                f'{indent}    if check is not None:',
+                f'{indent}        check(item, path + (key,), out)',
+                f'{indent}        continue',
+            ]
+
+        if patterns:
+            pattern_table = self.constant('R', '(%s,)' % ', '.join(
+                f'(_re.compile({pattern!r}), {self.function(sub)})'
+                for pattern, sub in patterns.items()
+            ))
+            lines += [
+                f'{indent}    if key.__class__ is str:',
+                f'{indent}        for regex, check in {pattern_table}:',
+                f'{indent}            if regex.search(key):',
+                f'{indent}                check(item, path + (key,), out)',
+                f'{indent}                break',
+                f'{indent}        else:',
+                f'{indent}            check = None',
+                f'{indent}        if check is not None:',
+                f'{indent}            continue',
+            ]
+
+        if properties or patterns or fallback:
+            lines += fallback or [f'{indent}    pass']
+
+        for key in required:
+            lines += [
+                f'{indent}if {key!r} not in value:',
+                f'{indent}    out.append((path, {"required"!r}, {key!r}))',
+            ]
+        return lines
+
+    def array_checks(self, schema: Dict[str, Any], types: Optional[List[str]]) -> List[str]:
+        items = schema.get('items')
+        if items is None or self.function(items) == '_any':
+            return []
+        check = self.function(items)
+        if types == ['array']:
+            return [
+                '    for i, item in enumerate(value):',
+                f'        {check}(item, path + (i,), out)',
+            ]
+        return [
+            '    if isinstance(value, list):',
+            '        for i, item in enumerate(value):',
+            f'            {check}(item, path + (i,), out)',
+        ]
+
+
+def compile_schema_source(schema: Dict[str, Any]) -> str:
+    """Python source of a module defining validate(value) for schema."""
+    return _Compiler(schema).compile()
+
+
+def cache_dir() -> str:
+    """Directory for compiled validators."""
+    configured = os.environ.get('CI_SANITY_CACHE_DIR')
+    if configured:
+        return configured
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ci-sanity')
+
+
+def _cache_path(schema_bytes: bytes, directory: str) -> str:
+    digest = hashlib.sha1()
+    digest.update(schema_bytes)
+    digest.update(f'{COMPILER_VERSION}'.encode())
+    digest.update(MAGIC_NUMBER)
+    return os.path.join(directory, f'schema-{digest.hexdigest()[:16]}.marshal')
+
+
+def _load_cached(path: str):
+    try:
+        with open(path, 'rb') as f:
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _store_cached(path: str, code) -> None:
+    """Write atomically; a read-only or missing cache is not an error."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(marshal.dumps(code))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+def build_validator(schema_path: str = WORKFLOW_SCHEMA, directory: Optional[str] = None) -> Validator:
+    """Load the compiled validator for a schema file, compiling it if needed."""
+    with open(schema_path, 'rb') as f:
+        schema_bytes = f.read()
+
+    path = _cache_path(schema_bytes, directory or cache_dir())
+    code = _load_cached(path)
+    if code is None:
+        source = compile_schema_source(json.loads(schema_bytes.decode('utf-8')))
+        code = compile(source, f'<schema {os.path.basename(schema_path)}>', 'exec')
+        _store_cached(path, code)
+
+    namespace: Dict[str, Any] = {'__name__': 'ci_sanity._compiled_schema', '__builtins__': __builtins__}
+    exec(code, namespace)
+    return namespace['validate']
+
+
+_validators: Dict[str, Validator] = {}
+_lock = threading.Lock()
+
+
+def workflow_validator() -> Validator:
+    """Process-wide validator for the bundled workflow schema."""
+    validator = _validators.get(WORKFLOW_SCHEMA)
+    if validator is None:
+        with _lock:
+            validator = _validators.get(WORKFLOW_SCHEMA)
+            if validator is None:
+                validator = _validators[WORKFLOW_SCHEMA] = build_validator()
+    return validator
@@ -0,0 +1,238 @@
+"""
+Deterministic sharding of large scans, and mergeable partial results.
+
+`ci-sanity check --shard 2/8` checks only the files whose stable hash
+falls in shard 2 of 8. The hash is over the path relative to the
+scanned directory, so every node agrees on the split without talking
+to the others. With `--shard-by repo`, every file of a repository lands
+in the same shard.
+
+`--partial FILE` writes a shard's issues as compact JSON lines: a
+header naming the issue fields, one array per issue, and a closing
+record with the scan totals. A file without its closing record was cut
+short and is refused. Names ending in `.gz` are gzip-compressed.
+
+    {"partial": 1, "shard": [2, 8], "fields": ["severity", "file", ...]}
+    ["error", ".github/workflows/ci.yml", "build", 0, "...", "...", 12, 5, "schema"]
+    {"checked": 31, "skipped": [], "stopped": null, "suppressed": 0, "exit_code": 2}
+
+`ci-sanity merge` combines the files into one report without checking
+anything again.
+"""
+
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+from ci_sanity.baseline import normalize_path
+from ci_sanity.models import Issue, ScanResult
+
+
+PARTIAL_VERSION = 1
+
+ISSUE_FIELDS = tuple(f.name for f in dataclasses.fields(Issue))
+
+# (index from 1, count)
+Shard = Tuple[int, int]
+
+
+class ShardError(Exception):
+    """Raised for bad shard specs and unusable partial results."""
+
+
+def parse_shard(spec: str) -> Shard:
+    """Parse an `i/N` shard spec, counting from 1."""
+    index, _, count = spec.partition('/')
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ShardError(f'bad shard {spec!r}: use i/N with 1 <= i <= N, e.g. 2/8')
+    return int(index), int(count)
+
+
+def shard_of(key: str, count: int) -> int:
+    """Shard (from 1) a key belongs to; the same on every machine and run."""
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def repo_of(path: str, root: str, cache: Dict[str, str]) -> str:
+    """Directory of the git repository holding path, relative to root.
+
+    Files outside any repository below root count as their own top-level
+    directory. cache maps directories already looked up to their repository.
+    """
+    start = os.path.dirname(os.path.abspath(path))
+    top = os.path.abspath(root)
+    seen = []
+    directory = start
+    repo = None
+    while True:
+        if directory in cache:
+            repo = cache[directory]
+            break
+        seen.append(directory)
+        if os.path.exists(os.path.join(directory, '.git')):
+            repo = normalize_path(directory, top)
+            break
+        parent = os.path.dirname(directory)
+        if directory == top or parent == directory:
+            repo = normalize_path(start, top).split('/', 1)[0]
+            break
+        directory = parent
+    for directory in seen:
+        cache[directory] = repo
+    return repo
+
+
+def select_shard(paths: Iterable[str], shard: Shard, root: str = '.', by: str = 'file') -> List[str]:
+    """The paths that belong to a shard, in their original order."""
+    index, count = shard
+    repos: Dict[str, str] = {}
+    selected = []
+    for path in paths:
+        key = repo_of(path, root, repos) if by == 'repo' else normalize_path(path, root)
+        if shard_of(key, count) == index:
+            selected.append(path)
+    return selected
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class PartialWriter:
+    """Writes one shard's results as they are produced.
+
+    Pass write as the sink of Checker.check_files, then close with the
+    scan result to record its totals.
+    """
+
+    def __init__(self, path: str, shard: Shard):
+        self.out = _open(path, 'w')
+        self.issues = 0
+        header = {'partial': PARTIAL_VERSION, 'shard': list(shard), 'fields': list(ISSUE_FIELDS)}
+        self.out.write(json.dumps(header) + '\n')
+
+    def write(self, issues: List[Issue]):
+        """Write the issues of one file."""
+        self.issues += len(issues)
+        for issue in issues:
+            self.out.write(json.dumps([getattr(issue, name) for name in ISSUE_FIELDS]) + '\n')
+
+    def close(self, result: ScanResult):
+        """Write the scan totals and close the file."""
+        totals = {
+            'checked': result.checked,
+            'skipped': result.skipped,
+            'stopped': result.stopped,
+            'suppressed': result.suppressed,
+            'exit_code': result.exit_code,
+        }
+        self.out.write(json.dumps(totals) + '\n')
+        self.out.close()
+
+
+def _read_header(f: IO[str], path: str) -> Dict[str, Any]:
+    header = json.loads(f.readline() or 'null')
+    if not isinstance(header, dict) or header.get('partial') != PARTIAL_VERSION:
+        raise ShardError(f'{path}: not a ci-sanity partial results file')
+    return header
+
+
+def _check_partial(path: str) -> Shard:
+    """The shard a partial results file holds, once it is known to be complete.
+
+    Reads past the issues without decoding them.
+    """
+    try:
+        with _open(path, 'r') as f:
+            header = _read_header(f, path)
+            last = None
+            for last in f:
+                pass
+            totals = json.loads(last) if last is not None else None
+            index, count = header['shard']
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        raise ShardError(f'{path}: {e}')
+
+    if not isinstance(totals, dict):
+        raise ShardError(f'{path}: incomplete, the shard did not finish writing it')
+    return index, count
+
+
+def read_partial(
+    path: str,
+    sink: Optional[Callable[[List[Issue]], None]] = None
+) -> Tuple[Shard, ScanResult]:
+    """Read a partial results file.
+
+    With a sink, issues are passed to it instead of being kept in the
+    result, as with Checker.check_files.
+    """
+    result = ScanResult()
+    try:
+        with _open(path, 'r') as f:
+            header = _read_header(f, path)
+            fields = header['fields']
+            totals = None
+            for line in f:
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    totals = record
+                    break
+                issue = Issue(**dict(zip(fields, record)))
+                if sink is not None:
+                    sink([issue])
+                else:
+                    result.issues.append(issue)
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        raise ShardError(f'{path}: {e}')
+
+    if totals is None:
+        raise ShardError(f'{path}: incomplete, the shard did not finish writing it')
+    result.checked = totals['checked']
+    result.skipped = totals['skipped']
+    result.stopped = totals['stopped']
+    result.suppressed = totals['suppressed']
+    result.exit_code = totals['exit_code']
+    return tuple(header['shard']), result
+
+
+def merge_partials(
+    paths: List[str],
+    sink: Optional[Callable[[List[Issue]], None]] = None
+) -> Tuple[ScanResult, List[Shard]]:
+    """Combine partial results: (merged result, shards with no file).
+
+    Every file is checked to be complete and part of the same split
+    before any issue is read, so a bad set of files sinks nothing. The
+    merged exit code is the worst shard's, so strict mode and baselines
+    applied by the shards carry over.
+    """
+    seen: Dict[Shard, str] = {}
+    count = None
+    for path in paths:
+        shard = _check_partial(path)
+        if shard in seen:
+            raise ShardError(f'{path}: shard {shard[0]}/{shard[1]} is also in {seen[shard]}')
+        if count is not None and shard[1] != count:
+            raise ShardError(f'{path}: shard {shard[0]}/{shard[1]} is from a {count}-way split')
+        seen[shard] = path
+        count = shard[1]
+
+    merged = ScanResult()
+    for path in paths:
+        _, result = read_partial(path, sink)
+        merged.issues.extend(result.issues)
+        merged.checked += result.checked
+        merged.skipped.extend(result.skipped)
+        merged.stopped = merged.stopped or result.stopped
+        merged.suppressed += result.suppressed
+        merged.exit_code = max(merged.exit_code, result.exit_code)
+
+    missing = [(i, count) for i in range(1, (count or 0) + 1) if (i, count) not in seen]
+    return merged, missing
@@ -0,0 +1,234 @@
+"""
+Lightweight lexer for `run:` scripts.
+
+Splits a script into simple commands: words with quotes removed,
+separated by newlines, `;`, `&&`, `||`, `|`, `&` and parentheses.
+Comments, line continuations and heredoc bodies are dropped, and
+`$(...)` and backquoted substitutions stay inside the word they appear
+in. It is not a shell parser, just enough to tell that
+`echo "pip install"` does not install anything.
+
+Results are memoized per distinct script, since generated workflows
+repeat the same run blocks across jobs and files.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+# Words before the program: shell keywords and wrappers running their arguments
+_PREFIX_WORDS = {
+    'if', 'then', 'else', 'elif', 'do', 'while', 'until', '!', '{',
+    'time', 'sudo', 'exec', 'nohup', 'command', 'env',
+}
+_WRAPPERS = {'time', 'sudo', 'exec', 'nohup', 'command', 'env'}
+
+_ASSIGNMENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*=')
+_VERSION_RE = re.compile(r'[0-9.]+$')
+
+_SEPARATORS = ';&|()'
+
+
+class Command(NamedTuple):
+    """One simple command of a script."""
+    words: Tuple[str, ...]
+    # Line of the script the command starts on, from 0
+    line: int
+
+    @property
+    def argv(self) -> Tuple[str, ...]:
+        """Words from the program on, without keywords, wrappers and assignments."""
+        words = self.words
+        i = 0
+        wrapped = False
+        while i < len(words):
+            word = words[i]
+            if word in _PREFIX_WORDS:
+                wrapped = wrapped or word in _WRAPPERS
+            elif _ASSIGNMENT_RE.match(word) or (wrapped and word.startswith('-')):
+                pass
+            else:
+                break
+            i += 1
+        return words[i:]
+
+    def startswith(self, *prefix: str) -> bool:
+        """Whether the command runs prefix, e.g. startswith('npm', 'ci').
+
+        The program matches by its base name without a version suffix,
+        so `python3.12 -m pip` and `/usr/bin/pip3` count as python and pip.
+        Case is ignored, as on Windows runners; prefix is lowercase.
+        """
+        argv = self.argv
+        if len(argv) < len(prefix) or not prefix:
+            return False
+        program = _VERSION_RE.sub('', argv[0].rsplit('/', 1)[-1].lower())
+        args = tuple(word.lower() for word in argv[1:len(prefix)])
+        return program == prefix[0] and args == prefix[1:]
+
+
+@lru_cache(maxsize=4096)
+def parse_script(script: str) -> Tuple[Command, ...]:
+    """Split a run script into its commands (memoized)."""
+    return tuple(_Lexer(script).commands())
+
+
+class _Lexer:
+
+    def __init__(self, script: str):
+        self.script = script
+        self.pos = 0
+        self.line = 0
+        self.found: List[Command] = []
+        self.words: List[str] = []
+        self.word: List[str] = []
+        self.in_word = False
+        self.start = 0
+        # (delimiter, strip leading tabs) for heredocs whose bodies start on the next line
+        self.heredocs: List[Tuple[str, bool]] = []
+
+    def commands(self) -> List[Command]:
+        script = self.script
+        n = len(script)
+        while self.pos < n:
+            c = script[self.pos]
+            if c == '\\':
+                if script.startswith('\\\n', self.pos):
+                    self.line += 1
+                else:
+                    self.append(script[self.pos + 1:self.pos + 2])
+                self.pos += 2
+            elif c == "'":
+                end = script.find("'", self.pos + 1)
+                end = n if end == -1 else end
+                self.append(script[self.pos + 1:end])
+                self.pos = end + 1
+            elif c == '"':
+                self.double_quoted()
+            elif c == '`':
+                end = script.find('`', self.pos + 1)
+                end = n if end == -1 else end
+                self.append(script[self.pos:end + 1])
+                self.pos = end + 1
+            elif c == '$' and script.startswith('$(', self.pos):
+                self.substitution()
+            elif c == '#' and not self.in_word:
+                end = script.find('\n', self.pos)
+                self.pos = n if end == -1 else end
+            elif c in ' \t\r':
+                self.end_word()
+                self.pos += 1
+            elif c == '\n':
+                self.end_command()
+                self.pos += 1
+                self.line += 1
+                self.heredoc_bodies()
+            elif c == '<' and script.startswith('<<', self.pos) and not script.startswith('<<<', self.pos):
+                self.heredoc()
+            elif c == '&' and (script.startswith('&>', self.pos) or self.word[-1:] in (['>'], ['<'])):
+                # Redirections: &>file, 2>&1
+                self.append(c)
+                self.pos += 1
+            elif c in _SEPARATORS:
+                self.end_command()
+                self.pos += 1
+            else:
+                self.append(c)
+                self.pos += 1
+        self.end_command()
+        return self.found
+
+    def append(self, text: str):
+        if not self.in_word and not self.words:
+            self.start = self.line
+        self.word.append(text)
+        self.in_word = True
+        self.line += text.count('\n')
+
+    def end_word(self):
+        if self.in_word:
+            self.words.append(''.join(self.word))
+            self.word = []
+            self.in_word = False
+
+    def end_command(self):
+        self.end_word()
+        if self.words:
+            self.found.append(Command(tuple(self.words), self.start))
+            self.words = []
+
+    def double_quoted(self):
+        script = self.script
+        i = self.pos + 1
+        out = []
+        while i < len(script) and script[i] != '"':
+            if script[i] == '\\' and i + 1 < len(script) and script[i + 1] in '"\\$`\n':
+                if script[i + 1] != '\n':
+                    out.append(script[i + 1])
+                i += 2
+            else:
+                out.append(script[i])
+                i += 1
+        self.append(''.join(out))
+        self.pos = i + 1
+
+    def substitution(self):
+        """Keep $( ... ) as part of the current word, balancing parentheses."""
+        script = self.script
+        depth = 0
+        i = self.pos + 1
+        while i < len(script):
+            if script[i] == '(':
+                depth += 1
+            elif script[i] == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        self.append(script[self.pos:i + 1])
+        self.pos = i + 1
+
+    def heredoc(self):
+        """Read a << or <<- operator and its delimiter word."""
+        script = self.script
+        self.end_word()
+        i = self.pos + 2
+        strip_tabs = script.startswith('-', i)
+        if strip_tabs:
+            i += 1
+        while i < len(script) and script[i] in ' \t':
+            i += 1
+        match = re.match(r'''(['"]?)([^\s;&|()<>'"]+)\1''', script[i:])
+        if match is None:
+            self.pos = i
+            return
+        self.heredocs.append((match.group(2), strip_tabs))
+        self.pos = i + match.end()
+
+    def heredoc_bodies(self):
+        """Skip the bodies of heredocs opened on the line just ended."""
+        script = self.script
+        for delimiter, strip_tabs in self.heredocs:
+            while self.pos < len(script):
+                end = script.find('\n', self.pos)
+                end = len(script) if end == -1 else end
+                body_line = script[self.pos:end]
+                self.pos = end + 1
+                self.line += 1
+                if (body_line.lstrip('\t') if strip_tabs else body_line).rstrip('\r') == delimiter:
+                    break
+        self.heredocs = []
+
+
+def script_commands(run: Any) -> Tuple[Command, ...]:
+    """Commands of a step's run value; anything but a string has none."""
+    return parse_script(run) if isinstance(run, str) else ()
+
+
+def find_command(commands: Tuple[Command, ...], *prefixes: Tuple[str, ...]) -> Optional[Command]:
+    """The first command running any of the prefixes."""
+    for command in commands:
+        if any(command.startswith(*prefix) for prefix in prefixes):
+            return command
+    return None
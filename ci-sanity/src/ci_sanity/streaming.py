@@ -0,0 +1,201 @@
+"""
+Bounded-memory checking for giant generated workflows.
+
+Instead of building the whole object graph with yaml.safe_load, the
+document is walked with PyYAML's event API: every top-level key except
+`jobs` is loaded normally, and each job under `jobs` is composed,
+constructed, handed to the rules and dropped. Peak memory is
+proportional to the largest job rather than the whole file.
+"""
+
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Callable
+
+import yaml
+from yaml.events import (
+    StreamEndEvent, MappingStartEvent, MappingEndEvent,
+)
+from yaml.nodes import ScalarNode
+
+from ci_sanity.models import Issue
+from ci_sanity.positions import PositionIndex, Path
+
+
+MAPPING_TAGS = (None, '!', 'tag:yaml.org,2002:map')
+
+# ('job', name, config, index paths) for each streamed job,
+# then ('workflow', data, streamed, [])
+StreamItem = Tuple[str, Any, Any, List[Path]]
+
+
+def _is_plain_mapping(loader: yaml.SafeLoader) -> bool:
+    """Check if the next event opens an untagged, unanchored mapping."""
+    if not loader.check_event(MappingStartEvent):
+        return False
+    event = loader.peek_event()
+    return event.anchor is None and event.tag in MAPPING_TAGS
+
+
+def _construct(loader: yaml.SafeLoader, node: Any) -> Any:
+    """Construct a composed node, then forget constructed objects."""
+    data = loader.construct_object(node, deep=True)
+    loader.constructed_objects.clear()
+    loader.recursive_objects.clear()
+    return data
+
+
+def _load_node(
+    loader: yaml.SafeLoader,
+    index: Optional[PositionIndex] = None,
+    prefix: Path = ()
+) -> Tuple[Any, List[Path]]:
+    """Compose and construct the next node, indexing positions below prefix."""
+    node = loader.compose_node(None, None)
+    added = index.add_node(node, prefix) if index is not None else []
+    return _construct(loader, node), added
+
+
+def _load_key(
+    loader: yaml.SafeLoader,
+    index: Optional[PositionIndex] = None,
+    prefix: Path = ()
+) -> Any:
+    """Load a mapping key and record where it starts."""
+    node = loader.compose_node(None, None)
+    key = _construct(loader, node)
+    if index is not None and isinstance(node, ScalarNode):
+        index.set(prefix + (node.value,), node.start_mark)
+    return key
+
+
+def iter_workflow(
+    stream,
+    loader_cls=yaml.SafeLoader,
+    index: Optional[PositionIndex] = None
+) -> Iterator[StreamItem]:
+    """
+    Walk a single-document YAML stream, yielding jobs one at a time.
+
+    Each job item carries the index paths recorded for it, so callers
+    can drop them once the job is checked. The final item holds the
+    workflow without its streamed jobs and a flag saying whether jobs
+    were streamed; when the root or `jobs` is not a plain mapping
+    everything is loaded normally instead.
+    """
+    loader = loader_cls(stream)
+    try:
+        loader.get_event()  # stream start
+
+        if loader.check_event(StreamEndEvent):
+            yield ('workflow', None, False, [])
+            return
+
+        loader.get_event()  # document start
+        streamed = False
+
+        if not _is_plain_mapping(loader):
+            workflow, _ = _load_node(loader, index)
+        else:
+            loader.get_event()  # mapping start
+            workflow: Dict[Any, Any] = {}
+
+            while not loader.check_event(MappingEndEvent):
+                key = _load_key(loader, index)
+
+                if key == 'jobs' and _is_plain_mapping(loader):
+                    loader.get_event()
+                    streamed = True
+                    while not loader.check_event(MappingEndEvent):
+                        job_name = _load_key(loader, index, ('jobs',))
+                        job_config, added = _load_node(loader, index, ('jobs', job_name))
+                        yield ('job', job_name, job_config, added)
+                    loader.get_event()
+                    continue
+
+                workflow[key], _ = _load_node(loader, index, (key,))
+
+            loader.get_event()  # mapping end
+
+        loader.get_event()  # document end
+        loader.anchors = {}
+
+        if not loader.check_event(StreamEndEvent):
+            event = loader.get_event()
+            raise yaml.composer.ComposerError(
+                'expected a single document in the stream', None,
+                'but found another document', event.start_mark
+            )
+
+        yield ('workflow', workflow, streamed, [])
+    finally:
+        loader.dispose()
+
+
+def check_streaming(
+    stream,
+    file_path: str,
+    rules: List[Any],
+    run_rule: Callable[[Any, Any, str], List[Issue]],
+    loader_cls=yaml.SafeLoader,
+    index: Optional[PositionIndex] = None
+) -> List[Issue]:
+    """
+    Run rules over a workflow job by job.
+
+    Rules that check jobs independently see a one-job workflow per job.
+    Rules with `cross_job_keys` run once at the end on the workflow with
+    every job reduced to those keys (see Rule.project_job). Issues are
+    returned in the same order as a normal full-document check.
+
+    Positions inside a job are indexed while the job is checked and then
+    dropped, keeping only the job's top-level keys for later rules.
+    """
+    if index is None:
+        index = PositionIndex()
+    per_rule: List[List[Issue]] = [[] for _ in rules]
+    projected: Dict[Any, Dict[str, Any]] = {}
+    needs_projection = any(r.cross_job_keys is not None for r in rules)
+
+    for item in iter_workflow(stream, loader_cls, index):
+        if item[0] == 'job':
+            _, job_name, job_config, added = item
+            single = {'jobs': {job_name: job_config}}
+            for i, rule in enumerate(rules):
+                if rule.cross_job_keys is None:
+                    per_rule[i].extend(index.annotate(run_rule(rule, single, file_path)))
+            if needs_projection:
+                projected[job_name] = _project(job_name, job_config, rules)
+            index.discard(added, keep_depth=3)
+            continue
+
+        _, workflow, streamed, _ = item
+        if not streamed:
+            # Nothing was streamed: check the whole document as usual
+            return index.annotate([i for rule in rules for i in run_rule(rule, workflow, file_path)])
+
+        head_issues = [run_rule(rule, workflow, file_path)
+                       if rule.cross_job_keys is None else [] for rule in rules]
+
+        full = dict(workflow)
+        full['jobs'] = projected
+        for i, rule in enumerate(rules):
+            if rule.cross_job_keys is not None:
+                per_rule[i] = run_rule(rule, full, file_path)
+
+        issues = []
+        for i in range(len(rules)):
+            issues.extend(head_issues[i])
+            issues.extend(per_rule[i])
+        return index.annotate(issues)
+
+    return []
+
+
+def _project(job_name: Any, job_config: Any, rules: List[Any]) -> Any:
+    """Keep only what cross-job rules asked for of a job."""
+    if not isinstance(job_config, dict):
+        return job_config
+    projected: Dict[Any, Any] = {}
+    for rule in rules:
+        if rule.cross_job_keys is not None:
+            projected.update(rule.project_job(job_name, job_config))
+    return projected
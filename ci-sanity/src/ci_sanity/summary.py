@@ -0,0 +1,90 @@
+"""
+Streaming aggregation of issues for fleet-scale scans.
+
+Issues are grouped by rule, severity and normalized message as they
+arrive. Each group keeps a count, the number of affected files and a
+few sample locations, so memory grows with the number of distinct
+findings rather than the number of issues.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ci_sanity.baseline import normalize_message
+from ci_sanity.models import Issue
+
+
+DEFAULT_SAMPLES = 3
+
+GroupKey = Tuple[str, str, str]
+
+
+class IssueGroup:
+    """One distinct finding and how often it occurred."""
+
+    __slots__ = ('rule', 'severity', 'message', 'fix', 'count', 'files', 'samples', '_last_file')
+
+    def __init__(self, issue: Issue):
+        self.rule = issue.rule or ''
+        self.severity = issue.severity
+        self.message = issue.message
+        self.fix = issue.fix
+        self.count = 0
+        self.files = 0
+        self.samples: List[str] = []
+        self._last_file: Optional[str] = None
+
+    def is_error(self) -> bool:
+        """check if this group holds errors."""
+        return self.severity == 'error'
+
+
+class IssueAggregator:
+    """Groups issues by (rule, severity, normalized message) with bounded samples.
+
+    Files are counted by noticing when a group sees a new file, which is
+    exact as long as each file's issues arrive together (as they do
+    from Checker.iter_check).
+    """
+
+    def __init__(self, samples: int = DEFAULT_SAMPLES):
+        self.max_samples = samples
+        self.groups: Dict[GroupKey, IssueGroup] = {}
+        self.total = 0
+        self.files = 0
+        self._last_file: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def add(self, issue: Issue):
+        """Count one issue."""
+        key = (issue.rule or '', issue.severity, normalize_message(issue.message))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = IssueGroup(issue)
+
+        self.total += 1
+        group.count += 1
+        if group._last_file != issue.file:
+            group._last_file = issue.file
+            group.files += 1
+            if len(group.samples) < self.max_samples:
+                location = issue.file if issue.line is None else f'{issue.file}:{issue.line}'
+                group.samples.append(location)
+
+        if self._last_file != issue.file:
+            self._last_file = issue.file
+            self.files += 1
+
+    def add_all(self, issues: Iterable[Issue]):
+        """Count every issue in an iterable."""
+        for issue in issues:
+            self.add(issue)
+
+    def top(self, n: int) -> List[IssueGroup]:
+        """The n largest groups: most issues first, errors before warnings."""
+        return heapq.nsmallest(
+            n, self.groups.values(),
+            key=lambda g: (-g.count, not g.is_error(), g.rule, g.message)
+        )
@@ -0,0 +1,343 @@
+"""
+Which workflows and jobs run for a push or pull request.
+
+Evaluates `branches`, `branches-ignore`, `paths` and `paths-ignore`
+filters with GitHub's glob semantics against a set of changed files,
+then the jobs' `if:` conditions as far as the event decides them.
+
+Each distinct pattern is compiled once and matched once against the
+changed files, which are kept sorted so a pattern with a literal prefix
+(`services/api/**`) only looks at the files under that prefix. A
+pattern's matches are a set of file indices, so `!` negations and the
+last-match-wins rule become set operations, and the hundreds of
+workflows of a monorepo that share patterns share the work too.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+from ci_sanity.expressions import (
+    Binary, Call, Invalid, Literal, Name, Property, Unary, parse_expression,
+)
+from ci_sanity.jobgraph import job_needs
+from ci_sanity.waste import workflow_events
+
+
+# Events that take branches and paths filters
+FILTERED_EVENTS = ('push', 'pull_request', 'pull_request_target')
+
+_SPECIAL = '*?+[\\!'
+
+
+def translate_filter(pattern: str) -> str:
+    """Translate a GitHub filter pattern into a regex.
+
+    `*` matches within one path segment, `**` across segments, `?` and
+    `+` make the previous character optional or repeatable, `[]` is a
+    character class and `\\` escapes the next character.
+    """
+    atoms: List[str] = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                atoms.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                atoms.append('.*')
+                i += 2
+                continue
+            atoms.append('[^/]*')
+        elif c in '?+' and atoms:
+            atoms[-1] = f'(?:{atoms[-1]}){c}'
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                atoms.append(re.escape(c))
+            else:
+                atoms.append('[' + pattern[i + 1:end].replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            atoms.append(re.escape(pattern[i]))
+        else:
+            atoms.append(re.escape(c))
+        i += 1
+    return ''.join(atoms)
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading characters of a pattern that match only themselves."""
+    for i, c in enumerate(pattern):
+        if c in _SPECIAL:
+            # ? and + act on the character before them
+            return pattern[:max(i - 1, 0)] if c in '?+' else pattern[:i]
+    return pattern
+
+
+@lru_cache(maxsize=4096)
+def compile_filter(pattern: str) -> Tuple[bool, str, Pattern, bool]:
+    """(negated, literal prefix, regex, matches everything under the prefix)."""
+    negated = pattern.startswith('!')
+    if negated:
+        pattern = pattern[1:]
+    prefix = _literal_prefix(pattern)
+    rest = pattern[len(prefix):]
+    regex = re.compile(translate_filter(pattern) + '\\Z', re.DOTALL)
+    return negated, prefix, regex, rest == '**'
+
+
+def branch_matches(patterns: List[str], branch: str) -> bool:
+    """Whether a filter list selects branch; the last matching pattern wins."""
+    selected = False
+    for pattern in patterns:
+        negated, _, regex, _ = compile_filter(pattern)
+        if regex.match(branch):
+            selected = not negated
+    return selected
+
+
+class ChangedFiles:
+    """Changed paths, sorted, with each pattern's matches computed once."""
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = sorted({p.strip().lstrip('/') for p in paths if p.strip()})
+        self._matches: Dict[str, FrozenSet[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def matching(self, pattern: str) -> FrozenSet[int]:
+        """Indices of the files a pattern (without its `!`) matches."""
+        found = self._matches.get(pattern)
+        if found is None:
+            _, prefix, regex, whole_tree = compile_filter(pattern)
+            lo = bisect.bisect_left(self.paths, prefix)
+            hi = bisect.bisect_left(self.paths, prefix + '\U0010ffff') if prefix else len(self.paths)
+            if whole_tree:
+                found = frozenset(range(lo, hi))
+            else:
+                paths = self.paths
+                found = frozenset(i for i in range(lo, hi) if regex.match(paths[i]))
+            self._matches[pattern] = found
+        return found
+
+    def selected(self, patterns: List[str]) -> FrozenSet[int]:
+        """Files a filter list selects, applying patterns in order."""
+        selected: FrozenSet[int] = frozenset()
+        for pattern in patterns:
+            negated = pattern.startswith('!')
+            files = self.matching(pattern[1:] if negated else pattern)
+            selected = selected - files if negated else selected | files
+        return selected
+
+
+# Job condition outcomes
+RUNS = 'runs'
+SKIPPED = 'skipped'
+MAYBE = 'maybe'
+
+
+@dataclass
+class WorkflowTrigger:
+    """Whether one workflow runs for an event, and which of its jobs."""
+    fires: bool
+    reason: str
+    # Whether the trigger has paths or paths-ignore filters
+    path_filtered: bool = False
+    # job -> (RUNS, SKIPPED or MAYBE, why)
+    jobs: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+
+
+def _patterns(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [str(p) for p in value if isinstance(p, (str, int, float))]
+    return None
+
+
+def simulate(
+    workflow: Any,
+    event: str,
+    branch: str,
+    changed: ChangedFiles
+) -> WorkflowTrigger:
+    """Whether workflow runs for event on branch with these changed files.
+
+    For pull requests, branch is the base branch the pull request targets.
+    """
+    events = workflow_events(workflow)
+    if event not in events:
+        return WorkflowTrigger(False, f'not triggered by {event}')
+
+    config = events[event]
+    if not isinstance(config, dict):
+        config = {}
+
+    if event in FILTERED_EVENTS:
+        branches = _patterns(config.get('branches'))
+        ignored = _patterns(config.get('branches-ignore'))
+        if branches is not None and not branch_matches(branches, branch):
+            return WorkflowTrigger(False, f'branches does not include {branch}')
+        if ignored is not None and branch_matches(ignored, branch):
+            return WorkflowTrigger(False, f'branches-ignore excludes {branch}')
+        if branches is None and ignored is None and event == 'push' and (
+                'tags' in config or 'tags-ignore' in config):
+            return WorkflowTrigger(False, 'push only runs for tags')
+
+    paths = _patterns(config.get('paths')) if event in FILTERED_EVENTS else None
+    paths_ignore = _patterns(config.get('paths-ignore')) if event in FILTERED_EVENTS else None
+    filtered = paths is not None or paths_ignore is not None
+    if paths is not None and not changed.selected(paths):
+        return WorkflowTrigger(False, 'no changed file matches paths', filtered)
+    if paths_ignore is not None and len(changed.selected(paths_ignore)) == len(changed):
+        return WorkflowTrigger(False, 'every changed file matches paths-ignore', filtered)
+
+    reason = 'changed files match paths' if filtered else 'no path filters'
+    jobs = workflow.get('jobs') if isinstance(workflow, dict) else None
+    return WorkflowTrigger(True, reason, filtered, simulate_jobs(jobs, event, branch))
+
+
+def simulate_jobs(jobs: Any, event: str, branch: str) -> Dict[str, Tuple[str, str]]:
+    """Outcome of each job's if: condition and its needs, in definition order."""
+    if not isinstance(jobs, dict):
+        return {}
+    context = {
+        'event_name': event,
+        'ref': f'refs/heads/{branch}' if event == 'push' else None,
+        'ref_name': branch if event == 'push' else None,
+        'base_ref': branch if event != 'push' else '',
+    }
+    outcomes: Dict[str, Tuple[str, str]] = {}
+
+    def visit(name: str, seen: Tuple[str, ...] = ()) -> Tuple[str, str]:
+        if name in outcomes:
+            return outcomes[name]
+        config = jobs.get(name)
+        condition = config.get('if') if isinstance(config, dict) else None
+        value = evaluate_condition(condition, context)
+        if value is False:
+            outcome = (SKIPPED, 'if is false')
+        else:
+            outcome = (RUNS, '') if value is True else (MAYBE, 'if depends on run-time values')
+            runs_anyway = _calls_status_function(condition)
+            for target in job_needs(config):
+                if target not in jobs or target in seen:
+                    continue
+                status, _ = visit(target, seen + (name,))
+                if status == SKIPPED and not runs_anyway:
+                    outcome = (SKIPPED, f'needs {target}, which is skipped')
+                    break
+                if status == MAYBE and outcome[0] == RUNS:
+                    outcome = (MAYBE, f'needs {target}, which may not run')
+        outcomes[name] = outcome
+        return outcome
+
+    for name in jobs:
+        visit(name)
+    return {name: outcomes[name] for name in jobs}
+
+
+class _Unknown:
+    """A value only known at run time."""
+
+    def __repr__(self):
+        return 'UNKNOWN'
+
+
+UNKNOWN = _Unknown()
+
+
+def _calls_status_function(condition: Any) -> bool:
+    return isinstance(condition, str) and re.search(
+        r'\b(?:always|failure|cancelled)\s*\(', condition, re.IGNORECASE) is not None
+
+
+def evaluate_condition(condition: Any, github: Dict[str, Any]) -> Any:
+    """True, False or UNKNOWN for an if: condition given github context values."""
+    if condition is None:
+        return True
+    if isinstance(condition, bool):
+        return condition
+    if not isinstance(condition, str):
+        return UNKNOWN
+    source = condition.strip()
+    if source.startswith('${{') and source.endswith('}}') and source.count('${{') == 1:
+        source = source[3:-2]
+    elif '${{' in source:
+        return UNKNOWN
+    node = parse_expression(source)
+    if isinstance(node, Invalid):
+        return UNKNOWN
+    value = _evaluate(node, github)
+    return value if value is UNKNOWN else _truthy(value)
+
+
+def _truthy(value: Any) -> bool:
+    return value not in (None, False, 0, '') and value == value
+
+
+def _evaluate(node: Any, github: Dict[str, Any]) -> Any:
+    if isinstance(node, Literal):
+        return node.value
+    if isinstance(node, Property):
+        if node.obj == Name('github'):
+            value = github.get(node.name.lower(), UNKNOWN)
+            return UNKNOWN if value is None else value
+        return UNKNOWN
+    if isinstance(node, Unary):
+        value = _evaluate(node.operand, github)
+        return value if value is UNKNOWN else not _truthy(value)
+    if isinstance(node, Binary):
+        left = _evaluate(node.left, github)
+        if node.op == '&&':
+            if left is not UNKNOWN and not _truthy(left):
+                return left
+            right = _evaluate(node.right, github)
+            if left is UNKNOWN:
+                return right if right is not UNKNOWN and not _truthy(right) else UNKNOWN
+            return right
+        if node.op == '||':
+            if left is not UNKNOWN and _truthy(left):
+                return left
+            right = _evaluate(node.right, github)
+            if left is UNKNOWN:
+                return right if right is not UNKNOWN and _truthy(right) else UNKNOWN
+            return right
+        right = _evaluate(node.right, github)
+        if left is UNKNOWN or right is UNKNOWN:
+            return UNKNOWN
+        if node.op in ('==', '!='):
+            equal = _fold(left) == _fold(right)
+            return equal if node.op == '==' else not equal
+        return UNKNOWN
+    if isinstance(node, Call):
+        if node.name in ('success', 'always'):
+            return True
+        if node.name in ('failure', 'cancelled'):
+            return False
+        if node.name in ('startswith', 'endswith', 'contains') and len(node.args) == 2:
+            haystack, needle = (_evaluate(a, github) for a in node.args)
+            if haystack is UNKNOWN or needle is UNKNOWN:
+                return UNKNOWN
+            if node.name == 'contains' and isinstance(haystack, list):
+                return any(_fold(item) == _fold(needle) for item in haystack)
+            haystack, needle = str(_fold(haystack)), str(_fold(needle))
+            if node.name == 'startswith':
+                return haystack.startswith(needle)
+            if node.name == 'endswith':
+                return haystack.endswith(needle)
+            return needle in haystack
+    return UNKNOWN
+
+
+def _fold(value: Any) -> Any:
+    """Expression comparisons ignore case."""
+    return value.lower() if isinstance(value, str) else value
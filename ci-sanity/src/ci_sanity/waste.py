@@ -0,0 +1,187 @@
+"""
+Runner minutes spent on work nobody needs.
+
+Used by the `analyze` command. Each finding carries an estimate of the
+runner minutes it can waste per occurrence, so fixes can be ranked by
+cost across a repository:
+
+- pull request workflows without a concurrency group that cancels
+  superseded runs keep running a whole pipeline for every outdated push
+- jobs without timeout-minutes can hang for GitHub's six-hour default
+- push and pull_request triggers that both fire for pull request
+  branches run everything twice
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ci_sanity.jobgraph import DEFAULT_JOB_MINUTES
+
+
+GITHUB_TIMEOUT_MINUTES = 360
+
+PULL_REQUEST_EVENTS = ('pull_request', 'pull_request_target')
+
+# push branch filters that also match pull request branches
+CATCH_ALL_BRANCHES = ('*', '**')
+
+
+@dataclass
+class Waste:
+    """One source of wasted runner minutes in a workflow."""
+    kind: str
+    job: Optional[str]
+    # Runner minutes lost each time it happens
+    minutes: float
+    message: str
+    fix: str
+
+
+def workflow_events(workflow: Any) -> Dict[str, Any]:
+    """The workflow's `on:` triggers as event -> configuration (None if bare).
+
+    Accepts a string, a list or a mapping, and the `true` key YAML 1.1
+    makes of a bare `on`.
+    """
+    if not isinstance(workflow, dict):
+        return {}
+    on = workflow.get('on', workflow.get(True))
+    if isinstance(on, str):
+        return {on: None}
+    if isinstance(on, list):
+        return {event: None for event in on if isinstance(event, str)}
+    if isinstance(on, dict):
+        return {event: config for event, config in on.items() if isinstance(event, str)}
+    return {}
+
+
+def matrix_size(job_config: Any) -> int:
+    """Number of jobs a strategy matrix expands to (1 without a matrix)."""
+    strategy = job_config.get('strategy') if isinstance(job_config, dict) else None
+    matrix = strategy.get('matrix') if isinstance(strategy, dict) else None
+    if not isinstance(matrix, dict):
+        return 1
+
+    size = 1
+    axes = False
+    for key, values in matrix.items():
+        if key in ('include', 'exclude'):
+            continue
+        if isinstance(values, list):
+            size *= len(values)
+            axes = True
+
+    include = matrix.get('include')
+    exclude = matrix.get('exclude')
+    if isinstance(include, list) and not axes:
+        # include on its own lists every combination
+        size = len(include)
+    if isinstance(exclude, list):
+        size -= len(exclude)
+    return max(size, 1)
+
+
+def runner_minutes(jobs: Dict[str, Any], durations: Dict[str, float]) -> Dict[str, float]:
+    """Runner minutes per job: its duration times its matrix size."""
+    return {
+        name: durations.get(name, DEFAULT_JOB_MINUTES) * matrix_size(config)
+        for name, config in jobs.items()
+    }
+
+
+def find_waste(workflow: Dict[str, Any], durations: Dict[str, float]) -> List[Waste]:
+    """Wasted runner minutes in a workflow, most expensive first.
+
+    durations holds each job's estimated minutes, as returned by
+    jobgraph.estimate_durations.
+    """
+    jobs = workflow.get('jobs') if isinstance(workflow, dict) else None
+    if not isinstance(jobs, dict):
+        return []
+
+    cost = runner_minutes(jobs, durations)
+    events = workflow_events(workflow)
+    found = []
+
+    pr_event = next((e for e in PULL_REQUEST_EVENTS if e in events), None)
+    if pr_event and not _cancels_superseded(workflow, jobs):
+        found.append(Waste(
+            kind='concurrency',
+            job=None,
+            minutes=sum(cost.values()),
+            message=f'{pr_event} runs are not cancelled when the branch gets a new push',
+            fix='add concurrency: {group: ${{ github.workflow }}-${{ github.ref }}, '
+                'cancel-in-progress: true}',
+        ))
+
+    if 'pull_request' in events and _push_runs_on_pr_branches(events.get('push', False)):
+        twice = {name: minutes for name, minutes in cost.items()
+                 if not _depends_on_event(jobs[name])}
+        if twice:
+            found.append(Waste(
+                kind='duplicate-trigger',
+                job=None,
+                minutes=sum(twice.values()),
+                message='push and pull_request both run for pull request branches, '
+                        'so every pull request push runs twice',
+                fix='limit push to your default branch, e.g. push: {branches: [main]}',
+            ))
+
+    for name, config in jobs.items():
+        if not isinstance(config, dict) or 'timeout-minutes' in config or 'uses' in config:
+            continue
+        runs = matrix_size(config)
+        hung = (GITHUB_TIMEOUT_MINUTES - durations.get(name, DEFAULT_JOB_MINUTES)) * runs
+        if hung > 0:
+            found.append(Waste(
+                kind='timeout',
+                job=name,
+                minutes=hung,
+                message=f'{name} has no timeout-minutes, so a hung run lasts '
+                        f'{GITHUB_TIMEOUT_MINUTES // 60} hours',
+                fix='set timeout-minutes a little above its usual duration',
+            ))
+
+    found.sort(key=lambda w: -w.minutes)
+    return found
+
+
+def _cancels_superseded(workflow: Dict[str, Any], jobs: Dict[str, Any]) -> bool:
+    """Workflow-level concurrency, or every job's, cancels runs in progress."""
+    if _cancels(workflow.get('concurrency')):
+        return True
+    return bool(jobs) and all(
+        isinstance(config, dict) and _cancels(config.get('concurrency'))
+        for config in jobs.values()
+    )
+
+
+def _cancels(concurrency: Any) -> bool:
+    if not isinstance(concurrency, dict):
+        return False
+    cancel = concurrency.get('cancel-in-progress')
+    # Expressions usually cancel for pull requests only, which is the point
+    return cancel is True or (isinstance(cancel, str) and '${{' in cancel)
+
+
+def _push_runs_on_pr_branches(push: Any) -> bool:
+    """Whether a push trigger also fires for arbitrary feature branches."""
+    if push is False:
+        return False
+    if not isinstance(push, dict):
+        return True
+    if 'branches-ignore' in push:
+        return True
+    branches = push.get('branches')
+    if branches is None:
+        # Only tags means branch pushes never trigger
+        return not ('tags' in push or 'tags-ignore' in push)
+    if isinstance(branches, str):
+        branches = [branches]
+    return isinstance(branches, list) and any(b in CATCH_ALL_BRANCHES for b in branches)
+
+
+def _depends_on_event(job_config: Any) -> bool:
+    """A job whose if: condition looks at the event, so it only runs for one of them."""
+    condition = job_config.get('if') if isinstance(job_config, dict) else None
+    return isinstance(condition, str) and 'event_name' in condition
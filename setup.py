@@ -9,6 +9,7 @@ setup(
     url='https://github.com/Ebiowei-Ambakederimo/ci-sanity.git',
     packages=find_packages(where='src'),
     package_dir={'': 'src'},
+    package_data={'ci_sanity': ['schemas/*.json']},
     install_requires=[
         'pyyaml>=6.0',
     ],
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Make the ci_sanity package importable without installing it
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+src_dir = os.path.join(project_root, 'ci-sanity', 'src')
+if os.path.isdir(src_dir) and src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
@@ -0,0 +1,47 @@
+from ci_sanity import api
+from ci_sanity.models import Colors
+
+
+WORKFLOW = '''on: push
+jobs:
+  build:
+    runs-on: ubuntu-lastest
+    steps:
+      - uses: actions/checkout@v4
+'''
+
+
+def test_check_text_and_bytes_without_disk():
+    issues = api.check_text(WORKFLOW, 'ci.yml')
+    assert [i.rule for i in issues] == ['runner-compat']
+    assert issues[0].file == 'ci.yml' and issues[0].line == 4
+
+    assert api.check_bytes(WORKFLOW.encode(), 'ci.yml') == issues
+    assert api.check_bytes(b'\xff', 'ci.yml')[0].job == 'read'
+
+    gitlab = api.check_text('build:\n  stage: nope\n  script: make\n', '.gitlab-ci.yml')
+    assert [i.rule for i in gitlab] == ['gitlab-ci']
+
+
+def test_check_many_keeps_order_across_threads():
+    documents = []
+    for i in range(50):
+        runner = 'ubuntu-latest' if i % 2 else 'nope'
+        documents.append((f'w{i}.yml', WORKFLOW.replace('ubuntu-lastest', runner)))
+
+    serial = list(api.check_many(documents))
+    threaded = list(api.check_many(documents, workers=4))
+
+    assert [name for name, _ in serial] == [name for name, _ in documents]
+    assert threaded == serial
+    assert [bool(issues) for _, issues in serial] == [i % 2 == 0 for i in range(50)]
+
+
+def test_settings_and_palettes_are_per_instance():
+    checker = api.make_checker({'secrets': ['TOKEN']})
+    text = WORKFLOW + '      - run: echo ${{ secrets.TOKEN }}\n'
+    assert [i.rule for i in api.check_text(text, checker=checker)] == ['runner-compat']
+
+    plain = Colors(enabled=False)
+    assert plain.RED == '' and plain.BOLD == ''
+    assert Colors.RED != '' and Colors.BOLD != ''
@@ -0,0 +1,52 @@
+import os
+
+from ci_sanity.baseline import Baseline, fingerprint, normalize_message
+from ci_sanity.models import Issue
+
+
+def _issue(message='unknown runner: ubuntu-lastest', file='/repo/.github/workflows/ci.yml',
+           job='build', step=None, line=None, rule='runner-compat'):
+    return Issue(severity='error', file=file, job=job, step=step, message=message,
+                 fix='', line=line, rule=rule)
+
+
+def test_fingerprint_ignores_positions_and_spacing():
+    a = _issue(line=3, step=1)
+    b = _issue(message='Unknown  runner: ubuntu-lastest', line=40, step=7)
+    assert fingerprint(a, '/repo') == fingerprint(b, '/repo')
+
+    assert normalize_message('bad at line 12, column 4') == 'bad at line #, column #'
+    assert fingerprint(a, '/repo') != fingerprint(_issue(job='test'), '/repo')
+    assert fingerprint(a, '/repo') != fingerprint(_issue(rule='secrets'), '/repo')
+
+
+def test_fingerprint_is_relative_to_root_and_revision():
+    local = _issue(file=os.path.join('/repo', '.github', 'workflows', 'ci.yml'))
+    other_checkout = _issue(file='/elsewhere/.github/workflows/ci.yml')
+    at_ref = _issue(file='origin/main:.github/workflows/ci.yml')
+
+    assert fingerprint(local, '/repo') == fingerprint(other_checkout, '/elsewhere')
+    assert fingerprint(local, '/repo') == fingerprint(at_ref)
+
+
+def test_filter_write_load_and_prune(tmp_path):
+    old = _issue()
+    gone = _issue(job='deploy', message='secret DEPLOY_KEY is not declared', rule='secrets')
+    new = _issue(job='lint')
+    path = str(tmp_path / 'baseline')
+
+    Baseline.from_issues([old, gone], '/repo').write(path, [old, gone])
+    text = open(path).read()
+    assert text.startswith('# ci-sanity baseline v1\n')
+    assert 'runner-compat .github/workflows/ci.yml build: unknown runner' in text
+
+    baseline = Baseline.load(path, '/repo')
+    assert len(baseline) == 2
+    remaining, suppressed = baseline.filter([old, new])
+    assert remaining == [new]
+    assert suppressed == 1
+
+    assert baseline.prune([old, new]) == 1
+    baseline.write(path, [old, new])
+    assert len(Baseline.load(path, '/repo')) == 1
+    assert gone not in Baseline.load(path, '/repo')
@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+
+from ci_sanity import batch
+from ci_sanity.batch import ProtocolError, ResultWriter, iter_documents, iter_paths
+from ci_sanity.models import Issue
+
+
+def test_iter_paths_across_chunks(monkeypatch):
+    monkeypatch.setattr(batch, 'READ_SIZE', 3)
+    stream = io.BytesIO(b'a.yml\0dir/b c.yml\0\0last.yml\n')
+    assert list(iter_paths(stream)) == ['a.yml', 'dir/b c.yml', 'last.yml']
+
+
+def test_iter_documents():
+    first = b'jobs:\n  a: {}\n'
+    second = 'name: caf\xe9\n'.encode('utf-8')
+    stream = io.BytesIO(
+        b'%d .github/workflows/my ci.yml\n' % len(first) + first + b'\n'
+        + b'%d action.yml\n' % len(second) + second
+    )
+    assert list(iter_documents(stream)) == [
+        ('.github/workflows/my ci.yml', first),
+        ('action.yml', second),
+    ]
+
+    with pytest.raises(ProtocolError):
+        list(iter_documents(io.BytesIO(b'12 a.yml\nshort')))
+    with pytest.raises(ProtocolError):
+        list(iter_documents(io.BytesIO(b'a.yml 12\n')))
+
+
+def test_result_writer_streams_json_lines():
+    out = io.StringIO()
+    writer = ResultWriter(out)
+    issue = Issue(severity='error', file='a.yml', job='build', step=1,
+                  message='boom', fix='fix it', line=3, column=7, rule='step-order')
+    writer.write('a.yml', [issue])
+    writer.write('b.yml', [])
+    writer.write_summary(2)
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines[0] == {'file': 'a.yml', 'issues': [issue.to_dict()]}
+    assert lines[0]['issues'][0]['line'] == 3
+    assert lines[2] == {'summary': {'files': 2, 'errors': 1, 'warnings': 0, 'exit_code': 2}}
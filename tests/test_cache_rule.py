@@ -0,0 +1,118 @@
+from ci_sanity import api
+
+
+def cache_issues(text, checker=None):
+    issues = api.check_text(text, 'ci.yml', checker=checker)
+    return [(i.job, i.step, i.message) for i in issues if i.rule == 'cache']
+
+
+def test_uncached_installs():
+    issues = cache_issues('''
+on: push
+jobs:
+  node:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/setup-node@v4
+      - run: |
+          # npm install would be nice
+          npm ci && npm test
+      - run: echo pip installer; poetry install
+  python:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/setup-python@v5
+        with: {cache: pip}
+      - run: python -m pip install -r requirements.txt
+''')
+    assert issues == [
+        ('node', 1, 'npm dependencies are downloaded from scratch on every run'),
+        ('node', 2, 'poetry dependencies are downloaded from scratch on every run'),
+    ]
+
+
+def test_cache_keys_and_restore_keys():
+    issues = cache_issues('''
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/cache@v4
+        with:
+          path: ~/.npm
+          key: npm-cache
+      - uses: actions/cache@v4
+        with:
+          path: ~/.cache/pip
+          key: pip-${{ hashFiles('**/*.py') }}
+          restore-keys: pip-
+      - uses: actions/cache@v4
+        with:
+          path: vendor/bundle
+          key: gems-${{ runner.os }}-${{ hashFiles('**/Gemfile.lock') }}
+      - run: npm ci && pip install . && bundle install
+''')
+    assert issues == [
+        ('build', 0, 'cache key never changes, so the cache goes stale when dependencies change'),
+        ('build', 1, 'cache key hashes **/*.py but not the lockfile'),
+        ('build', 2, 'cache has no restore-keys, so every lockfile change starts cold'),
+    ]
+
+
+def test_expression_cache_key_without_hash_files():
+    issues = cache_issues('''
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/cache@v4
+        with:
+          path: ~/.npm
+          key: npm-${{ runner.os }}
+          restore-keys: npm-
+      - id: lock
+        run: echo "hash=$(sha256sum package-lock.json)" >> $GITHUB_OUTPUT
+      - uses: actions/cache@v4
+        with:
+          path: node_modules
+          key: modules-${{ steps.lock.outputs.hash }}
+          restore-keys: modules-
+      - uses: actions/cache@v4
+        with:
+          path: dist
+          key: dist-${{ github.sha }}
+          restore-keys: dist-
+      - run: npm ci
+''')
+    assert issues == [
+        ('build', 0, 'cache key does not hash the lockfile, so the cache goes stale when dependencies change'),
+    ]
+
+
+def test_same_cache_saved_by_several_jobs():
+    step = '''
+      - uses: actions/cache@v4
+        with:
+          path: node_modules
+          key: ${{ runner.os }}-${{ hashFiles('package-lock.json') }}
+          restore-keys: ${{ runner.os }}-
+      - run: npm ci
+'''
+    text = 'on: push\njobs:\n'
+    for job in ('lint', 'test', 'matrix'):
+        text += f'  {job}:\n    runs-on: ubuntu-latest\n    steps:{step}'
+    # Keys that differ per matrix entry are not shared
+    head, _, tail = text.rpartition('${{ runner.os }}-${{ hashFiles')
+    text = head + '${{ matrix.node }}-${{ hashFiles' + tail
+    issues = cache_issues(text)
+    assert issues == [
+        ('test', 0, "jobs lint, test all save the same cache "
+                      "${{ runner.os }}-${{ hashFiles('package-lock.json') }}; only one save wins"),
+    ]
+
+    # Streaming mode checks jobs one at a time but still sees every save
+    streamed = api.make_checker({'stream': True})
+    assert cache_issues(text, streamed) == issues
+    assert api.check_text(text, 'ci.yml', checker=streamed) == api.check_text(text, 'ci.yml')
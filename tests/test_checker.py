@@ -0,0 +1,172 @@
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.prefetch import prefetch
+
+
+def _workflow_dir(tmp_path):
+    workflows = tmp_path / '.github' / 'workflows'
+    workflows.mkdir(parents=True)
+    return workflows
+
+
+def test_prefetch_keeps_order_and_reports_errors(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f'{i:02}.yml'
+        path.write_text(f'n: {i}\n')
+        paths.append(str(path))
+    paths.insert(5, str(tmp_path / 'missing.yml'))
+
+    results = list(prefetch(paths, workers=4, depth=3))
+
+    assert [r[0] for r in results] == paths
+    assert results[0][1] == 'n: 0\n'
+    assert results[5][1] is None and isinstance(results[5][2], OSError)
+
+
+def test_check_all_parse_and_read_errors(tmp_path):
+    workflows = _workflow_dir(tmp_path)
+    (workflows / 'bad.yml').write_text('jobs: [unclosed\n')
+    (workflows / 'binary.yml').write_bytes(b'\xff\xfe\x00')
+
+    issues = Checker(Config()).check_all(str(tmp_path))
+    by_job = {i.job: i for i in issues}
+
+    assert by_job['parse'].message.startswith('invalid yaml')
+    assert by_job['parse'].line is not None
+    assert by_job['read'].message.startswith('failed to read file')
+
+
+def test_check_files_fail_fast_and_deadline(tmp_path):
+    workflows = _workflow_dir(tmp_path)
+    paths = []
+    for name, runner in [('a', 'ubuntu-latest'), ('b', 'nope'), ('c', 'ubuntu-latest')]:
+        path = workflows / f'{name}.yml'
+        path.write_text(
+            'on: push\njobs:\n  build:\n    runs-on: %s\n'
+            '    steps:\n      - uses: actions/checkout@v4\n' % runner
+        )
+        paths.append(str(path))
+
+    checker = Checker(Config.from_dict({}))
+    result = checker.check_files(paths, fail_fast=True)
+    assert result.stopped is None and result.complete  # warnings do not fail
+
+    checker.config.set_strict(True)
+    result = checker.check_files(paths, fail_fast=True)
+    assert result.stopped == 'fail-fast'
+    assert result.checked == 2
+    assert result.skipped == paths[2:]
+
+    result = checker.check_files(paths, deadline=0)
+    assert result.stopped == 'time-budget'
+    assert result.checked == 1 and result.skipped == paths[1:]
+
+
+STREAM_WORKFLOW = '''name: generated
+jobs:
+  build: &build
+    runs-on: windows-latest
+    env: {TOKEN: "${{ secrets.TOKN }}"}
+    steps:
+      - uses: actions/checkout@main
+      - run: docker build .
+  test:
+    <<: *build
+    runs-on: ubuntu-lol
+  broken: not-a-dict
+on: push
+'''
+
+
+def test_streaming_matches_full_parse():
+    full = Checker(Config.from_dict({})).check_text(STREAM_WORKFLOW, 'ci.yml')
+    streamed = Checker(Config.from_dict({'stream': True})).check_text(STREAM_WORKFLOW, 'ci.yml')
+
+    assert streamed == full
+    assert any(i.job == 'test' for i in streamed)
+
+
+OUTPUTS_WORKFLOW = '''on: push
+jobs:
+  test:
+    needs: [build, setup]
+    runs-on: ubuntu-latest
+    if: needs.setup.outputs.go == 'yes'
+    steps:
+      - run: echo ${{ needs.build.outputs.w }} ${{ needs.build.outputs.v }}
+  build:
+    runs-on: ubuntu-latest
+    outputs: {v: "${{ steps.x.outputs.v }}"}
+    steps:
+      - run: echo
+  setup:
+    runs-on: ubuntu-latest
+    outputs: {ok: "1"}
+    steps:
+      - run: echo
+'''
+
+
+def test_streaming_checks_needs_outputs_like_full_parse():
+    full = Checker(Config.from_dict({})).check_text(OUTPUTS_WORKFLOW, 'ci.yml')
+    streamed = Checker(Config.from_dict({'stream': True})).check_text(OUTPUTS_WORKFLOW, 'ci.yml')
+
+    assert streamed == full
+    found = [(i.job, i.step, i.message, i.line, i.rule) for i in streamed if 'no output' in i.message]
+    assert found == [
+        ('test', None, 'job setup has no output go', 3, 'context-refs'),
+        ('test', 0, 'job build has no output w', 8, 'context-refs'),
+    ]
+
+
+def test_needs_outputs_of_job_without_outputs():
+    text = """on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - run: echo
+  test:
+    needs: build
+    runs-on: ubuntu-latest
+    steps:
+      - run: echo ${{ needs.build.outputs.version }}
+"""
+    for stream in (False, True):
+        issues = Checker(Config.from_dict({'stream': stream})).check_text(text, 'ci.yml')
+        found = [(i.job, i.step, i.message, i.line) for i in issues if 'no output' in i.message]
+        assert found == [('test', 0, 'job build has no output version', 11)]
+
+
+def test_streaming_non_mapping_jobs_and_parse_errors():
+    checker = Checker(Config.from_dict({'stream': True}))
+
+    issues = checker.check_text('jobs: [a, b]\n', 'ci.yml')
+    assert [i.message for i in issues] == ['jobs must be a dictionary']
+
+    issues = checker.check_text('jobs:\n  a: [\n', 'ci.yml')
+    assert [i.job for i in issues] == ['parse']
+
+
+def test_rule_issues_carry_line_and_column():
+    workflow = '''on: push
+jobs:
+  build:
+    runs-on: ubuntu-lol
+    steps:
+      - run: echo hi
+      - uses: actions/checkout@main
+  lint:
+    steps: []
+'''
+    for stream in (False, True):
+        checker = Checker(Config.from_dict({'stream': stream}))
+        issues = {i.message: i for i in checker.check_text(workflow, 'ci.yml')}
+
+        runner = issues["unknown runner list: ['ubuntu-lol']"]
+        assert (runner.line, runner.column) == (4, 5)
+        pinned = issues['actions/checkout@main = chaos energy. pin a version.']
+        assert (pinned.line, pinned.column) == (7, 9)
+        missing = issues['missing runs-on']
+        assert (missing.line, missing.column) == (8, 3)
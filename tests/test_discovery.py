@@ -0,0 +1,51 @@
+import os
+
+from ci_sanity.discovery import find_workflow_files, is_workflow_path, detect_platform
+
+
+def _touch(root, rel, text='name: x\n'):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_finds_nested_workflows_sorted(tmp_path):
+    _touch(tmp_path, '.github/workflows/b.yml')
+    _touch(tmp_path, '.github/workflows/a.yaml')
+    _touch(tmp_path, 'services/api/.github/workflows/ci.yml')
+    _touch(tmp_path, '.github/actions/setup/action.yml')
+    _touch(tmp_path, '.gitlab-ci.yml')
+    _touch(tmp_path, '.github/workflows/notes.txt')
+
+    found = find_workflow_files(str(tmp_path))
+    rel = [os.path.relpath(p, tmp_path).replace(os.sep, '/') for p in found]
+
+    assert rel == [
+        '.github/actions/setup/action.yml',
+        '.github/workflows/a.yaml',
+        '.github/workflows/b.yml',
+        '.gitlab-ci.yml',
+        'services/api/.github/workflows/ci.yml',
+    ]
+
+
+def test_prunes_dependency_dirs_gitignore_and_excludes(tmp_path):
+    _touch(tmp_path, 'node_modules/pkg/action.yml')
+    _touch(tmp_path, 'build/.github/workflows/ci.yml')
+    _touch(tmp_path, 'legacy/.github/workflows/ci.yml')
+    _touch(tmp_path, 'app/.github/workflows/ci.yml')
+    _touch(tmp_path, '.gitignore', 'build/\n')
+
+    found = find_workflow_files(str(tmp_path), exclude=['legacy'])
+    rel = [os.path.relpath(p, tmp_path).replace(os.sep, '/') for p in found]
+
+    assert rel == ['app/.github/workflows/ci.yml']
+
+
+def test_workflow_path_helpers():
+    assert is_workflow_path('.github/workflows/ci.yml')
+    assert is_workflow_path('sub/.github/workflows/ci.yaml')
+    assert not is_workflow_path('.github/workflows/nested/ci.yml')
+    assert detect_platform('a/.gitlab-ci.yml') == 'gitlab'
+    assert detect_platform('.github/actions/x/action.yml') == 'action'
+    assert detect_platform('.github/workflows/ci.yml') == 'github'
@@ -0,0 +1,70 @@
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.expressions import (
+    Binary, Call, Invalid, Name, Property, expression_references,
+    find_expressions, parse_expression,
+)
+
+
+def test_parse_expression_ast_and_memoization():
+    node = parse_expression("needs.build.result == 'success' && !cancelled()")
+    assert isinstance(node, Binary) and node.op == '&&'
+    assert node.left == Binary('==', Property(Property(Name('needs'), 'build'), 'result'),
+                               node.left.right)
+    assert isinstance(node.right.operand, Call)
+    assert parse_expression("needs.build.result == 'success' && !cancelled()") is node
+    assert isinstance(parse_expression('github.sha =='), Invalid)
+    assert isinstance(parse_expression('nope(1)'), Invalid)
+
+
+def test_expression_references():
+    refs = expression_references(
+        "format('{0}-{1}', matrix.os, secrets['API_KEY']) || "
+        "fromJSON(needs.setup.outputs.matrix)[env.INDEX]"
+    )
+    assert set(refs) == {
+        ('matrix', 'os'),
+        ('secrets', 'API_KEY'),
+        ('needs', 'setup', 'outputs', 'matrix'),
+        ('env', 'INDEX'),
+    }
+    assert expression_references('github.event.commits.*.message') == (
+        ('github', 'event', 'commits'),
+    )
+
+
+def test_find_expressions_handles_braces_in_strings():
+    text = "echo ${{ format('}}{0}', github.sha) }} and ${{ env.A }}"
+    assert find_expressions(text) == ["format('}}{0}', github.sha)", 'env.A']
+
+
+def test_context_reference_rule():
+    workflow = '''
+on: push
+jobs:
+  setup:
+    runs-on: ubuntu-latest
+    outputs:
+      v: ${{ steps.x.outputs.v }}
+    steps: [{run: echo}]
+  build:
+    needs: setup
+    runs-on: ${{ matrix.os }}
+    strategy:
+      matrix:
+        os: [ubuntu-latest, ubuntu-foo]
+    env:
+      A: ${{ needs.setup.outputs.nope }}
+      B: ${{ needs.other.result }}
+      C: ${{ matrix.python }}
+    steps:
+      - run: echo ${{ github.sha == }}
+'''
+    issues = Checker(Config.from_dict({})).check_text(workflow, 'ci.yml')
+    messages = {i.message for i in issues}
+
+    assert 'job setup has no output nope' in messages
+    assert 'needs.other is used but the job does not need other' in messages
+    assert 'matrix.python is not defined in the job matrix' in messages
+    assert "unknown runner in matrix: ['ubuntu-foo']" in messages
+    assert any(m.startswith('invalid expression ${{ github.sha == }}') for m in messages)
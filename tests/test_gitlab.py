@@ -0,0 +1,91 @@
+from textwrap import dedent
+
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.gitlab import GitLabPipeline, IncludeCache, load_gitlab_yaml
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(dedent(text))
+    return str(path)
+
+
+def test_extends_and_reference_resolution(tmp_path):
+    _write(tmp_path / 'ci' / 'templates.yml', '''
+        .base:
+          image: python
+          variables: {A: '1'}
+        .setup:
+          script: [pip install tox]
+    ''')
+    pipeline_file = _write(tmp_path / '.gitlab-ci.yml', '''
+        include:
+          - local: ci/templates.yml
+        build:
+          extends: .base
+          variables: {B: '2'}
+          script:
+            - !reference [.setup, script]
+            - tox
+    ''')
+
+    with open(pipeline_file) as f:
+        pipeline = GitLabPipeline(load_gitlab_yaml(f), pipeline_file)
+
+    assert pipeline.problems == []
+    build = pipeline.jobs['build']
+    assert build['image'] == 'python'
+    assert build['variables'] == {'A': '1', 'B': '2'}
+    assert build['script'] == ['pip install tox', 'tox']
+
+
+def test_include_cache_parses_shared_files_once(tmp_path):
+    shared = _write(tmp_path / 'shared.yml', '''
+        .base:
+          script: [make]
+    ''')
+    cache = IncludeCache()
+    first = cache.load(shared)
+    second = cache.load(shared)
+    assert first is second
+    assert len(cache) == 1
+
+
+def test_gitlab_rule_issues(tmp_path):
+    pipeline_file = _write(tmp_path / '.gitlab-ci.yml', '''
+        stages: [build]
+        lint:
+          extends: .missing
+        deploy:
+          stage: deploy
+          script: [echo]
+    ''')
+
+    issues = Checker(Config()).check_file(pipeline_file)
+    messages = {(i.job, i.message) for i in issues}
+
+    assert ('lint', 'extends .missing but .missing is not defined') in messages
+    assert ('lint', 'job has no script') in messages
+    assert ('deploy', 'stage deploy is not declared in stages') in messages
+    # GitHub-only rules must not run on GitLab pipelines
+    assert not any(i.message == 'missing runs-on' for i in issues)
+
+
+def test_non_string_top_level_keys_are_not_jobs(tmp_path):
+    pipeline_file = _write(tmp_path / '.gitlab-ci.yml', '''
+        stages: [build]
+        1:
+          script: [a]
+        true:
+          script: [b]
+        build:
+          stage: build
+          script: [make]
+    ''')
+
+    issues = Checker(Config()).check_file(pipeline_file)
+
+    assert not any(i.message.startswith('rule check failed') for i in issues)
+    with open(pipeline_file) as f:
+        assert list(GitLabPipeline(load_gitlab_yaml(f), pipeline_file).jobs) == ['build']
@@ -0,0 +1,84 @@
+import subprocess
+
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.gitobjects import GitObjectReader, check_refs, list_workflow_blobs
+
+
+WORKFLOW = '''on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@main
+'''
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ['git', '-C', str(repo), '-c', 'user.name=t', '-c', 'user.email=t@t'] + list(args),
+        check=True, stdout=subprocess.PIPE
+    )
+
+
+def _make_repo(tmp_path):
+    workflows = tmp_path / '.github' / 'workflows'
+    workflows.mkdir(parents=True)
+    (workflows / 'ci.yml').write_text(WORKFLOW)
+    (tmp_path / 'README.md').write_text('hi\n')
+    _git(tmp_path, 'init', '-q')
+    _git(tmp_path, 'add', '.')
+    _git(tmp_path, 'commit', '-qm', 'init')
+    _git(tmp_path, 'branch', 'release')
+    return tmp_path
+
+
+def test_list_workflow_blobs_and_read(tmp_path):
+    repo = _make_repo(tmp_path)
+    blobs = list_workflow_blobs(str(repo), 'release')
+    assert [path for path, _ in blobs] == ['.github/workflows/ci.yml']
+
+    with GitObjectReader(str(repo)) as reader:
+        sha, obj_type, content = reader.read(blobs[0][1])
+        assert obj_type == 'blob'
+        assert content.decode('utf-8') == WORKFLOW
+        assert reader.read('0' * 40) is None
+
+
+def test_check_refs_reports_each_ref_once_per_blob(tmp_path):
+    repo = _make_repo(tmp_path)
+    checker = Checker(Config())
+
+    issues = check_refs(checker, ['release', 'HEAD'], str(repo))
+
+    assert [i.file for i in issues] == [
+        'release:.github/workflows/ci.yml',
+        'HEAD:.github/workflows/ci.yml',
+    ]
+    assert issues[0].message == issues[1].message
+
+
+def test_check_refs_checks_gitlab_pipelines_with_their_ref_includes(tmp_path):
+    repo = _make_repo(tmp_path)
+    (repo / 'ci').mkdir()
+    (repo / 'ci' / 'templates.yml').write_text('.base:\n  script: [make]\n')
+    (repo / '.gitlab-ci.yml').write_text(
+        'include:\n  - local: ci/*.yml\n'
+        'stages: [test]\n'
+        'build:\n  extends: .base\n'
+    )
+    _git(repo, 'add', '.')
+    _git(repo, 'commit', '-qm', 'gitlab')
+    _git(repo, 'tag', 'v1')
+    # The work tree no longer has the include; the ref's tree does
+    _git(repo, 'rm', '-rq', 'ci')
+    _git(repo, 'commit', '-qm', 'drop templates')
+
+    issues = check_refs(Checker(Config()), ['v1'], str(repo))
+
+    assert [(i.file, i.message) for i in issues if i.file.endswith('.gitlab-ci.yml')] == []
+
+    issues = check_refs(Checker(Config()), ['HEAD'], str(repo))
+    messages = {i.message for i in issues if i.file == 'HEAD:.gitlab-ci.yml'}
+    assert 'extends .base but .base is not defined' in messages
+    assert not any('unknown key' in m for m in messages)
@@ -0,0 +1,115 @@
+import subprocess
+
+from ci_sanity.checker import Checker
+from ci_sanity.config import Config
+from ci_sanity.history import HistoryAuditor
+
+
+def _git(repo, *args):
+    result = subprocess.run(
+        ['git', '-C', str(repo), '-c', 'user.name=t', '-c', 'user.email=t@t'] + list(args),
+        check=True, stdout=subprocess.PIPE
+    )
+    return result.stdout.decode().strip()
+
+
+def _commit(repo, text, message):
+    path = repo / '.github' / 'workflows' / 'ci.yml'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    _git(repo, 'add', '.')
+    _git(repo, 'commit', '-qm', message)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+def _workflow(uses):
+    return f'''on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: {uses}
+'''
+
+
+def test_history_tracks_introduced_and_fixed(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    base = _commit(tmp_path, _workflow('actions/checkout@v4'), 'clean')
+    broken = _commit(tmp_path, _workflow('actions/checkout@main'), 'break')
+    fixed = _commit(tmp_path, _workflow('actions/checkout@v4'), 'fix')
+    _commit(tmp_path, _workflow('actions/checkout@v4') + '# same issues\n', 'touch')
+
+    auditor = HistoryAuditor(Checker(Config()), str(tmp_path))
+    findings = auditor.audit(base)
+
+    assert len(findings) == 1
+    finding = findings[0]
+    assert 'chaos energy' in finding.issue.message
+    assert finding.introduced.sha == broken
+    assert finding.fixed.sha == fixed
+    # 'fix' restores the 'clean' blob, so only three distinct blobs exist
+    assert len(auditor.results) == 3
+
+
+def test_history_skips_excluded_paths(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    base = _commit(tmp_path, _workflow('actions/checkout@v4'), 'clean')
+    example = tmp_path / 'examples' / '.github' / 'workflows' / 'ci.yml'
+    example.parent.mkdir(parents=True)
+    example.write_text(_workflow('actions/checkout@main'))
+    _git(tmp_path, 'add', '.')
+    _git(tmp_path, 'commit', '-qm', 'examples')
+
+    config = Config.from_dict({'exclude': ['examples/']})
+    findings = HistoryAuditor(Checker(config), str(tmp_path)).audit(base)
+
+    assert findings == []
+
+
+def test_history_with_workers_matches_in_process(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    base = _commit(tmp_path, _workflow('actions/checkout@v4'), 'clean')
+    for i in range(4):
+        _commit(tmp_path, _workflow('actions/checkout@main') + f'# {i}\n', f'break {i}')
+        _commit(tmp_path, _workflow('actions/checkout@v4'), f'fix {i}')
+
+    def summary(auditor):
+        return [(f.path, f.issue.message, f.introduced.sha, f.fixed.sha)
+                for f in auditor.audit(base)]
+
+    in_process = summary(HistoryAuditor(Checker(Config()), str(tmp_path)))
+    pooled = summary(HistoryAuditor(Checker(Config()), str(tmp_path), workers=2, window=1))
+
+    assert len(in_process) == 4
+    assert pooled == in_process
+
+
+def test_history_reads_gitlab_includes_from_each_commit(tmp_path, monkeypatch):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _git(repo, 'init', '-q')
+    pipeline = 'include:\n  - local: ci/base.yml\nbuild:\n  extends: .base\n'
+
+    def commit(include, text, message):
+        (repo / 'ci').mkdir(exist_ok=True)
+        (repo / 'ci' / 'base.yml').write_text(include)
+        (repo / '.gitlab-ci.yml').write_text(text)
+        _git(repo, 'add', '.')
+        _git(repo, 'commit', '-qm', message)
+        return _git(repo, 'rev-parse', 'HEAD')
+
+    base = commit('.base:\n  script: [make]\n', pipeline, 'base')
+    broken = commit('.other:\n  script: [make]\n', pipeline + '# touched\n', 'drop .base')
+    # Same pipeline blob as at base, but the include still lacks .base
+    commit('.other:\n  script: [make]\n', pipeline, 'revert pipeline only')
+
+    # Run from outside the repository: includes must come from git, not the CWD
+    monkeypatch.chdir(tmp_path)
+    for workers in (1, 2):
+        auditor = HistoryAuditor(Checker(Config()), str(repo), workers=workers)
+        findings = {f.issue.message: f for f in auditor.audit(base)}
+
+        assert 'included file ci/base.yml not found' not in findings
+        undefined = findings['extends .base but .base is not defined']
+        assert undefined.introduced.sha == broken
+        assert undefined.fixed is None
@@ -0,0 +1,79 @@
+import yaml
+
+from ci_sanity import api
+from ci_sanity.jobgraph import JobGraph, analyze_pipeline, timings_for
+
+
+PIPELINE = yaml.safe_load('''
+lint:
+  timeout-minutes: 4
+  outputs: {report: "${{ steps.lint.outputs.report }}"}
+  steps: [{id: lint, run: make lint}]
+build:
+  needs: lint
+  steps:
+    - run: make
+    - uses: actions/upload-artifact@v4
+test:
+  needs: [build, lint]
+  steps:
+    - uses: actions/download-artifact@v4
+deploy:
+  needs: test
+  if: needs.test.result == 'success'
+  steps: [{run: make deploy}]
+''')
+
+
+def test_critical_path_and_needless_waits():
+    analysis = analyze_pipeline(PIPELINE, {'build': 12, 'test': 20}, default=5)
+
+    assert analysis.critical_path == ['lint', 'build', 'test', 'deploy']
+    assert analysis.latency == 41
+    assert analysis.serial == 41
+    assert analysis.unconstrained == 37
+    assert analysis.estimates['lint'] == (4.0, 'timeout-minutes')
+    assert analysis.estimates['deploy'] == (5, 'default')
+    assert analysis.parallelizable == [('build', 'lint', 4.0), ('test', 'lint', 0.0)]
+    assert analysis.gates == []
+
+
+def test_plain_gates_are_not_needless():
+    graph = JobGraph(yaml.safe_load('''
+build:
+  steps: [{run: make}]
+test:
+  needs: build
+  steps: [{run: make test}]
+deploy:
+  needs: [build, test]
+  steps: [{run: make deploy}]
+'''))
+
+    # deploy reaches build through test, so that edge alone is needless
+    assert graph.unused_dependencies() == [('deploy', 'build')]
+    assert graph.gates() == [('test', 'build'), ('deploy', 'test')]
+
+
+def test_cycles_and_undefined_needs():
+    graph = JobGraph({
+        'a': {'needs': 'c'}, 'b': {'needs': ['a', 'ghost']}, 'c': {'needs': 'b'},
+        'd': {'needs': 'd'}, 'e': {},
+    })
+    assert graph.undefined_needs() == [('b', 'ghost')]
+    assert graph.cycles() == [['a', 'c', 'b', 'a'], ['d', 'd']]
+    assert analyze_pipeline(graph.jobs) is None
+
+    issues = api.check_text(
+        'on: push\njobs:\n  a:\n    runs-on: x\n    needs: [a, nope]\n    steps: [{run: x}]\n',
+        'ci.yml'
+    )
+    messages = [i.message for i in issues if i.rule == 'job-graph']
+    assert messages == ['needs nope, but there is no job nope',
+                        'jobs depend on each other in a cycle: a → a']
+
+
+def test_timings_for_workflow():
+    timings = {'build': 3, 'ci.yml': {'build': 7}, 'other.yml': {'build': 9}}
+    assert timings_for(timings, '.github/workflows/ci.yml') == {'build': 7}
+    assert timings_for(timings, '.github/workflows/release.yml') == {'build': 3}
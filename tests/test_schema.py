@@ -0,0 +1,81 @@
+import os
+
+from ci_sanity import api, schema
+from ci_sanity.schema import build_validator, compile_schema_source
+
+
+WORKFLOW = '''on:
+  pull_request:
+    type: [opened]
+permissions: read-al
+jobs:
+  build:
+    run-on: ubuntu-latest
+    timeout-minutes: ${{ inputs.timeout }}
+    steps:
+      - uses: actions/checkout@v4
+        with:
+          fetch-depth: 0
+      - run: make
+        shel: bash
+  call:
+    uses: ./.github/workflows/deploy.yml
+    secrets: inherit
+  typed:
+    runs-on: ubuntu-latest
+    strategy:
+      fail-fast: maybe
+    steps:
+      - run: make
+'''
+
+
+def test_schema_issues_with_suggestions():
+    issues = [i for i in api.check_text(WORKFLOW, 'ci.yml') if i.rule == 'schema']
+    found = {(i.job, i.step, i.message, i.fix) for i in issues}
+
+    assert found == {
+        ('on', None, 'unknown key type under on.pull_request', 'did you mean types?'),
+        ('permissions', None, 'permissions has invalid value read-al', 'did you mean read-all?'),
+        ('build', None, 'unknown key run-on in job build', 'did you mean runs-on?'),
+        ('build', 1, 'unknown key shel', 'did you mean shell?'),
+        ('typed', None, 'strategy.fail-fast must be true or false',
+         'change strategy.fail-fast to true or false'),
+    }
+    assert all(i.severity == 'error' and i.line is not None for i in issues)
+
+
+def test_compiled_validator_is_cached_on_disk(tmp_path, monkeypatch):
+    validate = build_validator(directory=str(tmp_path))
+    cached = os.listdir(str(tmp_path))
+    assert len(cached) == 1 and cached[0].endswith('.marshal')
+
+    def fail(_):
+        raise AssertionError('schema was recompiled')
+    monkeypatch.setattr(schema, 'compile_schema_source', fail)
+    again = build_validator(directory=str(tmp_path))
+
+    document = {'jobs': {'a': {'runs-on': 'x', 'stepz': []}}}
+    assert again(document) == validate(document) != []
+
+
+def test_compiler_subset():
+    source = compile_schema_source({
+        'type': 'object',
+        'properties': {'n': {'type': 'integer'}, 'tags': {'type': 'array', 'items': {'$ref': '#/definitions/tag'}}},
+        'patternProperties': {'^x-': {}},
+        'additionalProperties': False,
+        'required': ['n'],
+        'definitions': {'tag': {'type': 'string', 'enum': ['a', 'b']}},
+    })
+    namespace = {}
+    exec(compile(source, '<test>', 'exec'), namespace)
+    validate = namespace['validate']
+
+    assert validate({'n': 1, 'tags': ['a'], 'x-extra': [1]}) == []
+    assert validate({'n': True, 'tags': ['c', '${{ matrix.tag }}'], 'm': 1}) == [
+        (('n',), 'type', ('integer',)),
+        (('tags', 0), 'enum', ('c', ('a', 'b'))),
+        (('m',), 'unknown', ('n', 'tags')),
+    ]
+    assert validate({}) == [((), 'required', 'n')]
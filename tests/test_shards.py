@@ -0,0 +1,80 @@
+import gzip
+import os
+
+import pytest
+
+from ci_sanity.models import Issue, ScanResult
+from ci_sanity.shards import (
+    PartialWriter, ShardError, merge_partials, parse_shard, read_partial, select_shard,
+    shard_of,
+)
+
+
+def issue(file, severity='warning'):
+    return Issue(severity=severity, file=file, job='build', step=0, message='m', fix='f',
+                 line=3, column=5, rule='cache')
+
+
+def test_parse_and_assign_shards(tmp_path):
+    assert parse_shard('2/8') == (2, 8)
+    for spec in ('0/8', '9/8', '2', 'a/b'):
+        with pytest.raises(ShardError):
+            parse_shard(spec)
+
+    # Stable across runs and machines: a plain hash of the relative path
+    assert shard_of('a/.github/workflows/ci.yml', 8) == shard_of('a/.github/workflows/ci.yml', 8)
+    paths = [f'r{i}/.github/workflows/w{j}.yml' for i in range(20) for j in range(3)]
+    shards = [select_shard(paths, (i, 4)) for i in range(1, 5)]
+    assert sorted(p for shard in shards for p in shard) == sorted(paths)
+    assert all(shards)
+
+    # Relative keys, so nodes that check out under different roots agree
+    assert select_shard([os.path.join(str(tmp_path), p) for p in paths], (2, 4), str(tmp_path)) == \
+        [os.path.join(str(tmp_path), p) for p in shards[1]]
+
+
+def test_shard_by_repo(tmp_path):
+    paths = []
+    for repo in ('one', 'two', 'three', 'four'):
+        (tmp_path / repo / '.git').mkdir(parents=True)
+        for name in ('a.yml', 'b.yml'):
+            paths.append(str(tmp_path / repo / '.github' / 'workflows' / name))
+    for i in range(1, 4):
+        selected = select_shard(paths, (i, 3), str(tmp_path), by='repo')
+        assert len({p.split(os.sep)[-4] for p in selected}) * 2 == len(selected)
+
+
+def test_partial_round_trip_and_merge(tmp_path):
+    paths = []
+    for i, issues in enumerate(([issue('a.yml'), issue('b.yml', 'error')], []), start=1):
+        path = str(tmp_path / f'shard-{i}.jsonl.gz')
+        writer = PartialWriter(path, (i, 2))
+        writer.write(issues)
+        writer.close(ScanResult(checked=3, suppressed=i, exit_code=2 if issues else 0))
+        paths.append(path)
+
+    shard, result = read_partial(paths[0])
+    assert shard == (1, 2)
+    assert result.issues == [issue('a.yml'), issue('b.yml', 'error')]
+    assert gzip.open(paths[0]).read().count(b'\n') == 4
+
+    merged, missing = merge_partials(paths)
+    assert (len(merged.issues), merged.checked, merged.suppressed, merged.exit_code) == (2, 6, 3, 2)
+    assert missing == []
+    assert merge_partials(paths[1:])[1] == [(1, 2)]
+
+    with pytest.raises(ShardError, match='also in'):
+        merge_partials([paths[0], paths[0]])
+
+    truncated = tmp_path / 'cut.jsonl'
+    truncated.write_text(gzip.open(paths[0], 'rt').read().rsplit('{', 1)[0])
+    with pytest.raises(ShardError, match='incomplete'):
+        read_partial(str(truncated))
+
+    # A bad set of files is refused before anything reaches the sink
+    sunk = []
+    with pytest.raises(ShardError, match='also in'):
+        merge_partials([paths[0], paths[0]], sunk.extend)
+    with pytest.raises(ShardError, match='incomplete'):
+        merge_partials([paths[0], str(truncated)], sunk.extend)
+    assert sunk == []
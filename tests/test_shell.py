@@ -0,0 +1,75 @@
+from ci_sanity import api
+from ci_sanity.shell import parse_script
+
+
+SCRIPT = r'''# npm install would be nice
+echo "pip install x" && npm ci; sudo -E pip3 install -r req.txt \
+   --user
+FOO=1 python3.12 -m pip install . 2>&1 | tee log
+cat <<-'EOF' > notes.txt
+	bundle install
+	EOF
+if [ -f yarn.lock ]; then yarn --frozen-lockfile; fi
+echo $(poetry install) `bundle install` # trailing
+(cd web && docker build .)
+'''
+
+
+def test_parse_script():
+    commands = parse_script(SCRIPT)
+    assert [c.words for c in commands] == [
+        ('echo', 'pip install x'),
+        ('npm', 'ci'),
+        ('sudo', '-E', 'pip3', 'install', '-r', 'req.txt', '--user'),
+        ('FOO=1', 'python3.12', '-m', 'pip', 'install', '.', '2>&1'),
+        ('tee', 'log'),
+        ('cat', '>', 'notes.txt'),
+        ('if', '[', '-f', 'yarn.lock', ']'),
+        ('then', 'yarn', '--frozen-lockfile'),
+        ('fi',),
+        ('echo', '$(poetry install)', '`bundle install`'),
+        ('cd', 'web'),
+        ('docker', 'build', '.'),
+    ]
+    assert [c.line for c in commands] == [1, 1, 1, 3, 3, 4, 7, 7, 7, 8, 9, 9]
+    assert commands[2].argv[:2] == ('pip3', 'install')
+    assert commands[2].startswith('pip', 'install')
+    assert commands[3].startswith('python', '-m', 'pip', 'install')
+    assert not commands[0].startswith('pip', 'install')
+    assert parse_script(SCRIPT) is commands
+
+
+def test_rules_use_commands_not_substrings():
+    issues = api.check_text('''
+on: push
+jobs:
+  build:
+    runs-on: windows-latest
+    steps:
+      - run: echo "npm ci && docker run it"  # just talk
+      - run: true
+      - uses: actions/cache@v4
+        with: {path: ~/.npm, key: "npm-${{ hashFiles('package-lock.json') }}", restore-keys: npm-}
+''', 'ci.yml')
+    assert [i.message for i in issues if i.rule in ('step-order', 'runner-compat', 'cache')] == []
+
+
+def test_install_before_cache_matches_every_install_form():
+    issues = api.check_text('''
+on: push
+jobs:
+  build:
+    runs-on: windows-latest
+    steps:
+      - run: python -m pip install -r requirements.txt
+      - run: NPM CI
+      - run: yarn --frozen-lockfile
+      - run: yarn build
+      - uses: actions/cache@v4
+        with: {path: ~/.npm, key: "npm-${{ hashFiles('package-lock.json') }}", restore-keys: npm-}
+''', 'ci.yml')
+    assert [(i.step, i.message) for i in issues if i.rule == 'step-order'] == [
+        (0, 'install runs before cache'),
+        (1, 'install runs before cache'),
+        (2, 'install runs before cache'),
+    ]
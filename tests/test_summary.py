@@ -0,0 +1,29 @@
+from ci_sanity.models import Issue
+from ci_sanity.summary import IssueAggregator
+
+
+def _issue(file, message='actions/checkout@main = chaos energy. pin a version.',
+           severity='warning', rule='action-version', line=None):
+    return Issue(severity=severity, file=file, job='build', step=0, message=message,
+                 fix='', line=line, rule=rule)
+
+
+def test_groups_count_files_and_keep_bounded_samples():
+    aggregator = IssueAggregator(samples=2)
+    for repo in range(5):
+        path = f'repo{repo}/.github/workflows/ci.yml'
+        aggregator.add_all([_issue(path, line=3), _issue(path, line=9)])
+    aggregator.add(_issue('repo9/ci.yml', message='step runs before checkout',
+                          severity='error', rule='step-order', line=1))
+    aggregator.add(_issue('repo9/ci.yml', message='Step runs  before checkout',
+                          severity='error', rule='step-order'))
+
+    assert aggregator.total == 12
+    assert aggregator.files == 6
+    assert len(aggregator) == 2
+
+    first, second = aggregator.top(5)
+    assert (first.rule, first.count, first.files) == ('action-version', 10, 5)
+    assert first.samples == ['repo0/.github/workflows/ci.yml:3', 'repo1/.github/workflows/ci.yml:3']
+    assert (second.rule, second.count, second.files) == ('step-order', 2, 1)
+    assert [g.rule for g in aggregator.top(1)] == ['action-version']
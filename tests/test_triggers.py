@@ -0,0 +1,92 @@
+import re
+
+import yaml
+
+from ci_sanity.triggers import (
+    MAYBE, RUNS, SKIPPED, UNKNOWN, ChangedFiles, branch_matches, evaluate_condition,
+    simulate, translate_filter,
+)
+
+
+def test_filter_glob_semantics():
+    def matches(pattern, path):
+        return re.match(translate_filter(pattern) + r'\Z', path) is not None
+
+    assert matches('docs/*', 'docs/a.md') and not matches('docs/*', 'docs/a/b.md')
+    assert matches('docs/**', 'docs/a/b.md')
+    assert matches('**/README.md', 'README.md') and matches('**/README.md', 'a/b/README.md')
+    assert matches('**.js', 'src/app.js')
+    assert matches('v2?.0', 'v.0') and matches('v2?.0', 'v2.0')
+    assert matches('v2+', 'v222') and not matches('v2+', 'v')
+    assert matches('release-[0-9]', 'release-7')
+    assert matches(r'dir\*', 'dir*') and not matches(r'dir\*', 'dirx')
+    assert branch_matches(['releases/**', '!releases/**-alpha'], 'releases/1.0')
+    assert not branch_matches(['releases/**', '!releases/**-alpha'], 'releases/1.0-alpha')
+
+
+def test_changed_files_apply_patterns_in_order():
+    changed = ChangedFiles(['web/app.js', 'web/README.md', 'api/main.py', 'docs/guide.md'])
+    assert changed.paths == ['api/main.py', 'docs/guide.md', 'web/README.md', 'web/app.js']
+    assert changed.selected(['web/**']) == {2, 3}
+    assert changed.selected(['web/**', '!**.md']) == {3}
+    assert changed.selected(['!**.md', 'web/**']) == {2, 3}
+    assert changed.selected(['**/*.md']) == {1, 2}
+
+
+WORKFLOW = yaml.safe_load('''
+on:
+  push:
+    branches: [main, 'release/**']
+    paths: ['api/**', '!**.md']
+  pull_request:
+    paths-ignore: ['docs/**']
+jobs:
+  test: {}
+  deploy:
+    needs: test
+    if: github.event_name == 'push' && startsWith(github.ref, 'refs/heads/release/')
+  report:
+    needs: deploy
+    if: ${{ always() }}
+  notify:
+    needs: test
+    if: github.actor == 'bot'
+  publish:
+    needs: deploy
+''')
+
+
+def test_simulate_workflow():
+    trigger = simulate(WORKFLOW, 'push', 'release/2.0', ChangedFiles(['api/x.py']))
+    assert trigger.fires and trigger.path_filtered
+    assert {job: status for job, (status, _) in trigger.jobs.items()} == {
+        'test': RUNS, 'deploy': RUNS, 'report': RUNS, 'notify': MAYBE, 'publish': RUNS,
+    }
+
+    trigger = simulate(WORKFLOW, 'push', 'main', ChangedFiles(['api/x.py']))
+    assert trigger.jobs['deploy'] == (SKIPPED, 'if is false')
+    assert trigger.jobs['report'] == (RUNS, '')
+    assert trigger.jobs['publish'] == (SKIPPED, 'needs deploy, which is skipped')
+
+    assert simulate(WORKFLOW, 'push', 'dev', ChangedFiles(['api/x.py'])).reason == \
+        'branches does not include dev'
+    assert simulate(WORKFLOW, 'push', 'main', ChangedFiles(['api/README.md'])).reason == \
+        'no changed file matches paths'
+    assert simulate(WORKFLOW, 'pull_request', 'main', ChangedFiles(['docs/a.md'])).reason == \
+        'every changed file matches paths-ignore'
+    assert simulate(WORKFLOW, 'pull_request', 'main', ChangedFiles(['docs/a.md', 'x'])).fires
+    assert simulate(WORKFLOW, 'schedule', 'main', ChangedFiles([])).reason == \
+        'not triggered by schedule'
+    assert simulate({'on': {'push': {'tags': ['v*']}}}, 'push', 'main', ChangedFiles(['a'])).reason == \
+        'push only runs for tags'
+
+
+def test_evaluate_condition():
+    github = {'event_name': 'push', 'ref': 'refs/heads/main', 'base_ref': ''}
+    assert evaluate_condition("github.ref == 'REFS/heads/MAIN'", github) is True
+    assert evaluate_condition("${{ github.event_name != 'push' }}", github) is False
+    assert evaluate_condition("github.event_name == 'push' || github.actor == 'x'", github) is True
+    assert evaluate_condition("github.actor == 'x' && github.event_name == 'pr'", github) is False
+    assert evaluate_condition("github.actor == 'x'", github) is UNKNOWN
+    assert evaluate_condition("contains(fromJSON('[1]'), 1)", github) is UNKNOWN
+    assert evaluate_condition('!github.base_ref', github) is True
@@ -0,0 +1,60 @@
+import yaml
+
+from ci_sanity.waste import find_waste, matrix_size, workflow_events
+
+
+def waste(text, durations=None):
+    return [(w.kind, w.job, w.minutes) for w in find_waste(yaml.safe_load(text), durations or {})]
+
+
+def test_pull_request_workflow_waste():
+    found = waste('''
+on: [push, pull_request]
+jobs:
+  test:
+    strategy:
+      matrix: {python: ['3.10', '3.11', '3.12'], os: [ubuntu, macos]}
+    steps: [{run: make test}]
+  deploy:
+    if: github.event_name == 'push'
+    timeout-minutes: 10
+    steps: [{run: make deploy}]
+  shared:
+    uses: ./.github/workflows/shared.yml
+''', {'test': 8, 'deploy': 10, 'shared': 2})
+    assert found == [
+        ('timeout', 'test', 352 * 6),
+        ('concurrency', None, 48 + 10 + 2),
+        ('duplicate-trigger', None, 48 + 2),
+    ]
+
+
+def test_well_configured_workflow():
+    assert waste('''
+on:
+  push: {branches: [main]}
+  pull_request:
+concurrency:
+  group: ${{ github.workflow }}-${{ github.ref }}
+  cancel-in-progress: ${{ github.event_name == 'pull_request' }}
+jobs:
+  test: {timeout-minutes: 15, steps: [{run: make}]}
+''') == []
+
+
+def test_push_filters():
+    template = 'on:\n  pull_request:\n  push: %s\njobs:\n  a: {timeout-minutes: 5}\n'
+    kinds = lambda push: [kind for kind, _, _ in waste(template % push)]
+    assert 'duplicate-trigger' in kinds('{branches-ignore: [main]}')
+    assert 'duplicate-trigger' in kinds("{branches: ['**']}")
+    assert 'duplicate-trigger' not in kinds("{tags: ['v*']}")
+    assert 'duplicate-trigger' not in kinds("{branches: [main, 'release/*']}")
+
+
+def test_events_and_matrix_size():
+    assert workflow_events(yaml.safe_load('on: push')) == {'push': None}
+    assert workflow_events({True: {'pull_request': {'branches': ['main']}}}) == {
+        'pull_request': {'branches': ['main']}}
+    assert matrix_size({'strategy': {'matrix': {'include': [{'a': 1}, {'a': 2}]}}}) == 2
+    assert matrix_size({'strategy': {'matrix': {'x': [1, 2], 'y': [1, 2], 'exclude': [{'x': 1}]}}}) == 3
+    assert matrix_size({'strategy': {'matrix': '${{ fromJSON(needs.a.outputs.m) }}'}}) == 1